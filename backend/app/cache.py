@@ -1,77 +1,420 @@
 """
 Caching module for performance optimization.
 
-Provides in-memory caching with TTL for expensive operations.
+Provides in-memory caching with TTL for expensive operations, plus a
+persistent on-disk cache for results that should survive restarts.
 """
 
+import os
+import sys
 import time
 import asyncio
+import threading
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Optional, Dict, Callable
+from pathlib import Path
+from typing import Any, Awaitable, Optional, Dict, Callable, Set, Union
 import hashlib
 import json
 
 
+# In-memory cache limits
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Result of an in-flight computation whose task was cancelled
+_LEADER_CANCELLED = object()
+
+
 class Cache:
-    """Simple in-memory cache with TTL support."""
+    """
+    In-memory LRU cache with TTL support.
+    
+    Bounded by both entry count and approximate size in bytes; the least
+    recently used entries are evicted first. Concurrent get_or_compute()
+    calls for the same key share a single computation, and entries can be
+    served stale while a background refresh runs.
+    """
     
-    def __init__(self, default_ttl: int = 300):
+    def __init__(
+        self,
+        default_ttl: int = 300,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
         """
         Initialize cache.
         
         Args:
             default_ttl: Default time-to-live in seconds (5 minutes)
+            max_entries: Maximum number of entries
+            max_bytes: Maximum approximate total size of cached values
         """
-        self._store: Dict[str, tuple] = {}  # {key: (value, expires_at)}
+        # {key: (value, expires_at, stale_until, size)}, least recently used first
+        self._store: "OrderedDict[str, tuple]" = OrderedDict()
         self._default_ttl = default_ttl
-        self._lock = asyncio.Lock()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'rejected': 0
+        }
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired."""
-        if key in self._store:
-            value, expires_at = self._store[key]
-            if time.time() < expires_at:
-                return value
-            else:
-                # Expired, remove it
-                async with self._lock:
-                    self._store.pop(key, None)
+        entry = self._lookup(key)
+        if entry is not None and time.time() < entry[1]:
+            self._stats['hits'] += 1
+            return entry[0]
+        self._stats['misses'] += 1
         return None
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set value in cache with TTL."""
-        ttl = ttl or self._default_ttl
-        expires_at = time.time() + ttl
-        async with self._lock:
-            self._store[key] = (value, expires_at)
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0
+    ) -> None:
+        """
+        Set value in cache with TTL.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds
+            stale_ttl: Extra seconds the value may be served stale by get_or_compute()
+        """
+        self._store_value(key, value, ttl, stale_ttl)
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0
+    ) -> Any:
+        """
+        Return the cached value, computing it at most once per key.
+        
+        Args:
+            key: Cache key
+            compute: Zero-argument coroutine function producing the value
+            ttl: Time-to-live in seconds
+            stale_ttl: Stale-while-revalidate window. An expired value younger
+                than ttl + stale_ttl is returned immediately and refreshed in
+                the background.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            value, expires_at, stale_until, _ = entry
+            now = time.time()
+            if now < expires_at:
+                self._stats['hits'] += 1
+                return value
+            if now < stale_until:
+                self._stats['stale_hits'] += 1
+                if key not in self._inflight:
+                    task = asyncio.create_task(self._refresh(key, compute, ttl, stale_ttl))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return value
+        
+        self._stats['misses'] += 1
+        return await self._compute_once(key, compute, ttl, stale_ttl)
     
     async def delete(self, key: str) -> None:
         """Delete key from cache."""
-        async with self._lock:
-            self._store.pop(key, None)
+        self._remove(key)
     
     async def clear(self) -> None:
         """Clear all cached values."""
-        async with self._lock:
-            self._store.clear()
+        self._store.clear()
+        self._bytes = 0
     
     async def cleanup_expired(self) -> int:
         """Remove all expired entries. Returns count of removed entries."""
         now = time.time()
-        removed = 0
-        async with self._lock:
-            expired_keys = [
-                k for k, (_, exp) in self._store.items() 
-                if now >= exp
-            ]
-            for key in expired_keys:
-                del self._store[key]
-                removed += 1
-        return removed
+        expired_keys = [
+            k for k, (_, _, stale_until, _) in self._store.items()
+            if now >= stale_until
+        ]
+        for key in expired_keys:
+            self._remove(key)
+        self._stats['expirations'] += len(expired_keys)
+        return len(expired_keys)
     
     def size(self) -> int:
         """Return current cache size."""
         return len(self._store)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current usage."""
+        lookups = self._stats['hits'] + self._stats['stale_hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'entries': len(self._store),
+            'bytes': self._bytes,
+            'inflight': len(self._inflight),
+            'hit_ratio': round((self._stats['hits'] + self._stats['stale_hits']) / lookups, 4) if lookups else 0.0
+        }
+    
+    def _lookup(self, key: str) -> Optional[tuple]:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        if time.time() >= entry[2]:
+            # Past the stale window, remove it
+            self._remove(key)
+            self._stats['expirations'] += 1
+            return None
+        self._store.move_to_end(key)
+        return entry
+    
+    def _store_value(self, key: str, value: Any, ttl: Optional[int], stale_ttl: int) -> None:
+        ttl = ttl or self._default_ttl
+        size = _estimate_size(value)
+        self._remove(key)
+        if size > self._max_bytes:
+            self._stats['rejected'] += 1
+            return
+        
+        expires_at = time.time() + ttl
+        self._store[key] = (value, expires_at, expires_at + stale_ttl, size)
+        self._bytes += size
+        
+        while self._store and (len(self._store) > self._max_entries or self._bytes > self._max_bytes):
+            oldest = next(iter(self._store))
+            self._remove(oldest)
+            self._stats['evictions'] += 1
+    
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+    
+    async def _compute_once(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        stale_ttl: int
+    ) -> Any:
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            self._stats['coalesced'] += 1
+            value = await asyncio.shield(inflight)
+            if value is not _LEADER_CANCELLED:
+                return value
+            # The computing task was cancelled: the next waiter takes over
+            inflight = self._inflight.get(key)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                # Only the leader was cancelled; waiters retry instead
+                future.set_result(_LEADER_CANCELLED)
+            else:
+                future.set_exception(e)
+                future.exception()  # Waiters re-raise it; don't log as unretrieved
+            raise
+        else:
+            self._store_value(key, value, ttl, stale_ttl)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def _refresh(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        stale_ttl: int
+    ) -> None:
+        try:
+            await self._compute_once(key, compute, ttl, stale_ttl)
+        except Exception as e:
+            # Keep serving the stale value; the next lookup retries
+            print(f"Cache refresh failed for {key}: {e}")
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint of a cached value in bytes."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class DiskCache:
+    """
+    Persistent JSON cache stored as one file per key.
+    
+    Keys are hashed (SHA-256) into the file name, so any string works as a key.
+    Entries expire after their TTL, and once the directory grows past
+    max_bytes the least recently used entries are evicted.
+    """
+    
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        default_ttl: int = 86400,
+        max_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        Initialize disk cache.
+        
+        Args:
+            directory: Directory holding the cache files
+            default_ttl: Default time-to-live in seconds (1 day)
+            max_bytes: Total size above which old entries are evicted
+        """
+        self._dir = Path(directory)
+        self._default_ttl = default_ttl
+        self._max_bytes = max_bytes
+        self._size: Optional[int] = None  # Computed lazily on first write
+        self._lock = threading.Lock()
+    
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self._dir / digest[:2] / f"{digest}.json"
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from disk if present and not expired."""
+        return await asyncio.to_thread(self._get_sync, key)
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store a JSON-serializable value on disk with TTL."""
+        await asyncio.to_thread(self._set_sync, key, value, ttl)
+    
+    async def delete(self, key: str) -> None:
+        """Delete key from disk."""
+        await asyncio.to_thread(self._remove, self._path(key))
+    
+    async def clear(self) -> None:
+        """Remove every cached entry."""
+        await asyncio.to_thread(self._clear_sync)
+    
+    def _get_sync(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() >= entry.get("expires_at", 0):
+            self._remove(path)
+            return None
+        
+        # Touch the file so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+    
+    def _set_sync(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        ttl = ttl or self._default_ttl
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        data = json.dumps({
+            "key": key,
+            "expires_at": time.time() + ttl,
+            "value": value
+        }, ensure_ascii=False).encode("utf-8")
+        
+        # Write atomically so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        old_size = path.stat().st_size if path.exists() else 0
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - old_size
+            over_budget = self._size > self._max_bytes
+        
+        if over_budget:
+            self._evict()
+    
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+    
+    def _entries(self):
+        if not self._dir.exists():
+            return []
+        return [p for p in self._dir.glob("*/*.json") if p.is_file()]
+    
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self._entries():
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+    
+    def _evict(self) -> int:
+        """Evict least recently used entries down to 90% of max_bytes."""
+        stats = []
+        for path in self._entries():
+            try:
+                stats.append((path.stat().st_mtime, path.stat().st_size, path))
+            except OSError:
+                pass
+        stats.sort()
+        
+        total = sum(size for _, size, _ in stats)
+        target = int(self._max_bytes * 0.9)
+        removed = 0
+        for _, size, path in stats:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        
+        with self._lock:
+            self._size = total
+        return removed
+    
+    def _clear_sync(self) -> None:
+        for path in self._entries():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._size = 0
 
 
 # Global cache instance
@@ -87,28 +430,28 @@ def make_cache_key(*args, **kwargs) -> str:
     return hashlib.md5(key_data.encode()).hexdigest()
 
 
-def cached(ttl: int = 300):
+def cached(ttl: int = 300, stale_while_revalidate: int = 0):
     """
     Decorator for caching async function results.
     
+    Concurrent calls with the same arguments share one execution.
+    
     Args:
         ttl: Time-to-live in seconds
+        stale_while_revalidate: Seconds an expired result may still be
+            returned while it is recomputed in the background
     """
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key from function name and arguments
             key = f"{func.__module__}.{func.__name__}:{make_cache_key(*args, **kwargs)}"
-            
-            # Try to get from cache
-            cached_value = await cache.get(key)
-            if cached_value is not None:
-                return cached_value
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache.set(key, result, ttl)
-            return result
+            return await cache.get_or_compute(
+                key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_while_revalidate
+            )
         
         return wrapper
     return decorator
@@ -0,0 +1,105 @@
+"""
+Shared outbound clients for the application.
+
+HTTP and LLM SDK clients are created lazily on first use and reused until
+`clients.aclose()` is called (FastAPI lifespan shutdown or the end of a CLI
+run), so keep-alive connections survive across calls instead of paying a
+new TCP+TLS handshake for every request. Every HTTP client goes through the
+shared per-host rate limiter. The SDK clients do not retry on their own:
+retries of LLM calls are made by the provider limiters in app/llm_limits.py.
+"""
+
+from typing import Any, Dict
+
+import httpx
+
+from .config import settings
+from .llm_limits import llm_limiter
+from .rate_limit import RateLimitedTransport, rate_limiter
+
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx when installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Per-host client profiles: request timeout and connection pool limits
+CLIENT_PROFILES: Dict[str, Dict[str, Any]] = {
+    'huggingface': {'timeout': 30.0, 'max_connections': 16, 'max_keepalive': 8},
+    'images': {'timeout': 30.0, 'max_connections': 16, 'max_keepalive': 8},
+    'ollama': {'timeout': 120.0, 'max_connections': 4, 'max_keepalive': 4},
+    'linkedin': {'timeout': 30.0, 'max_connections': 4, 'max_keepalive': 2},
+    'default': {'timeout': 30.0, 'max_connections': 8, 'max_keepalive': 4},
+}
+
+
+class ClientRegistry:
+    """Application-scoped registry of pooled HTTP and SDK clients."""
+
+    def __init__(self):
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._sdk: Dict[str, Any] = {}
+
+    def http(self, profile: str = 'default') -> httpx.AsyncClient:
+        """
+        Get the shared httpx client for a profile.
+
+        Args:
+            profile: Key of CLIENT_PROFILES (unknown names use 'default' limits)
+        """
+        client = self._http.get(profile)
+        if client is None or client.is_closed:
+            config = CLIENT_PROFILES.get(profile, CLIENT_PROFILES['default'])
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=config['max_connections'],
+                    max_keepalive_connections=config['max_keepalive']
+                ),
+                http2=HTTP2_AVAILABLE
+            )
+            client = httpx.AsyncClient(
+                timeout=config['timeout'],
+                transport=RateLimitedTransport(rate_limiter, transport)
+            )
+            self._http[profile] = client
+        return client
+
+    def openai(self):
+        """Get the shared AsyncOpenAI client."""
+        if 'openai' not in self._sdk:
+            from openai import AsyncOpenAI
+            self._sdk['openai'] = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
+        return self._sdk['openai']
+
+    def anthropic(self):
+        """Get the shared AsyncAnthropic client."""
+        if 'anthropic' not in self._sdk:
+            import anthropic
+            self._sdk['anthropic'] = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key, max_retries=0)
+        return self._sdk['anthropic']
+
+    async def aclose(self) -> None:
+        """Close every client. New clients are created on next use."""
+        http_clients, self._http = self._http, {}
+        sdk_clients, self._sdk = self._sdk, {}
+
+        for client in http_clients.values():
+            await client.aclose()
+        rate_limiter.reset()
+        llm_limiter.reset()
+        for client in sdk_clients.values():
+            close = getattr(client, 'close', None)
+            if close is not None:
+                await close()
+
+    async def __aenter__(self) -> "ClientRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+# Global client registry
+clients = ClientRegistry()
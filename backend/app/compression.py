@@ -0,0 +1,255 @@
+"""
+Response compression.
+
+CompressionMiddleware compresses text responses (JSON, HTML, JS, CSS, SVG)
+above a size threshold with brotli when the client accepts it and the
+`brotli` package is installed, gzip otherwise. Static files are served from
+precompressed `.br`/`.gz` siblings written at build time
+(frontend/scripts/precompress.mjs), so the same asset is never compressed
+per request.
+"""
+
+import mimetypes
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple, Union
+
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Precompressed sibling suffix per encoding, in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+# Per-request compression favours speed; build-time files use the maximum
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Set[str]:
+    """Content codings the client accepts (q > 0) from an Accept-Encoding header."""
+    encodings = set()
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def precompressed_sibling(path: Path, accept_encoding: Optional[str]) -> Tuple[Path, Optional[str]]:
+    """
+    Pick the best precompressed version of a static file.
+
+    Args:
+        path: Original file
+        accept_encoding: The request's Accept-Encoding header
+
+    Returns:
+        (file to send, content coding or None for the original)
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in accepted:
+            sibling = path.with_name(path.name + suffix)
+            if sibling.is_file():
+                return sibling, encoding
+    return path, None
+
+
+def has_precompressed(path: Path) -> bool:
+    """True if path has a `.br` or `.gz` sibling, i.e. its response varies by Accept-Encoding."""
+    return any(path.with_name(path.name + suffix).is_file() for _, suffix in PRECOMPRESSED)
+
+
+def precompressed_file_response(
+    path: Path,
+    accept_encoding: Optional[str],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> FileResponse:
+    """
+    FileResponse for path, sending a precompressed sibling when there is one.
+
+    The response keeps the original file's media type; its ETag and
+    Last-Modified come from the file actually sent. Whenever a sibling
+    exists, the response carries Vary: Accept-Encoding - also when the
+    original is sent, so shared caches don't hand it to every client.
+    """
+    send_path, encoding = precompressed_sibling(path, accept_encoding)
+    if encoding is None:
+        if has_precompressed(path):
+            headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+        return FileResponse(path, status_code=status_code, headers=headers, stat_result=os.stat(path))
+    headers = {**(headers or {}), "Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return FileResponse(
+        send_path,
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+        stat_result=os.stat(send_path)
+    )
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        return brotli.Compressor(quality=BROTLI_QUALITY)
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def _finish(compressor, encoding: str) -> bytes:
+    return compressor.finish() if encoding == "br" else compressor.flush()
+
+
+def _compress_chunk(compressor, encoding: str, data: bytes) -> bytes:
+    return compressor.process(data) if encoding == "br" else compressor.compress(data)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text responses above minimum_size bytes.
+
+    Responses that already have a Content-Encoding (precompressed files),
+    non-text responses, range responses and 204/304 responses pass through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        """
+        Args:
+            app: Wrapped ASGI application
+            minimum_size: Smallest body worth compressing, in bytes
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding"))
+        if "br" in accepted and BROTLI_AVAILABLE:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressedResponder:
+    """Compresses one response, deciding once the first body chunk is known."""
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or "content-range" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            # First body chunk: decide whether to compress
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            self.compressor = _compressor(self.encoding)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Still matches via weak comparison in If-None-Match
+                headers["ETag"] = "W/" + etag
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = _compress_chunk(self.compressor, self.encoding, body)
+                compressed += _finish(self.compressor, self.encoding)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start)
+
+        data = _compress_chunk(self.compressor, self.encoding, body)
+        if not more_body:
+            data += _finish(self.compressor, self.encoding)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles serving `.br`/`.gz` siblings to clients that accept them."""
+
+    def file_response(
+        self,
+        full_path: Union[str, os.PathLike],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        response = precompressed_file_response(Path(full_path), request_headers.get("accept-encoding"), status_code)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
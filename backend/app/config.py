@@ -4,7 +4,7 @@ Loads settings from environment variables.
 """
 
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -16,6 +16,9 @@ class Settings(BaseSettings):
     supabase_url: str = Field(default="", env="SUPABASE_URL")
     supabase_anon_key: str = Field(default="", env="SUPABASE_ANON_KEY")
     supabase_service_role_key: str = Field(default="", env="SUPABASE_SERVICE_ROLE_KEY")
+    supabase_upload_concurrency: int = Field(default=4, env="SUPABASE_UPLOAD_CONCURRENCY")
+    # "rest" writes each table separately; "rpc" uses publish_model() (migration 004) in one transaction
+    supabase_publish_mode: str = Field(default="rest", env="SUPABASE_PUBLISH_MODE")
     
     # LLM - OpenAI
     openai_api_key: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
@@ -35,6 +38,41 @@ class Settings(BaseSettings):
     
     # Explicit Provider Selection
     llm_provider: Optional[str] = Field(default=None, env="LLM_PROVIDER")
+    # Failover order, comma-separated (default: LLM_PROVIDER or the first
+    # configured provider, then every other provider with an API key)
+    llm_providers: Optional[str] = Field(default=None, env="LLM_PROVIDERS")
+    # Send a non-streamed call to the next provider too when the first has not
+    # answered within its p95 latency, and keep whichever answers first
+    llm_hedge_requests: bool = Field(default=False, env="LLM_HEDGE_REQUESTS")
+    # Circuit breaker: skip a provider after this many failed calls in a row,
+    # then let one call through after the cooldown to test it
+    llm_breaker_failures: int = Field(default=5, env="LLM_BREAKER_FAILURES")
+    llm_breaker_cooldown: float = Field(default=30.0, env="LLM_BREAKER_COOLDOWN")
+    
+    # LLM response cache (stored under cache_dir/llm)
+    llm_cache_enabled: bool = Field(default=True, env="LLM_CACHE_ENABLED")
+    llm_cache_ttl: int = Field(default=7 * 24 * 3600, env="LLM_CACHE_TTL")
+    llm_cache_max_mb: int = Field(default=512, env="LLM_CACHE_MAX_MB")
+    
+    # LLM call limits per provider: ceiling of the adaptive concurrency limit,
+    # retries of rate-limited/failed calls, and tokens-per-minute quotas (0 = none)
+    llm_max_concurrency: int = Field(default=8, env="LLM_MAX_CONCURRENCY")
+    llm_max_retries: int = Field(default=4, env="LLM_MAX_RETRIES")
+    openai_tpm: int = Field(default=0, env="OPENAI_TPM")
+    anthropic_tpm: int = Field(default=0, env="ANTHROPIC_TPM")
+    gemini_tpm: int = Field(default=0, env="GEMINI_TPM")
+    
+    # Hugging Face rate limit, shared by all requests to huggingface.co
+    huggingface_rate_limit: float = Field(default=1.0, env="HUGGINGFACE_RATE_LIMIT")
+    huggingface_burst: int = Field(default=3, env="HUGGINGFACE_BURST")
+    
+    # Image downloads
+    image_download_concurrency: int = Field(default=4, env="IMAGE_DOWNLOAD_CONCURRENCY")
+    image_max_mb: int = Field(default=20, env="IMAGE_MAX_MB")
+    
+    # Hugging Face HTTP cache (conditional GETs, stored under cache_dir/http)
+    scrape_cache_ttl: int = Field(default=30 * 24 * 3600, env="SCRAPE_CACHE_TTL")
+    scrape_cache_max_mb: int = Field(default=256, env="SCRAPE_CACHE_MAX_MB")
     
     # Demo Mode - skip LLM calls, use sample data
     demo_mode: bool = Field(default=False, env="DEMO_MODE")
@@ -52,6 +90,25 @@ class Settings(BaseSettings):
     linkedin_access_token: Optional[str] = Field(default=None, env="LINKEDIN_ACCESS_TOKEN")
     enable_linkedin_publishing: bool = Field(default=True, env="ENABLE_LINKEDIN_PUBLISHING")
     
+    # Response compression (gzip, or brotli when installed) for bodies above this size
+    compression_min_size: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")
+    
+    # Preview websockets: messages buffered per client, and what happens when
+    # a slow client's buffer is full ("drop", "coalesce" or "disconnect")
+    ws_send_queue_size: int = Field(default=256, env="WS_SEND_QUEUE_SIZE")
+    ws_slow_consumer_policy: str = Field(default="coalesce", env="WS_SLOW_CONSUMER_POLICY")
+    
+    # Background jobs (regeneration, publishing): worker pool size, attempts
+    # with exponential backoff, and concurrent LLM / Supabase jobs
+    job_workers: int = Field(default=4, env="JOB_WORKERS")
+    job_max_attempts: int = Field(default=3, env="JOB_MAX_ATTEMPTS")
+    job_retry_base_delay: float = Field(default=2.0, env="JOB_RETRY_BASE_DELAY")
+    job_llm_concurrency: int = Field(default=2, env="JOB_LLM_CONCURRENCY")
+    job_publish_concurrency: int = Field(default=1, env="JOB_PUBLISH_CONCURRENCY")
+    
+    # Local SQLite connection pool
+    sqlite_reader_pool_size: int = Field(default=4, env="SQLITE_READER_POOL_SIZE")
+    
     # Paths
     data_dir: str = Field(default="data")
     cache_dir: str = Field(default="data/cache")
@@ -69,7 +126,9 @@ settings = Settings()
 
 def get_llm_provider() -> str:
     """Determine which LLM provider to use based on configuration."""
-    # 1. Check explicit configuration
+    # 1. Check explicit configuration (the head of an explicit failover chain wins)
+    if settings.llm_providers and settings.llm_providers.split(",")[0].strip():
+        return settings.llm_providers.split(",")[0].strip().lower()
     if settings.llm_provider:
         return settings.llm_provider.lower()
         
@@ -84,3 +143,26 @@ def get_llm_provider() -> str:
         return "gemini"
     else:
         return "ollama"
+
+
+def get_llm_providers() -> List[str]:
+    """
+    Providers to try for an LLM call, in failover order.
+    
+    LLM_PROVIDERS sets the order explicitly. Otherwise the provider from
+    get_llm_provider() comes first, followed by the other providers that
+    have an API key.
+    """
+    if settings.llm_providers:
+        chain = [name.strip().lower() for name in settings.llm_providers.split(",") if name.strip()]
+        if chain:
+            return list(dict.fromkeys(chain))
+    
+    chain = [get_llm_provider()]
+    if settings.openai_api_key and not settings.openai_api_key.startswith("your_"):
+        chain.append("openai")
+    if settings.anthropic_api_key and not settings.anthropic_api_key.startswith("your_"):
+        chain.append("anthropic")
+    if settings.gemini_api_key:
+        chain.append("gemini")
+    return list(dict.fromkeys(chain))
@@ -1,25 +1,320 @@
 """
 SQLite database management for local preview sessions.
+
+All access goes through a long-lived connection pool: one writer connection
+(SQLite allows a single writer at a time) and a small pool of reader
+connections. The database runs in WAL mode, so readers never block behind
+the writer.
 """
 
 import aiosqlite
+import asyncio
+import base64
 import os
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from pathlib import Path
 
 from .config import settings
+from .json_patch import Patch, make_patch
 
 
 DATABASE_PATH = Path(settings.data_dir) / "local.db"
 
+# Compiled statements kept per connection; every query below is a constant
+# SQL string, so repeated calls reuse the prepared statement.
+STATEMENT_CACHE_SIZE = 256
+
+
+class DatabasePool:
+    """Pool of aiosqlite connections: a single writer plus N readers."""
+    
+    def __init__(self, path: Path, readers: int = 4):
+        """
+        Args:
+            path: SQLite database file
+            readers: Number of read-only connections
+        """
+        self._path = path
+        self._reader_count = max(1, readers)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._writer_lock: Optional[asyncio.Lock] = None
+        self._open_lock: Optional[asyncio.Lock] = None
+    
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+    
+    async def open(self) -> None:
+        """Open all connections (no-op if already open)."""
+        if self._writer is not None:
+            return
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            
+            os.makedirs(self._path.parent, exist_ok=True)
+            
+            writer = await self._connect()
+            readers = []
+            try:
+                # WAL is persistent in the database file; readers see the last
+                # committed snapshot while a write is in progress.
+                await self._pragma(writer, "journal_mode = WAL")
+                for _ in range(self._reader_count):
+                    readers.append(await self._connect(query_only=True))
+            except BaseException:
+                for conn in [writer, *readers]:
+                    await conn.close()
+                raise
+            
+            idle: asyncio.Queue = asyncio.Queue()
+            for conn in readers:
+                idle.put_nowait(conn)
+            
+            self._readers = readers
+            self._idle_readers = idle
+            self._writer_lock = asyncio.Lock()
+            self._writer = writer
+    
+    async def close(self) -> None:
+        """Close all connections. The pool reopens on next use."""
+        writer, self._writer = self._writer, None
+        readers, self._readers = self._readers, []
+        self._idle_readers = None
+        self._writer_lock = None
+        self._open_lock = None
+        
+        for conn in readers:
+            await conn.close()
+        if writer is not None:
+            await writer.close()
+    
+    async def _connect(self, query_only: bool = False) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self._path, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = aiosqlite.Row
+        try:
+            await self._pragma(conn, "busy_timeout = 5000")
+            # NORMAL is durable across application crashes in WAL mode; only an
+            # OS crash/power loss can roll back the last transactions.
+            await self._pragma(conn, "synchronous = NORMAL")
+            await self._pragma(conn, "temp_store = MEMORY")
+            if query_only:
+                await self._pragma(conn, "query_only = ON")
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+    
+    @staticmethod
+    async def _pragma(conn: aiosqlite.Connection, pragma: str) -> None:
+        # Exhaust the cursor so the statement doesn't keep a lock open
+        async with conn.execute(f"PRAGMA {pragma}") as cursor:
+            await cursor.fetchall()
+    
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a reader connection."""
+        await self.open()
+        idle = self._idle_readers
+        conn = await idle.get()
+        try:
+            yield conn
+        finally:
+            idle.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Hold the writer connection for one transaction (committed on exit)."""
+        await self.open()
+        async with self._writer_lock:
+            try:
+                yield self._writer
+                await self._writer.commit()
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+
+# Schema migrations, applied in order by init_database(). PRAGMA user_version
+# records how many have run; append new entries, never edit existing ones.
+MIGRATIONS: List[List[str]] = [
+    # 1: Full-text index over model name, organization, tags, title and article
+    [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS previews_fts USING fts5(
+            display_name, organization, tags, title, content,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS previews_fts_insert AFTER INSERT ON local_previews BEGIN
+            INSERT INTO previews_fts (rowid, display_name, organization, tags, title, content)
+            VALUES (
+                new.rowid,
+                json_extract(new.model_data, '$.display_name'),
+                json_extract(new.model_data, '$.organization'),
+                (SELECT group_concat(value, ' ') FROM json_each(new.model_data, '$.tags')),
+                json_extract(new.article_data, '$.title'),
+                json_extract(new.article_data, '$.content')
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS previews_fts_delete AFTER DELETE ON local_previews BEGIN
+            DELETE FROM previews_fts WHERE rowid = old.rowid;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS previews_fts_update AFTER UPDATE OF model_data, article_data ON local_previews BEGIN
+            DELETE FROM previews_fts WHERE rowid = old.rowid;
+            INSERT INTO previews_fts (rowid, display_name, organization, tags, title, content)
+            VALUES (
+                new.rowid,
+                json_extract(new.model_data, '$.display_name'),
+                json_extract(new.model_data, '$.organization'),
+                (SELECT group_concat(value, ' ') FROM json_each(new.model_data, '$.tags')),
+                json_extract(new.article_data, '$.title'),
+                json_extract(new.article_data, '$.content')
+            );
+        END
+        """,
+        """
+        INSERT INTO previews_fts (rowid, display_name, organization, tags, title, content)
+        SELECT
+            rowid,
+            json_extract(model_data, '$.display_name'),
+            json_extract(model_data, '$.organization'),
+            (SELECT group_concat(value, ' ') FROM json_each(model_data, '$.tags')),
+            json_extract(article_data, '$.title'),
+            json_extract(article_data, '$.content')
+        FROM local_previews
+        """,
+    ],
+    # 2: Hot JSON fields as generated columns, indexed for filtering and sorting
+    [
+        "ALTER TABLE local_previews ADD COLUMN category TEXT GENERATED ALWAYS AS (json_extract(model_data, '$.category')) VIRTUAL",
+        "ALTER TABLE local_previews ADD COLUMN huggingface_url TEXT GENERATED ALWAYS AS (json_extract(model_data, '$.huggingface_url')) VIRTUAL",
+        "ALTER TABLE local_previews ADD COLUMN slug TEXT GENERATED ALWAYS AS (json_extract(article_data, '$.slug')) VIRTUAL",
+        "ALTER TABLE local_previews ADD COLUMN tier TEXT GENERATED ALWAYS AS (json_extract(scores_data, '$.tier')) VIRTUAL",
+        "ALTER TABLE local_previews ADD COLUMN overall_score REAL GENERATED ALWAYS AS (json_extract(scores_data, '$.overall_score')) VIRTUAL",
+        # preview_id breaks ties so every ordering is total
+        "CREATE INDEX IF NOT EXISTS idx_previews_last_modified ON local_previews (last_modified, preview_id)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_created_at ON local_previews (created_at, preview_id)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_overall_score ON local_previews (overall_score, preview_id)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_category ON local_previews (category, last_modified, preview_id)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_category_score ON local_previews (category, overall_score, preview_id)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_tier ON local_previews (tier, last_modified, preview_id)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_tier_score ON local_previews (tier, overall_score, preview_id)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_slug ON local_previews (slug)",
+        "CREATE INDEX IF NOT EXISTS idx_previews_huggingface_url ON local_previews (huggingface_url)",
+    ],
+    # 3: Preview versions and the JSON Patch from each version to the next
+    [
+        "ALTER TABLE local_previews ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+        """
+        CREATE TABLE IF NOT EXISTS preview_patches (
+            preview_id TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            ops TEXT NOT NULL,
+            PRIMARY KEY (preview_id, version)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS preview_patches_delete AFTER DELETE ON local_previews BEGIN
+            DELETE FROM preview_patches WHERE preview_id = old.preview_id;
+        END
+        """,
+    ],
+    # 4: Durable background jobs (app/jobs.py)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            preview_id TEXT,
+            payload TEXT NOT NULL,
+            concurrency_key TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (status, run_after)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_preview ON jobs (preview_id, created_at)",
+    ],
+]
+
+# Patches kept per preview for websocket clients resuming from an older version
+PATCH_HISTORY = 100
+
+# Sort columns accepted by list_previews(); all are sorted newest/best first,
+# with preview_id breaking ties
+PREVIEW_ORDERS = ('last_modified', 'created_at', 'overall_score')
+
+# Fields accepted by list_previews(fields=...) and the SQL that reads them
+PREVIEW_FIELDS = {
+    'preview_id': 'preview_id',
+    'created_at': 'created_at',
+    'last_modified': 'last_modified',
+    'publish_status': 'publish_status',
+    'category': 'category',
+    'tier': 'tier',
+    'overall_score': 'overall_score',
+    'slug': 'slug',
+    'huggingface_url': 'huggingface_url',
+    'display_name': "json_extract(model_data, '$.display_name')",
+    'organization': "json_extract(model_data, '$.organization')",
+    'title': "json_extract(article_data, '$.title')",
+}
+
+# Fields returned when none are requested (all read from indexed columns)
+DEFAULT_PREVIEW_FIELDS = (
+    'preview_id', 'created_at', 'last_modified', 'publish_status',
+    'category', 'tier', 'overall_score', 'slug', 'huggingface_url'
+)
+
+
+async def _migrate(db: aiosqlite.Connection) -> None:
+    """Apply pending MIGRATIONS, each in its own transaction."""
+    async with db.execute("PRAGMA user_version") as cursor:
+        (version,) = await cursor.fetchone()
+    
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        await db.commit()
+        await db.execute("BEGIN")
+        for statement in statements:
+            await db.execute(statement)
+        await db.execute(f"PRAGMA user_version = {number}")
+        await db.commit()
+
+
+# Global pool instance
+pool = DatabasePool(DATABASE_PATH, readers=settings.sqlite_reader_pool_size)
+
+
+async def close_database():
+    """Close the connection pool (FastAPI shutdown / end of a CLI run)."""
+    await pool.close()
+
 
 async def init_database():
     """Initialize the local SQLite database with required tables."""
-    os.makedirs(settings.data_dir, exist_ok=True)
-    
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with pool.write() as db:
         # Local previews table
         await db.execute("""
             CREATE TABLE IF NOT EXISTS local_previews (
@@ -46,7 +341,7 @@ async def init_database():
             )
         """)
         
-        await db.commit()
+        await _migrate(db)
 
 
 async def save_preview(
@@ -56,83 +351,387 @@ async def save_preview(
     linkedin_data: Dict[str, Any],
     scores_data: Dict[str, Any],
     images: Optional[List[str]] = None
-) -> bool:
-    """Save a preview session to the local database."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute("""
-            INSERT OR REPLACE INTO local_previews 
+) -> int:
+    """
+    Save a preview session to the local database.
+    
+    Saving an existing preview bumps its version and records the JSON Patch
+    from the previous version (see get_preview_patches()).
+    
+    Returns:
+        The preview's new version
+    """
+    document = {
+        "model_data": json.dumps(model_data),
+        "article_data": json.dumps(article_data),
+        "linkedin_data": json.dumps(linkedin_data),
+        "scores_data": json.dumps(scores_data),
+        "images": json.dumps(images) if images else None,
+        "last_modified": datetime.utcnow().isoformat()
+    }
+    
+    async with pool.write() as db:
+        async with db.execute(
+            "SELECT * FROM local_previews WHERE preview_id = ?",
+            (preview_id,)
+        ) as cursor:
+            old_row = await cursor.fetchone()
+        
+        # Upsert rather than INSERT OR REPLACE: keeps the rowid (the search
+        # index key) and created_at, and fires the update trigger
+        async with db.execute("""
+            INSERT INTO local_previews 
             (preview_id, model_data, article_data, linkedin_data, scores_data, images, last_modified)
             VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (preview_id) DO UPDATE SET
+                model_data = excluded.model_data,
+                article_data = excluded.article_data,
+                linkedin_data = excluded.linkedin_data,
+                scores_data = excluded.scores_data,
+                images = excluded.images,
+                last_modified = excluded.last_modified,
+                version = local_previews.version + 1
+            RETURNING version
         """, (
             preview_id,
-            json.dumps(model_data),
-            json.dumps(article_data),
-            json.dumps(linkedin_data),
-            json.dumps(scores_data),
-            json.dumps(images) if images else None,
-            datetime.utcnow().isoformat()
-        ))
-        await db.commit()
-        return True
+            document["model_data"],
+            document["article_data"],
+            document["linkedin_data"],
+            document["scores_data"],
+            document["images"],
+            document["last_modified"]
+        )) as cursor:
+            (version,) = await cursor.fetchone()
+        
+        if old_row is not None:
+            old = _preview_document(old_row)
+            new = _preview_document({**dict(old_row), **document, "version": version})
+            await _record_patch(db, preview_id, version, make_patch(old, new))
+        return version
+
+
+def _preview_document(row) -> Dict[str, Any]:
+    """Decode a local_previews row into the preview document sent to clients."""
+    return {
+        "preview_id": row["preview_id"],
+        "model_data": json.loads(row["model_data"]),
+        "article_data": json.loads(row["article_data"]),
+        "linkedin_data": json.loads(row["linkedin_data"]),
+        "scores_data": json.loads(row["scores_data"]),
+        "images": json.loads(row["images"]) if row["images"] else [],
+        "created_at": row["created_at"],
+        "last_modified": row["last_modified"],
+        "publish_status": row["publish_status"],
+        "supabase_references": json.loads(row["supabase_references"]) if row["supabase_references"] else None,
+        "version": row["version"]
+    }
+
+
+async def _record_patch(db: aiosqlite.Connection, preview_id: str, version: int, ops: Patch) -> None:
+    await db.execute(
+        "INSERT OR REPLACE INTO preview_patches (preview_id, version, ops) VALUES (?, ?, ?)",
+        (preview_id, version, json.dumps(ops))
+    )
+    await db.execute(
+        "DELETE FROM preview_patches WHERE preview_id = ? AND version <= ?",
+        (preview_id, version - PATCH_HISTORY)
+    )
+
+
+async def get_preview_patches(preview_id: str, since: int) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Patches bringing a client from version `since` to the current version.
+    
+    Args:
+        preview_id: Preview session ID
+        since: Version the client already has
+        
+    Returns:
+        (current version, [{"version", "ops"}, ...] in order), or None if the
+        preview is gone or the history does not reach back to `since`
+        (the client then needs the full preview)
+    """
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT version FROM local_previews WHERE preview_id = ?",
+            (preview_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None or since > row[0]:
+            return None
+        current = row[0]
+        
+        async with db.execute(
+            "SELECT version, ops FROM preview_patches WHERE preview_id = ? AND version > ? ORDER BY version",
+            (preview_id, since)
+        ) as cursor:
+            rows = await cursor.fetchall()
+    
+    # A missing version (pruned, or written without a patch) breaks the chain
+    if len(rows) != current - since or (rows and rows[0]["version"] != since + 1):
+        return None
+    return current, [{"version": r["version"], "ops": json.loads(r["ops"])} for r in rows]
 
 
 async def get_preview(preview_id: str) -> Optional[Dict[str, Any]]:
     """Retrieve a preview session from the local database."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
+    async with pool.read() as db:
+        async with db.execute(
             "SELECT * FROM local_previews WHERE preview_id = ?",
             (preview_id,)
-        )
-        row = await cursor.fetchone()
+        ) as cursor:
+            row = await cursor.fetchone()
         
         if row:
-            return {
-                "preview_id": row["preview_id"],
-                "model_data": json.loads(row["model_data"]),
-                "article_data": json.loads(row["article_data"]),
-                "linkedin_data": json.loads(row["linkedin_data"]),
-                "scores_data": json.loads(row["scores_data"]),
-                "images": json.loads(row["images"]) if row["images"] else [],
-                "created_at": row["created_at"],
-                "last_modified": row["last_modified"],
-                "publish_status": row["publish_status"],
-                "supabase_references": json.loads(row["supabase_references"]) if row["supabase_references"] else None
-            }
+            return _preview_document(row)
         return None
 
 
-async def update_preview_status(preview_id: str, status: str, supabase_refs: Optional[Dict] = None) -> bool:
-    """Update the publish status of a preview."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+async def get_preview_version(preview_id: str) -> Optional[str]:
+    """
+    Return a preview's last_modified without reading its JSON blobs.
+    
+    Every write bumps last_modified, so it identifies the stored version
+    (used as the preview's ETag).
+    """
+    async with pool.read() as db:
+        async with db.execute(
+            "SELECT last_modified FROM local_previews WHERE preview_id = ?",
+            (preview_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def update_preview_status(preview_id: str, status: str, supabase_refs: Optional[Dict] = None) -> Optional[int]:
+    """
+    Update the publish status of a preview.
+    
+    Returns:
+        The preview's new version, or None if it does not exist
+    """
+    async with pool.write() as db:
+        async with db.execute(
+            "SELECT publish_status, supabase_references, last_modified, version FROM local_previews WHERE preview_id = ?",
+            (preview_id,)
+        ) as cursor:
+            old_row = await cursor.fetchone()
+        if old_row is None:
+            return None
+        
+        new_row = {
+            "publish_status": status,
+            "supabase_references": json.dumps(supabase_refs) if supabase_refs else None,
+            "last_modified": datetime.utcnow().isoformat(),
+            "version": old_row["version"] + 1
+        }
         await db.execute("""
             UPDATE local_previews 
-            SET publish_status = ?, supabase_references = ?, last_modified = ?
+            SET publish_status = ?, supabase_references = ?, last_modified = ?, version = ?
             WHERE preview_id = ?
         """, (
-            status,
-            json.dumps(supabase_refs) if supabase_refs else None,
-            datetime.utcnow().isoformat(),
+            new_row["publish_status"],
+            new_row["supabase_references"],
+            new_row["last_modified"],
+            new_row["version"],
             preview_id
         ))
-        await db.commit()
-        return True
+        
+        def status_fields(row) -> Dict[str, Any]:
+            refs = row["supabase_references"]
+            return {
+                "publish_status": row["publish_status"],
+                "supabase_references": json.loads(refs) if refs else None,
+                "last_modified": row["last_modified"],
+                "version": row["version"]
+            }
+        
+        ops = make_patch(status_fields(old_row), status_fields(new_row))
+        await _record_patch(db, preview_id, new_row["version"], ops)
+        return new_row["version"]
 
 
-async def list_previews() -> List[Dict[str, Any]]:
-    """List all preview sessions."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT preview_id, created_at, last_modified, publish_status FROM local_previews ORDER BY last_modified DESC"
-        )
-        rows = await cursor.fetchall()
+def _encode_cursor(order_by: str, value: Any, preview_id: str) -> str:
+    payload = json.dumps([order_by, value, preview_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, order_by: str) -> Tuple[Any, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_order, value, preview_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_order != order_by:
+        raise ValueError("Cursor belongs to a different order_by")
+    return value, preview_id
+
+
+def _preview_filters(category: Optional[str], tier: Optional[str]) -> Tuple[List[str], List[Any]]:
+    conditions = []
+    params: List[Any] = []
+    if category is not None:
+        conditions.append("category = ?")
+        params.append(category)
+    if tier is not None:
+        conditions.append("tier = ?")
+        params.append(tier)
+    return conditions, params
+
+
+async def list_previews(
+    category: Optional[str] = None,
+    tier: Optional[str] = None,
+    order_by: str = 'last_modified',
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    List preview sessions, filtered and sorted on indexed columns.
+    
+    Pages are keyset-paginated on (order_by column, preview_id), so fetching
+    a page costs the same wherever it is in the history.
+    
+    Args:
+        category: Only previews of this category
+        tier: Only previews of this tier
+        order_by: One of PREVIEW_ORDERS
+        limit: Page size (all remaining previews if None)
+        cursor: next_cursor returned with the previous page
+        fields: Subset of PREVIEW_FIELDS to return (DEFAULT_PREVIEW_FIELDS if None)
+        
+    Returns:
+        (previews, next_cursor); next_cursor is None on the last page
+    """
+    if order_by not in PREVIEW_ORDERS:
+        raise ValueError(f"order_by must be one of: {', '.join(PREVIEW_ORDERS)}")
+    fields = list(fields or DEFAULT_PREVIEW_FIELDS)
+    unknown = [name for name in fields if name not in PREVIEW_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    
+    columns = ', '.join(f"{PREVIEW_FIELDS[name]} AS {name}" for name in fields)
+    select = f"SELECT {columns}, {order_by} AS _sort_value, preview_id AS _sort_id FROM local_previews"
+    order = f"ORDER BY {order_by} DESC, preview_id DESC LIMIT ?"
+    # One extra row tells whether there is a next page
+    fetch = -1 if limit is None else limit + 1
+    
+    conditions, params = _preview_filters(category, tier)
+    queries = []
+    if cursor:
+        value, after_id = _decode_cursor(cursor, order_by)
+        # Descending order puts NULL scores last. Each part is a separate
+        # query so both can seek in the index instead of scanning to the cursor.
+        if value is not None:
+            queries.append((conditions + [f"({order_by}, preview_id) < (?, ?)"], params + [value, after_id]))
+            queries.append((conditions + [f"{order_by} IS NULL"], params))
+        else:
+            queries.append((conditions + [f"{order_by} IS NULL", "preview_id < ?"], params + [after_id]))
+    else:
+        queries.append((conditions, params))
+    
+    rows: List[aiosqlite.Row] = []
+    async with pool.read() as db:
+        for query_conditions, query_params in queries:
+            where = f"WHERE {' AND '.join(query_conditions)}" if query_conditions else ""
+            async with db.execute(f"{select} {where} {order}", query_params + [fetch]) as result:
+                rows.extend(await result.fetchall())
+            if limit is not None and len(rows) > limit:
+                break
+            if fetch != -1:
+                fetch = limit + 1 - len(rows)
+    
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(order_by, rows[-1]['_sort_value'], rows[-1]['_sort_id'])
+    return [{name: row[name] for name in fields} for row in rows], next_cursor
+
+
+async def get_previews_version(
+    category: Optional[str] = None,
+    tier: Optional[str] = None
+) -> Tuple[int, Optional[str]]:
+    """
+    Count and latest last_modified of the previews matching the filters.
+    
+    Both come from indexes. Any insert, update or delete changes one of them,
+    so together they version the list (used as its ETag).
+    
+    Returns:
+        (count, latest last_modified)
+    """
+    conditions, params = _preview_filters(category, tier)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Separate subqueries: SQLite only optimizes MAX() to an index seek when
+    # it is the only aggregate
+    async with pool.read() as db:
+        async with db.execute(f"""
+            SELECT (SELECT COUNT(*) FROM local_previews {where}),
+                   (SELECT MAX(last_modified) FROM local_previews {where})
+        """, params + params) as cursor:
+            count, latest = await cursor.fetchone()
+    return count, latest
+
+
+def _fts_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 query.
+    
+    Every word is quoted (so FTS5 operators and punctuation are literal) and
+    the last one matches as a prefix, for search-as-you-type.
+    """
+    words = [word.replace('"', '""') for word in query.split()]
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+async def search_previews(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Full-text search over previews, best matches first.
+    
+    Args:
+        query: Free text matched against model name, organization, tags,
+            article title and content
+        limit: Maximum number of hits
+        
+    Returns:
+        Hits with preview summary fields, bm25 rank and a highlighted snippet
+    """
+    fts_query = _fts_query(query)
+    if not fts_query:
+        return []
+    
+    async with pool.read() as db:
+        # bm25 weights per column: display_name, organization, tags, title, content
+        async with db.execute("""
+            SELECT
+                p.preview_id,
+                json_extract(p.model_data, '$.display_name') AS display_name,
+                json_extract(p.model_data, '$.organization') AS organization,
+                p.category,
+                json_extract(p.article_data, '$.title') AS title,
+                p.tier,
+                p.last_modified,
+                p.publish_status,
+                snippet(previews_fts, -1, '<mark>', '</mark>', '…', 16) AS snippet,
+                bm25(previews_fts, 10.0, 4.0, 3.0, 6.0, 1.0) AS rank
+            FROM previews_fts
+            JOIN local_previews p ON p.rowid = previews_fts.rowid
+            WHERE previews_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, (fts_query, limit)) as cursor:
+            rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
 
 async def delete_preview(preview_id: str) -> bool:
     """Delete a preview session."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with pool.write() as db:
         await db.execute("DELETE FROM local_previews WHERE preview_id = ?", (preview_id,))
-        await db.commit()
         return True
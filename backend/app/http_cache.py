@@ -0,0 +1,93 @@
+"""
+HTTP caching helpers: ETags and conditional responses.
+
+API responses get a strong ETag computed from a cheap version lookup (such
+as a preview's last_modified) before the full payload is built, so a
+matching If-None-Match is answered with 304 without reading the JSON blobs.
+Static files are revalidated the same way from their size and mtime, and
+content-hashed build assets are cached by the browser forever.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Any
+
+from fastapi import Request, Response
+from starlette.types import Scope
+
+from .compression import PrecompressedStaticFiles, has_precompressed, precompressed_file_response, precompressed_sibling
+
+
+# API data and index.html: the browser keeps a copy but revalidates on every use
+REVALIDATE = "no-cache"
+
+# Vite build assets have a content hash in the file name
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag from the values that determine a response.
+
+    Args:
+        parts: Values whose change must change the ETag (ids, versions, params)
+    """
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def file_etag(path: Path) -> str:
+    """Strong ETag of a file from its size and modification time."""
+    stat = path.stat()
+    return make_etag(path.name, stat.st_size, stat.st_mtime_ns)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers etag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    """304 response carrying the validators the client should keep."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str = REVALIDATE) -> None:
+    """Attach ETag and Cache-Control to a full response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def file_response(request: Request, path: Path, cache_control: str = REVALIDATE) -> Response:
+    """
+    FileResponse with an ETag, or 304 if the client's copy is current.
+    
+    A precompressed sibling is sent when the client accepts it; the ETag
+    is that of the file actually sent.
+    """
+    accept_encoding = request.headers.get("accept-encoding")
+    send_path, _ = precompressed_sibling(path, accept_encoding)
+    etag = file_etag(send_path)
+    if etag_matches(request, etag):
+        response = not_modified(etag, cache_control)
+        if has_precompressed(path):
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+    return precompressed_file_response(path, accept_encoding, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+class ImmutableStaticFiles(PrecompressedStaticFiles):
+    """StaticFiles for content-hashed assets, marked immutable for a year."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE
+        return response
@@ -0,0 +1,387 @@
+"""
+Durable background job queue.
+
+Long-running work (LLM regeneration, publishing) is stored in the `jobs`
+table of the local SQLite database and executed by a dispatcher in the
+FastAPI process, so HTTP requests return immediately and queued or
+interrupted jobs survive a restart. Failed attempts are retried with
+exponential backoff, and every job belongs to a concurrency group (e.g.
+"llm" or "supabase") with its own limit. Status changes are pushed
+to the preview's websocket clients as {"type": "job", ...} messages.
+"""
+
+import asyncio
+import json
+import random
+import time
+import traceback
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .config import settings
+from .database import pool
+from .websocket import manager
+
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+# Finished jobs older than this are deleted at startup
+JOB_RETENTION_DAYS = 7
+
+MAX_RETRY_DELAY = 300.0
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures that retrying cannot fix."""
+
+
+@dataclass
+class Job:
+    """A claimed job, as passed to its handler."""
+    job_id: str
+    kind: str
+    preview_id: Optional[str]
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    _report: Callable[["Job", Dict[str, Any]], Awaitable[None]] = field(repr=False, default=None)
+    _save: Callable[["Job"], Awaitable[None]] = field(repr=False, default=None)
+
+    async def progress(self, stage: str, **details: Any) -> None:
+        """Record progress and push it to websocket clients."""
+        await self._report(self, {"stage": stage, **details})
+
+    async def checkpoint(self, **updates: Any) -> None:
+        """
+        Store the outcome of a finished step in the payload.
+
+        A retried or restarted job sees the stored values in `payload`, so
+        handlers can skip steps that must not run twice.
+        """
+        self.payload.update(updates)
+        await self._save(self)
+
+
+JobHandler = Callable[[Job], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    job = dict(row)
+    for key in ("payload", "progress", "result"):
+        job[key] = json.loads(job[key]) if job[key] else None
+    return job
+
+
+class JobQueue:
+    """SQLite-backed job queue with a bounded async worker pool."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_attempts: int = 3,
+        retry_base_delay: float = 2.0,
+        concurrency_limits: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            workers: Jobs running at the same time, across all groups
+            max_attempts: Default attempts per job before it fails
+            retry_base_delay: Delay before the first retry; doubles on each attempt
+            concurrency_limits: Running jobs allowed per group, keyed by group
+                or group prefix ("llm" also covers "llm:openai", ...)
+        """
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.concurrency_limits = concurrency_limits or {}
+        self._handlers: Dict[str, JobHandler] = {}
+        self._running: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that runs jobs of this kind."""
+        self._handlers[kind] = handler
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        preview_id: Optional[str] = None,
+        concurrency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> str:
+        """
+        Store a new job and wake the dispatcher.
+
+        Args:
+            kind: Registered job kind
+            payload: JSON-serializable handler arguments
+            preview_id: Preview whose websocket clients receive job events
+            concurrency_key: Concurrency group (defaults to the kind)
+            max_attempts: Attempts before the job fails (defaults to the queue's)
+
+        Returns:
+            The new job's ID
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = uuid.uuid4().hex[:12]
+        now = _now()
+        async with pool.write() as db:
+            await db.execute("""
+                INSERT INTO jobs
+                (job_id, kind, preview_id, payload, concurrency_key, max_attempts, run_after, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                job_id,
+                kind,
+                preview_id,
+                json.dumps(payload),
+                concurrency_key or kind,
+                max_attempts or self.max_attempts,
+                time.time(),
+                now,
+                now
+            ))
+        await self._emit(job_id, kind, preview_id, "queued")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's stored state, or None."""
+        async with pool.read() as db:
+            async with db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)) as cursor:
+                row = await cursor.fetchone()
+        return _row_to_dict(row) if row else None
+
+    async def list_jobs(self, preview_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent jobs, optionally of a single preview."""
+        where = "WHERE preview_id = ?" if preview_id else ""
+        params = [preview_id] if preview_id else []
+        async with pool.read() as db:
+            async with db.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?",
+                params + [limit]
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    async def start(self) -> None:
+        """Requeue jobs interrupted by a previous shutdown and start dispatching."""
+        if self._dispatcher is not None:
+            return
+        cutoff = datetime.utcfromtimestamp(time.time() - JOB_RETENTION_DAYS * 86400).isoformat()
+        async with pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'",
+                (_now(),)
+            )
+            requeued = cursor.rowcount
+            await db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (cutoff,)
+            )
+        if requeued:
+            print(f"🔁 Requeued {requeued} interrupted job(s)")
+
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        """Stop dispatching; running jobs are requeued for the next start."""
+        dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None:
+            dispatcher.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*([dispatcher] if dispatcher else []), *tasks, return_exceptions=True)
+        self._wakeup = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Running jobs per concurrency group."""
+        return {"running": len(self._tasks), "groups": {k: v for k, v in self._running.items() if v}}
+
+    # Dispatching
+
+    def _limit(self, concurrency_key: str) -> int:
+        group = concurrency_key.split(":", 1)[0]
+        return self.concurrency_limits.get(concurrency_key, self.concurrency_limits.get(group, self.workers))
+
+    def _saturated(self) -> List[str]:
+        return [key for key, count in self._running.items() if count >= self._limit(key)]
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                while len(self._tasks) < self.workers:
+                    job = await self._claim()
+                    if job is None:
+                        break
+                    self._start_job(job)
+                delay = await self._next_due_in()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Job dispatcher error: {e}")
+                delay = 1.0
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically mark the next due job of a non-saturated group as running."""
+        saturated = self._saturated()
+        exclude = f"AND concurrency_key NOT IN ({', '.join('?' * len(saturated))})" if saturated else ""
+        async with pool.write() as db:
+            async with db.execute(f"""
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1, updated_at = ?
+                WHERE job_id = (
+                    SELECT job_id FROM jobs
+                    WHERE status = 'queued' AND run_after <= ? {exclude}
+                    ORDER BY run_after
+                    LIMIT 1
+                )
+                RETURNING *
+            """, [_now(), time.time(), *saturated]) as cursor:
+                row = await cursor.fetchone()
+        return _row_to_dict(row) if row else None
+
+    async def _next_due_in(self) -> Optional[float]:
+        """Seconds until the next queued job of a non-saturated group is due (None: none queued)."""
+        saturated = self._saturated()
+        exclude = f"AND concurrency_key NOT IN ({', '.join('?' * len(saturated))})" if saturated else ""
+        async with pool.read() as db:
+            async with db.execute(
+                f"SELECT MIN(run_after) FROM jobs WHERE status = 'queued' {exclude}",
+                saturated
+            ) as cursor:
+                (run_after,) = await cursor.fetchone()
+        if run_after is None:
+            return None
+        return max(0.0, run_after - time.time())
+
+    def _start_job(self, row: Dict[str, Any]) -> None:
+        key = row["concurrency_key"]
+        self._running[key] = self._running.get(key, 0) + 1
+        task = asyncio.create_task(self._run(row))
+        self._tasks.add(task)
+
+        def finished(task: asyncio.Task) -> None:
+            self._tasks.discard(task)
+            self._running[key] -= 1
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+        task.add_done_callback(finished)
+
+    async def _run(self, row: Dict[str, Any]) -> None:
+        job = Job(
+            job_id=row["job_id"],
+            kind=row["kind"],
+            preview_id=row["preview_id"],
+            payload=row["payload"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            _report=self._report,
+            _save=self._save_payload
+        )
+        await self._emit(job.job_id, job.kind, job.preview_id, "running", attempt=job.attempts)
+
+        try:
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job kind '{job.kind}'")
+            result = await handler(job)
+        except asyncio.CancelledError:
+            # Shutdown: hand the attempt back and run the job again next start
+            await self._finish(job.job_id, "queued", attempts=job.attempts - 1)
+            raise
+        except Exception as e:
+            retry = not isinstance(e, PermanentJobError) and job.attempts < job.max_attempts
+            if retry:
+                delay = min(MAX_RETRY_DELAY, self.retry_base_delay * 2 ** (job.attempts - 1))
+                delay *= random.uniform(0.5, 1.5)
+                print(f"⚠️ Job {job.job_id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.1f}s: {e}")
+                await self._finish(job.job_id, "queued", error=str(e), run_after=time.time() + delay)
+                await self._emit(job.job_id, job.kind, job.preview_id, "queued",
+                                 attempt=job.attempts, error=str(e), retry_in=round(delay, 1))
+            else:
+                print(f"❌ Job {job.job_id} ({job.kind}) failed: {e}")
+                if not isinstance(e, PermanentJobError):
+                    traceback.print_exc()
+                await self._finish(job.job_id, "failed", error=str(e))
+                await self._emit(job.job_id, job.kind, job.preview_id, "failed",
+                                 attempt=job.attempts, error=str(e))
+            return
+
+        await self._finish(job.job_id, "succeeded", result=result)
+        await self._emit(job.job_id, job.kind, job.preview_id, "succeeded", attempt=job.attempts, result=result)
+
+    async def _finish(self, job_id: str, status: str, **fields: Any) -> None:
+        assignments = ["status = ?", "updated_at = ?"]
+        params: List[Any] = [status, _now()]
+        if "error" in fields:
+            assignments.append("error = ?")
+            params.append(fields["error"])
+        if "result" in fields:
+            assignments.append("result = ?")
+            params.append(json.dumps(fields["result"]))
+        if "run_after" in fields:
+            assignments.append("run_after = ?")
+            params.append(fields["run_after"])
+        if "attempts" in fields:
+            assignments.append("attempts = ?")
+            params.append(fields["attempts"])
+        async with pool.write() as db:
+            await db.execute(f"UPDATE jobs SET {', '.join(assignments)} WHERE job_id = ?", params + [job_id])
+
+    async def _save_payload(self, job: Job) -> None:
+        async with pool.write() as db:
+            await db.execute(
+                "UPDATE jobs SET payload = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(job.payload), _now(), job.job_id)
+            )
+
+    async def _report(self, job: Job, progress: Dict[str, Any]) -> None:
+        async with pool.write() as db:
+            await db.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(progress), _now(), job.job_id)
+            )
+        await self._emit(job.job_id, job.kind, job.preview_id, "running", attempt=job.attempts, progress=progress)
+
+    async def _emit(self, job_id: str, kind: str, preview_id: Optional[str], status: str, **details: Any) -> None:
+        if preview_id is None:
+            return
+        await manager.send_update(
+            preview_id,
+            {"type": "job", "job_id": job_id, "kind": kind, "status": status, **details},
+            key=f"job:{job_id}"
+        )
+
+
+# Global job queue instance
+jobs = JobQueue(
+    workers=settings.job_workers,
+    max_attempts=settings.job_max_attempts,
+    retry_base_delay=settings.job_retry_base_delay,
+    concurrency_limits={
+        "llm": settings.job_llm_concurrency,
+        "supabase": settings.job_publish_concurrency,
+    }
+)
@@ -0,0 +1,53 @@
+"""
+JSON Patch (RFC 6902) generation.
+
+make_patch() produces the add/remove/replace operations that turn one JSON
+document into another. Objects are diffed key by key and equal-length arrays
+element by element; anything else that differs is replaced whole.
+"""
+
+from typing import Any, Dict, List
+
+
+Patch = List[Dict[str, Any]]
+
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> Patch:
+    """
+    Operations turning old into new.
+
+    Args:
+        old: Source JSON value
+        new: Target JSON value
+        path: JSON Pointer of the values (empty for the document root)
+
+    Returns:
+        RFC 6902 operations; empty if the values are equal
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: Patch = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            ops.extend(make_patch(old_item, new_item, f"{path}/{i}"))
+        return ops
+
+    # type() check keeps True and 1 (equal in Python) apart
+    if type(old) is not type(new) or old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
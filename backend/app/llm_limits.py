@@ -0,0 +1,428 @@
+"""
+Per-provider concurrency and rate limiting for LLM calls.
+
+Every call to a provider goes through its ProviderLimiter, which combines:
+
+- an adaptive concurrency limit (AIMD): each successful call raises the
+  limit by 1/limit, so about one slot per round of calls, up to a
+  ceiling. A 429/overloaded response halves it, as does a call that is
+  much slower per token than usual (cut by 10%). A burst of failures from
+  the same round only counts once.
+- a tokens-per-minute budget (a TokenBucket from app/rate_limit.py charged
+  with the estimated prompt tokens plus the output allowance; the unused
+  part of the allowance is returned when the response arrives)
+- retries with exponential backoff and full jitter for rate limits,
+  overload, server errors and dropped connections, honouring Retry-After.
+  A Retry-After pauses the whole provider, not just the failing call.
+
+Each limiter also tracks the provider's health for failover: a circuit
+breaker that opens after repeated failed calls, and recent call latencies
+whose p95 decides when a call is hedged to the next provider.
+"""
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from .config import settings
+from .rate_limit import TokenBucket, parse_retry_after
+
+
+T = TypeVar("T")
+
+# Statuses that mean "too many requests / overloaded": back off and shrink the limit
+OVERLOAD_STATUSES = {429, 503, 529}
+# Other statuses worth retrying
+RETRY_STATUSES = OVERLOAD_STATUSES | {408, 500, 502, 504}
+# Exceptions without a status that are retried (the SDKs' connection and timeout errors)
+RETRY_EXCEPTIONS = {
+    "APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout",
+    "RemoteProtocolError", "TimeoutError", "DeadlineExceeded", "ServiceUnavailable",
+}
+
+RETRY_BASE_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+# Rough tokens per character of English text and JSON
+CHARS_PER_TOKEN = 4
+
+# Successful call durations kept per provider, and how many are needed for a p95
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 20
+
+# A call this many times slower per token than the running average counts as congestion
+LATENCY_TOLERANCE = 3.0
+LATENCY_EWMA_ALPHA = 0.1
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def classify_error(error: BaseException) -> Tuple[bool, bool, Optional[float]]:
+    """
+    Decide how to handle a failed provider call.
+
+    Returns:
+        (retryable, overloaded, Retry-After seconds or None)
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status is None and isinstance(getattr(error, "code", None), int):
+        # google.api_core exceptions carry the HTTP status as `code`
+        status = error.code
+
+    retry_after = None
+    headers = getattr(response, "headers", None)
+    if headers is not None and headers.get("retry-after"):
+        retry_after = parse_retry_after(headers.get("retry-after"))
+
+    if status is not None:
+        return status in RETRY_STATUSES, status in OVERLOAD_STATUSES, retry_after
+    if type(error).__name__ == "ResourceExhausted":
+        return True, True, retry_after
+    if isinstance(error, asyncio.TimeoutError) or type(error).__name__ in RETRY_EXCEPTIONS:
+        return True, False, retry_after
+    return False, False, None
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted by additive increase / multiplicative decrease."""
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        """
+        Args:
+            initial: Starting limit
+            maximum: The limit never grows past this
+            minimum: The limit never shrinks below this
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._paused_until = 0.0
+        self._decreased_at = 0.0
+        self._latency: Optional[float] = None
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold one slot for the duration of a call; yields the start time."""
+        await self._acquire()
+        try:
+            yield time.monotonic()
+        finally:
+            self._release()
+
+    def pause(self, seconds: float) -> None:
+        """Start no new calls for `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + min(seconds, MAX_RETRY_DELAY))
+
+    def on_success(self, started: float, tokens: int) -> None:
+        """Grow the limit, or shrink it if the call was unusually slow per token."""
+        per_token = (time.monotonic() - started) / max(1, tokens)
+        average = self._latency
+        self._latency = per_token if average is None else average + LATENCY_EWMA_ALPHA * (per_token - average)
+        if average is not None and per_token > LATENCY_TOLERANCE * average:
+            self._decrease(started, 0.9)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_overload(self, started: float) -> None:
+        """Halve the limit after a 429/overloaded response."""
+        self._decrease(started, 0.5)
+
+    def _decrease(self, started: float, factor: float) -> None:
+        # Calls started before the last decrease saw the old limit; their
+        # failures are the same congestion event and must not cut it again
+        if started < self._decreased_at:
+            return
+        self.limit = max(self.minimum, self.limit * factor)
+        self._decreased_at = time.monotonic()
+
+    async def _acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+        else:
+            # Queue; _wake hands over a freed slot directly, so a newcomer can
+            # never take it between the wakeup and this task running
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Handed a slot, then cancelled before using it: pass it on
+                    self._release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+
+        # Wait out a pause holding the slot, keeping this call's place in line
+        while True:
+            wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                return
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._release()
+                raise
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        # Hand each free slot to the longest waiter
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class CircuitBreaker:
+    """Closed, then open after repeated failures; half-open lets one probe call through."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Args:
+            failure_threshold: Consecutive failed calls that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe call
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may start now (claims the probe when half-open)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """Give back a probe that ended without an outcome (e.g. cancelled)."""
+        self._probing = False
+
+
+class ProviderLimiter:
+    """Concurrency, token budget and retries for one LLM provider."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        tokens_per_minute: int = 0,
+        max_retries: int = 4,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Args:
+            name: Provider name, used in log messages
+            max_concurrency: Ceiling of the adaptive concurrency limit
+            tokens_per_minute: Token budget (0 = unlimited)
+            max_retries: Retries of a failed call before giving up
+            breaker: Health of the provider (default: opens after 5 failures for 30s)
+        """
+        self.name = name
+        self.concurrency = AdaptiveConcurrency(initial=max(1, max_concurrency // 2), maximum=max_concurrency)
+        self.budget = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker(5, 30.0)
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.retries = 0
+        self.rate_limited = 0
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        prompt_tokens: int,
+        max_output_tokens: int,
+        output_tokens: Callable[[T], int] = lambda result: 0,
+        can_retry: Callable[[], bool] = lambda: True
+    ) -> T:
+        """
+        Run a provider call within the limits, retrying transient failures.
+
+        Args:
+            fn: Makes one attempt of the call
+            prompt_tokens: Estimated prompt size
+            max_output_tokens: Output allowance reserved from the budget
+            output_tokens: Tokens actually produced by a result
+            can_retry: Return False once retrying is no longer safe (e.g. a
+                stream already delivered output)
+
+        Returns:
+            The result of the first successful attempt
+        """
+        started = time.monotonic()
+        try:
+            result = await self._call(fn, prompt_tokens, max_output_tokens, output_tokens, can_retry)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        self.latencies.append(time.monotonic() - started)
+        return result
+
+    def p95_latency(self) -> Optional[float]:
+        """95th percentile of recent successful call durations (None until enough calls)."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    async def _call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        prompt_tokens: int,
+        max_output_tokens: int,
+        output_tokens: Callable[[T], int],
+        can_retry: Callable[[], bool]
+    ) -> T:
+        attempt = 0
+        while True:
+            reserved = prompt_tokens + max_output_tokens
+            if self.budget is not None:
+                reserved = min(reserved, self.budget.burst)
+                await self.budget.acquire(reserved)
+
+            retry_after = None
+            async with self.concurrency.slot() as started:
+                try:
+                    result = await fn()
+                except Exception as e:
+                    retryable, overloaded, retry_after = classify_error(e)
+                    if overloaded:
+                        self.rate_limited += 1
+                        self.concurrency.on_overload(started)
+                        if retry_after:
+                            self.concurrency.pause(retry_after)
+                    if not retryable or attempt >= self.max_retries or not can_retry():
+                        raise
+                    error = e
+                else:
+                    used = output_tokens(result)
+                    self.concurrency.on_success(started, used)
+                    if self.budget is not None:
+                        self.budget.release(max(0, reserved - prompt_tokens - used))
+                    return result
+
+            delay = random.uniform(0, min(MAX_RETRY_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            delay = max(delay, retry_after or 0.0)
+            attempt += 1
+            self.retries += 1
+            print(f"⚠️ {self.name} call failed ({error}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit, calls in flight, health and retry counters."""
+        p95 = self.p95_latency()
+        return {
+            "circuit": self.breaker.state,
+            "p95_latency": round(p95, 2) if p95 is not None else None,
+            "limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+
+
+class LLMLimiter:
+    """Registry of provider limiters, created on first use."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        tokens_per_minute: Dict[str, int],
+        max_retries: int,
+        breaker_failures: int = 5,
+        breaker_cooldown: float = 30.0
+    ):
+        """
+        Args:
+            max_concurrency: Concurrency ceiling of every provider
+            tokens_per_minute: {provider: budget}; missing or 0 means unlimited
+            max_retries: Retries per call
+            breaker_failures: Failed calls in a row that open a provider's circuit
+            breaker_cooldown: Seconds before an open circuit lets a probe call through
+        """
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self._providers: Dict[str, ProviderLimiter] = {}
+
+    def for_provider(self, provider: str) -> ProviderLimiter:
+        """Return the limiter of a provider."""
+        limiter = self._providers.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(
+                provider,
+                self.max_concurrency,
+                self.tokens_per_minute.get(provider, 0),
+                self.max_retries,
+                CircuitBreaker(self.breaker_failures, self.breaker_cooldown)
+            )
+            self._providers[provider] = limiter
+        return limiter
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Stats of every provider used so far."""
+        return {name: limiter.stats() for name, limiter in self._providers.items()}
+
+    def reset(self) -> None:
+        """Drop all limiters (their token buckets hold event-loop bound locks)."""
+        self._providers = {}
+
+
+# Global limiter shared by all LLM calls
+llm_limiter = LLMLimiter(
+    max_concurrency=settings.llm_max_concurrency,
+    tokens_per_minute={
+        'openai': settings.openai_tpm,
+        'anthropic': settings.anthropic_tpm,
+        'gemini': settings.gemini_tpm,
+    },
+    max_retries=settings.llm_max_retries,
+    breaker_failures=settings.llm_breaker_failures,
+    breaker_cooldown=settings.llm_breaker_cooldown
+)
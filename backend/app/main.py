@@ -10,13 +10,17 @@ import webbrowser
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 
+from .cache import cache
+from .clients import clients
+from .compression import CompressionMiddleware
 from .config import settings
-from .database import init_database, get_preview
+from .database import init_database, close_database, get_preview, get_preview_patches
+from .http_cache import ImmutableStaticFiles, file_response
+from .jobs import jobs
+from .llm_limits import llm_limiter
 from .routers import preview
 from .websocket import manager
 
@@ -32,10 +36,16 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.cache_dir, exist_ok=True)
     os.makedirs(settings.sessions_dir, exist_ok=True)
     
+    # Resume queued and interrupted background jobs
+    await jobs.start()
+    
     yield
     
-    # Shutdown: Cleanup if needed
-    pass
+    # Shutdown: Requeue running jobs, then close pooled HTTP/SDK clients and
+    # database connections
+    await jobs.stop()
+    await clients.aclose()
+    await close_database()
 
 
 app = FastAPI(
@@ -52,8 +62,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
+# Compress JSON/text responses; static files use precompressed siblings
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
 # Include routers
 app.include_router(preview.router, prefix="/api", tags=["preview"])
 
@@ -63,15 +77,16 @@ FRONTEND_BUILD_PATH = Path(__file__).parent.parent.parent / "frontend" / "dist"
 TEMPLATES_PATH = Path(__file__).parent / "templates"
 
 if FRONTEND_BUILD_PATH.exists():
-    app.mount("/assets", StaticFiles(directory=FRONTEND_BUILD_PATH / "assets"), name="assets")
+    # Vite puts a content hash in every asset file name
+    app.mount("/assets", ImmutableStaticFiles(directory=FRONTEND_BUILD_PATH / "assets"), name="assets")
     
     @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
+    async def serve_frontend(full_path: str, request: Request):
         """Serve the React frontend for all non-API routes."""
         file_path = FRONTEND_BUILD_PATH / full_path
         if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(FRONTEND_BUILD_PATH / "index.html")
+            return file_response(request, file_path)
+        return file_response(request, FRONTEND_BUILD_PATH / "index.html")
 else:
     # Development fallback: serve simple HTML template
     @app.get("/")
@@ -80,18 +95,25 @@ else:
         return {"message": "TopTierModels API", "docs": "/docs", "previews": "/api/previews"}
     
     @app.get("/preview/{preview_id}")
-    async def preview_page(preview_id: str):
+    async def preview_page(preview_id: str, request: Request):
         """Serve the standalone preview template."""
         template_file = TEMPLATES_PATH / "preview.html"
         if template_file.exists():
-            return FileResponse(template_file)
+            return file_response(request, template_file)
         return {"error": "Preview template not found", "api_endpoint": f"/api/preview/{preview_id}"}
 
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "version": "1.0.0"}
+    return {
+        "status": "healthy",
+        "version": "1.0.0",
+        "cache": cache.stats(),
+        "websockets": manager.stats(),
+        "jobs": jobs.stats(),
+        "llm": llm_limiter.stats()
+    }
 
 
 @app.websocket("/ws/{preview_id}")
@@ -99,18 +121,35 @@ async def websocket_endpoint(websocket: WebSocket, preview_id: str):
     """WebSocket endpoint for real-time preview updates."""
     await manager.connect(websocket, preview_id)
     try:
-        # Send initial preview data
-        preview_data = await get_preview(preview_id)
-        if preview_data:
-            await websocket.send_json({"type": "initial", "data": preview_data})
+        # A reconnecting client passes ?since=<version it has> and only gets
+        # the patches it missed, if they are still in the history. Messages
+        # go through the connection's send queue, so they stay ordered with
+        # updates.
+        since = websocket.query_params.get("since", "")
+        changes = await get_preview_patches(preview_id, int(since)) if since.isdigit() else None
+        if changes is not None:
+            version, patches = changes
+            for patch in patches:
+                await manager.send(websocket, preview_id, {"type": "patch", **patch})
+            await manager.send(websocket, preview_id, {"type": "resumed", "version": version})
+        else:
+            preview_data = await get_preview(preview_id)
+            if preview_data:
+                await manager.send(
+                    websocket,
+                    preview_id,
+                    {"type": "initial", "version": preview_data["version"], "data": preview_data}
+                )
         
         # Keep connection alive and handle messages
         while True:
             data = await websocket.receive_text()
             # Echo back or handle specific commands
             if data == "ping":
-                await websocket.send_json({"type": "pong"})
+                await manager.send(websocket, preview_id, {"type": "pong"}, key="pong")
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, preview_id)
 
 
@@ -128,5 +167,6 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.local_server_host,
         port=settings.local_server_port,
-        reload=True
+        reload=True,
+        ws_per_message_deflate=True
     )
@@ -12,6 +12,7 @@ from .schemas import (
     PreviewSession,
     PublishRequest,
     PublishResponse,
+    JobAccepted,
 )
 
 __all__ = [
@@ -24,4 +25,5 @@ __all__ = [
     "PreviewSession",
     "PublishRequest",
     "PublishResponse",
+    "JobAccepted",
 ]
@@ -130,3 +130,9 @@ class PublishResponse(BaseModel):
     live_url: Optional[str] = None
     model_id: Optional[str] = None
     article_id: Optional[str] = None
+
+
+class JobAccepted(BaseModel):
+    """Response for work queued as a background job."""
+    job_id: str
+    status: str = "queued"
@@ -0,0 +1,163 @@
+"""
+Per-host rate limiting for outbound HTTP requests.
+
+Every request sent through the shared clients in app/clients.py passes a
+token bucket for its host. Buckets are shared by all concurrent tasks, and a
+429/503 with Retry-After pauses the whole host before the request is retried.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from .config import settings
+
+
+# Statuses that mean "slow down" and are retried after Retry-After
+RETRY_STATUSES = {429, 503}
+DEFAULT_RETRY_AFTER = 5.0
+MAX_RETRY_AFTER = 120.0
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Sustained requests per second
+            burst: Requests allowed back-to-back after an idle period
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available, then take them."""
+        # The lock makes waiters queue in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def release(self, tokens: float) -> None:
+        """Return tokens taken by acquire() that turned out not to be needed."""
+        self._refill(time.monotonic())
+        self._tokens = min(self.burst, self._tokens + tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Block the bucket for `seconds` (e.g. from a Retry-After header)."""
+        until = time.monotonic() + min(seconds, MAX_RETRY_AFTER)
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0.0
+            self._updated = until
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+
+class HostRateLimiter:
+    """Registry of token buckets keyed by host (subdomains share their parent's bucket)."""
+
+    def __init__(self, limits: Dict[str, Tuple[float, int]]):
+        """
+        Args:
+            limits: {domain: (rate, burst)}. Hosts not covered are not limited.
+        """
+        self._limits = limits
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket_for(self, host: str) -> Optional[TokenBucket]:
+        """Return the bucket for a host, or None if the host is unlimited."""
+        domain = self._match(host)
+        if domain is None:
+            return None
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            rate, burst = self._limits[domain]
+            bucket = TokenBucket(rate, burst)
+            self._buckets[domain] = bucket
+        return bucket
+
+    def reset(self) -> None:
+        """Drop all buckets (they hold event-loop bound locks)."""
+        self._buckets = {}
+
+    def _match(self, host: str) -> Optional[str]:
+        for domain in self._limits:
+            if host == domain or host.endswith(f".{domain}"):
+                return domain
+        return None
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that waits on the host's bucket and retries on 429/503."""
+
+    def __init__(
+        self,
+        limiter: HostRateLimiter,
+        transport: httpx.AsyncBaseTransport,
+        max_retries: int = 3
+    ):
+        self._limiter = limiter
+        self._transport = transport
+        self._max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = self._limiter.bucket_for(request.url.host)
+        attempt = 0
+        while True:
+            if bucket is not None:
+                await bucket.acquire()
+
+            response = await self._transport.handle_async_request(request)
+            if bucket is None or response.status_code not in RETRY_STATUSES or attempt >= self._max_retries:
+                return response
+
+            # Pause every task talking to this host, then retry
+            bucket.pause(parse_retry_after(response.headers.get('retry-after')))
+            await response.aclose()
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Global limiter shared by all pooled clients
+rate_limiter = HostRateLimiter({
+    'huggingface.co': (settings.huggingface_rate_limit, settings.huggingface_burst),
+})
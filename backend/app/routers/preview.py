@@ -2,42 +2,123 @@
 Preview router - API endpoints for local preview functionality.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional
 
 from ..database import (
     get_preview,
+    get_preview_patches,
+    get_preview_version,
     save_preview,
     list_previews,
+    get_previews_version,
+    search_previews,
     delete_preview,
     update_preview_status
 )
-from ..models import PreviewSession, PublishRequest, PublishResponse
+from ..http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from ..jobs import Job, PermanentJobError, jobs
+from ..models import JobAccepted, PreviewSession, PublishRequest, PublishResponse
+from ..websocket import manager
 
 
 router = APIRouter()
 
+# Sections POST /regenerate can rewrite
+REGENERABLE_SECTIONS = ("article", "linkedin")
+
+
+async def push_changes(preview_id: str, since: int) -> None:
+    """
+    Send the patches after version `since` to the preview's websocket clients.
+    
+    Clients apply {"type": "patch", "version", "ops"} messages in order; one
+    that misses a version reconnects with ?since= and catches up.
+    """
+    changes = await get_preview_patches(preview_id, since)
+    if changes is None:
+        return
+    _, patches = changes
+    for patch in patches:
+        await manager.send_update(preview_id, {"type": "patch", **patch})
+
 
 @router.get("/previews")
-async def get_all_previews():
-    """List all preview sessions."""
-    previews = await list_previews()
-    return {"previews": previews}
+async def get_all_previews(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    tier: Optional[str] = None,
+    order_by: str = "last_modified",
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """
+    List preview sessions, one page at a time.
+    
+    Pass the returned next_cursor to fetch the following page. The total
+    number of matching previews is sent in the X-Total-Count header.
+    """
+    count, latest = await get_previews_version(category=category, tier=tier)
+    etag = make_etag("previews", count, latest, category, tier, order_by, limit, cursor, fields)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    field_list = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    try:
+        previews, next_cursor = await list_previews(
+            category=category,
+            tier=tier,
+            order_by=order_by,
+            limit=limit,
+            cursor=cursor,
+            fields=field_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response.headers["X-Total-Count"] = str(count)
+    set_cache_headers(response, etag)
+    return {"previews": previews, "next_cursor": next_cursor}
+
+
+@router.get("/previews/search")
+async def search_all_previews(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Full-text search over previews, best matches first."""
+    results = await search_previews(q, limit)
+    return {"query": q, "results": results}
 
 
 @router.get("/preview/{preview_id}")
-async def get_preview_data(preview_id: str):
-    """Get a specific preview session."""
+async def get_preview_data(preview_id: str, request: Request, response: Response):
+    """
+    Get a specific preview session.
+    
+    Conditional: a request whose If-None-Match still matches the stored
+    version gets a 304 without the preview being loaded.
+    """
+    if request.headers.get("if-none-match"):
+        version = await get_preview_version(preview_id)
+        if version is not None:
+            etag = make_etag("preview", preview_id, version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+    
     preview = await get_preview(preview_id)
     if not preview:
         raise HTTPException(status_code=404, detail="Preview not found")
+    set_cache_headers(response, make_etag("preview", preview_id, preview["last_modified"]))
     return preview
 
 
 @router.post("/preview")
 async def create_preview(session: PreviewSession):
     """Create or update a preview session."""
-    success = await save_preview(
+    version = await save_preview(
         preview_id=session.preview_id,
         model_data=session.model_data.model_dump(),
         article_data=session.article_data.model_dump(),
@@ -45,8 +126,9 @@ async def create_preview(session: PreviewSession):
         scores_data=session.scores_data.model_dump(),
         images=session.images
     )
-    if success:
-        return {"message": "Preview saved successfully", "preview_id": session.preview_id}
+    if version:
+        await push_changes(session.preview_id, version - 1)
+        return {"message": "Preview saved successfully", "preview_id": session.preview_id, "version": version}
     raise HTTPException(status_code=500, detail="Failed to save preview")
 
 
@@ -59,117 +141,216 @@ async def remove_preview(preview_id: str):
     raise HTTPException(status_code=404, detail="Preview not found")
 
 
-@router.post("/publish", response_model=PublishResponse)
-async def publish_preview(request: PublishRequest):
-    """Publish a preview to Supabase."""
-    preview = await get_preview(request.preview_id)
-    if not preview:
-        raise HTTPException(status_code=404, detail="Preview not found")
+async def set_status(preview_id: str, status: str, published_data: Optional[dict] = None) -> None:
+    """Update a preview's publication status and push the change."""
+    version = await update_preview_status(preview_id, status, published_data)
+    if version:
+        await push_changes(preview_id, version - 1)
+
+
+# Background jobs
+
+async def run_publish(job: Job) -> dict:
+    """
+    Job handler: upload a preview to Supabase, then LinkedIn and Netlify.
     
-    # Update status to pending
-    await update_preview_status(request.preview_id, "pending")
+    Each finished step is checkpointed in the job's payload, so a retry or a
+    restart mid-publish resumes after it instead of uploading or posting to
+    LinkedIn a second time.
+    """
+    preview_id = job.preview_id
+    preview = await get_preview(preview_id)
+    if not preview:
+        raise PermanentJobError("Preview not found")
     
     try:
         # Import uploader here to avoid circular imports
         from ..services.uploader import upload_to_supabase
+        from ..config import settings
         
-        result = await upload_to_supabase(
-            preview_id=request.preview_id,
-            model_data=preview["model_data"],
-            article_data=preview["article_data"],
-            linkedin_data=preview["linkedin_data"],
-            scores_data=preview["scores_data"],
-            images=preview["images"]
-        )
+        result = job.payload.get("supabase")
+        if result is None:
+            await job.progress("uploading")
+            result = await upload_to_supabase(
+                preview_id=preview_id,
+                model_data=preview["model_data"],
+                article_data=preview["article_data"],
+                linkedin_data=preview["linkedin_data"],
+                scores_data=preview["scores_data"],
+                images=preview["images"]
+            )
+            await job.checkpoint(supabase=result)
         
-        # Also publish to LinkedIn if configured
         # Also publish to LinkedIn if configured and enabled
-        linkedin_result = None
-        from ..config import settings
-        
-        if settings.enable_linkedin_publishing:
+        if "linkedin" in job.payload:
+            linkedin_result = job.payload["linkedin"]
+        elif settings.enable_linkedin_publishing:
+            linkedin_result = None
             try:
                 from ..services.linkedin_publisher import publish_to_linkedin
                 linkedin_content = preview["linkedin_data"].get("content", "")
                 if linkedin_content:
+                    await job.progress("linkedin")
                     linkedin_result = await publish_to_linkedin(linkedin_content)
             except Exception as linkedin_error:
                 # Don't fail the whole publish if LinkedIn fails
                 linkedin_result = {"success": False, "error": str(linkedin_error)}
+            await job.checkpoint(linkedin=linkedin_result)
         else:
              linkedin_result = {"success": False, "message": "Skipped (ENABLE_LINKEDIN_PUBLISHING=False)"}
         
         # Update status to published
-        await update_preview_status(
-            request.preview_id, 
-            "published",
-            {
-                "model_id": result.get("model_id"),
-                "article_id": result.get("article_id"),
-                "linkedin_post": linkedin_result
-            }
-        )
+        await set_status(preview_id, "published", {
+            "model_id": result.get("model_id"),
+            "article_id": result.get("article_id"),
+            "linkedin_post": linkedin_result
+        })
         
-        # Trigger Netlify rebuild if requested
-        if request.trigger_netlify_rebuild:
-            from ..services.uploader import trigger_netlify_rebuild
+    except Exception:
+        # Only the last attempt marks the preview as failed
+        if job.attempts >= job.max_attempts:
+            await set_status(preview_id, "failed")
+        raise
+    
+    message = "Published successfully" + (" (LinkedIn: " + str(linkedin_result.get("success", False)) + ")" if linkedin_result else "")
+    
+    # Trigger Netlify rebuild if requested. The content is already live, so a
+    # failed trigger is reported instead of failing (and retrying) the job.
+    if job.payload.get("trigger_netlify_rebuild"):
+        from ..services.uploader import trigger_netlify_rebuild
+        await job.progress("netlify")
+        try:
             await trigger_netlify_rebuild()
-        
-        return PublishResponse(
-            success=True,
-            message="Published successfully" + (" (LinkedIn: " + str(linkedin_result.get("success", False)) + ")" if linkedin_result else ""),
-            live_url=result.get("live_url"),
-            model_id=result.get("model_id"),
-            article_id=result.get("article_id")
-        )
-        
-    except Exception as e:
-        import traceback
-        print(f"❌ Error publishing: {e}")
-        traceback.print_exc()
-        await update_preview_status(request.preview_id, "failed")
-        raise HTTPException(status_code=500, detail=str(e))
+        except Exception as netlify_error:
+            print(f"⚠️ Netlify rebuild trigger failed: {netlify_error}")
+            message += f" (Netlify rebuild failed: {netlify_error})"
+    
+    return PublishResponse(
+        success=True,
+        message=message,
+        live_url=result.get("live_url"),
+        model_id=result.get("model_id"),
+        article_id=result.get("article_id")
+    ).model_dump()
 
 
-@router.post("/regenerate/{preview_id}/{section}")
-async def regenerate_section(preview_id: str, section: str):
-    """Regenerate a specific section of the preview."""
+async def run_regenerate(job: Job) -> dict:
+    """Job handler: regenerate one section of a preview with the LLM."""
+    preview_id = job.preview_id
+    section = job.payload["section"]
     preview = await get_preview(preview_id)
     if not preview:
-        raise HTTPException(status_code=404, detail="Preview not found")
+        raise PermanentJobError("Preview not found")
     
     # Import LLM processor
     from ..services.llm_processor import regenerate_content
     
+    async def forward_token(token: str) -> None:
+        await manager.send_update(preview_id, {"type": "token", "section": section, "data": token})
+    
+    async def forward_field(key: str, value) -> None:
+        await manager.send_update(
+            preview_id,
+            {"type": "field", "section": section, "key": key, "value": value},
+            key=f"field:{section}:{key}"
+        )
+    
     try:
         updated_content = await regenerate_content(
             section=section,
             model_data=preview["model_data"],
             current_article=preview["article_data"],
-            current_linkedin=preview["linkedin_data"]
-        )
-        
-        # Update the preview with regenerated content
-        if section == "article":
-            preview["article_data"] = updated_content
-        elif section == "linkedin":
-            preview["linkedin_data"] = updated_content
-        elif section == "scores":
-            preview["scores_data"] = updated_content
-        
-        await save_preview(
-            preview_id=preview_id,
-            model_data=preview["model_data"],
-            article_data=preview["article_data"],
-            linkedin_data=preview["linkedin_data"],
-            scores_data=preview["scores_data"],
-            images=preview["images"]
+            current_linkedin=preview["linkedin_data"],
+            on_token=forward_token,
+            on_field=forward_field
         )
-        
-        return {"message": f"Section '{section}' regenerated successfully", "content": updated_content}
-        
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        await manager.send_update(preview_id, {"type": "error", "section": section, "message": str(e)})
+        raise
+    
+    # Update the preview with regenerated content
+    preview[f"{section}_data"] = updated_content
+    
+    version = await save_preview(
+        preview_id=preview_id,
+        model_data=preview["model_data"],
+        article_data=preview["article_data"],
+        linkedin_data=preview["linkedin_data"],
+        scores_data=preview["scores_data"],
+        images=preview["images"]
+    )
+    if not version:
+        raise RuntimeError("Failed to save preview")
+    await push_changes(preview_id, version - 1)
+    
+    return {"section": section, "version": version}
+
+
+jobs.register("publish", run_publish)
+jobs.register("regenerate", run_regenerate)
+
+
+@router.post("/publish", response_model=JobAccepted, status_code=202)
+async def publish_preview(request: PublishRequest):
+    """
+    Queue a preview for publishing to Supabase.
+    
+    Returns the job ID at once; the job's progress and its PublishResponse
+    result arrive as {"type": "job", ...} messages on /ws/{preview_id} and
+    from GET /api/jobs/{job_id}.
+    """
+    if await get_preview_version(request.preview_id) is None:
+        raise HTTPException(status_code=404, detail="Preview not found")
+    
+    await set_status(request.preview_id, "pending")
+    job_id = await jobs.enqueue(
+        "publish",
+        {"trigger_netlify_rebuild": request.trigger_netlify_rebuild},
+        preview_id=request.preview_id,
+        concurrency_key="supabase"
+    )
+    return JobAccepted(job_id=job_id)
+
+
+@router.post("/regenerate/{preview_id}/{section}", response_model=JobAccepted, status_code=202)
+async def regenerate_section(preview_id: str, section: str):
+    """
+    Queue regeneration of a specific section of the preview.
+    
+    The LLM response is streamed: clients subscribed on /ws/{preview_id}
+    receive {"type": "token", "section", "data"} messages as text arrives,
+    {"type": "field", "section", "key", "value"} as each field of the JSON
+    response completes, then a "patch" with the changes once it is saved.
+    """
+    if section not in REGENERABLE_SECTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown section: {section}")
+    if await get_preview_version(preview_id) is None:
+        raise HTTPException(status_code=404, detail="Preview not found")
+    
+    job_id = await jobs.enqueue(
+        "regenerate",
+        {"section": section},
+        preview_id=preview_id,
+        # One group for all providers: with failover and hedging, a job's
+        # calls can go to any provider in the chain
+        concurrency_key="llm"
+    )
+    return JobAccepted(job_id=job_id)
+
+
+@router.get("/jobs")
+async def get_jobs(preview_id: Optional[str] = None, limit: int = Query(20, ge=1, le=100)):
+    """Most recent background jobs, optionally of one preview."""
+    return {"jobs": await jobs.list_jobs(preview_id=preview_id, limit=limit)}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and result of a background job."""
+    job = await jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
 # LinkedIn OAuth Endpoints
@@ -0,0 +1,380 @@
+"""
+Streaming JSON Module - Extracts the JSON object from LLM output.
+
+LLM responses wrap their JSON in prose or markdown fences and often break
+the syntax. StreamingJSONExtractor consumes the response chunk by chunk: it
+skips the prose before the object, stops at the matching '}' (or at a
+closing fence if the object was cut off), reports each top-level field as
+soon as its value closes, and repairs common defects on the way:
+
+- raw newlines/tabs and other control characters inside strings
+- invalid escapes such as "\\_" (kept as a literal backslash)
+- trailing commas and missing commas between top-level fields
+- Python literals True/False/None
+- truncated output (open strings and containers are closed)
+
+A '{' in the prose (e.g. "{placeholders}") starts a candidate that is
+rejected as soon as it cannot be a JSON object - before any field of it has
+been reported - and scanning resumes after that brace. An object inside a
+```json fence is preferred: one that follows a bare object replaces it.
+"""
+
+import json
+import re
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# Run of string characters that need no special handling
+_STRING_RUN = re.compile(r'[^"\\\x00-\x1f]+')
+
+# Opening of a JSON markdown fence (matched case-insensitively)
+_JSON_FENCE = '```json'
+
+# Characters of bare scalars (numbers, true/false/null)
+_TOKEN_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.+-')
+
+_VALID_ESCAPES = frozenset('"\\/bfnrtu')
+
+_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+
+def _escape_control(char: str) -> str:
+    return {'\n': '\\n', '\r': '\\r', '\t': '\\t'}.get(char, f'\\u{ord(char):04x}')
+
+
+class StreamingJSONExtractor:
+    """
+    Incremental extractor for the first JSON object in a text stream.
+
+    Example:
+        extractor = StreamingJSONExtractor()
+        for chunk in stream:
+            for key, value in extractor.feed(chunk):
+                print(key, value)
+        data = extractor.close()
+    """
+
+    def __init__(self):
+        # Chunks from stream offset _raw_start on, kept while the current
+        # candidate can still be rejected, for rescanning after its '{'
+        self._raw: Deque[str] = deque()
+        self._raw_start = 0
+        self._length = 0           # Characters fed so far
+        self._tail = ''            # Last characters of prose, to spot a ```json fence
+        self._after_fence = False  # A ```json fence opened before the current object
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget the current candidate object."""
+        self.fields: Dict[str, Any] = {}  # Top-level fields completed so far
+        self._out: List[str] = []         # Repaired JSON text
+        self._stack: List[str] = []       # Expected closers of open containers
+        self._started = False
+        self._start = 0                   # Offset of the candidate's '{' in the stream
+        self._fenced = False              # The candidate is inside a ```json fence
+        self._done = False
+        self._result: Optional[Dict[str, Any]] = None
+        self._in_string = False
+        self._escape = False
+        self._token: List[str] = []
+        self._pending_comma = False
+        # Position in the top-level object: 'key', 'colon', 'value' or 'comma'
+        self._expect = 'key'
+        self._key: Optional[str] = None
+        self._mark = 0  # Index in _out where the current top-level key/value starts
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level object has been closed."""
+        return self._done
+
+    @property
+    def _finished(self) -> bool:
+        # Nothing later in the stream replaces a fenced or cut-off object
+        return self._done and (self._fenced or bool(self._stack))
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk of text.
+
+        Returns:
+            (key, value) pairs of top-level fields completed by this chunk
+        """
+        emitted: List[Tuple[str, Any]] = []
+        if self._finished:
+            return emitted
+        self._raw.append(chunk)
+        text, offset, i = chunk, self._length, 0
+        self._length += len(chunk)
+
+        while True:
+            restart = self._scan(text, offset, i, emitted)
+            if restart is None:
+                break
+            # Rescan the stream from just after the rejected candidate's '{'
+            self._reset()
+            if restart < offset:
+                # The candidate began in an earlier chunk
+                text, offset = ''.join(self._raw), self._raw_start
+            i = restart - offset
+
+        # Keep only the text a later rejection can rescan: none once the
+        # candidate has a field or is closed, else from its '{' on
+        if not self._started or self.fields or self._done:
+            self._raw.clear()
+            self._raw_start = self._length
+        else:
+            while self._raw_start + len(self._raw[0]) <= self._start:
+                self._raw_start += len(self._raw.popleft())
+        return emitted
+
+    def _scan(self, chunk: str, offset: int, i: int, emitted: List[Tuple[str, Any]]) -> Optional[int]:
+        """
+        Parse chunk[i:], where chunk starts at stream offset `offset`.
+
+        Returns:
+            Offset to rescan from if the candidate object was rejected, else None
+        """
+        out = self._out
+        n = len(chunk)
+
+        while i < n:
+            if self._done:
+                if self._fenced or self._stack:
+                    break
+                # A ```json fence after a bare object: prefer the fenced one
+                i = self._skip_prose(chunk, i)
+                if self._after_fence:
+                    self._reset()
+                    out = self._out
+                continue
+
+            if self._in_string:
+                if not self._escape:
+                    run = _STRING_RUN.match(chunk, i)
+                    if run:
+                        out.append(run.group())
+                        i = run.end()
+                        continue
+                char = chunk[i]
+                i += 1
+                if self._escape:
+                    self._escape = False
+                    if char in _VALID_ESCAPES:
+                        out.append('\\' + char)
+                    elif char < ' ':
+                        out.append('\\\\' + _escape_control(char))
+                    else:
+                        out.append('\\\\' + char)
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    out.append('"')
+                    self._in_string = False
+                    self._end_string(emitted)
+                else:
+                    out.append(_escape_control(char))
+                continue
+
+            if not self._started:
+                brace = chunk.find('{', i)
+                self._see_prose(chunk[i:] if brace < 0 else chunk[i:brace])
+                if brace < 0:
+                    break
+                i = brace + 1
+                self._started = True
+                self._start = offset + brace
+                self._fenced, self._after_fence = self._after_fence, False
+                self._stack.append('}')
+                out.append('{')
+                continue
+
+            char = chunk[i]
+            i += 1
+
+            if (
+                not self.fields and self._expect == 'key' and len(self._stack) == 1
+                and not self._pending_comma and char not in '"},' and not char.isspace()
+            ):
+                # Prose in braces ("{placeholders}", "{0-100}"), not an object
+                return self._start + 1
+
+            if char in _TOKEN_CHARS:
+                if self._pending_comma:
+                    self._pending_comma = False
+                    out.append(',')
+                self._token.append(char)
+                continue
+            if self._token:
+                self._flush_token(emitted)
+
+            if char.isspace():
+                out.append(char)
+                continue
+
+            if char == ',':
+                self._pending_comma = True
+                if len(self._stack) == 1:
+                    self._expect = 'key'
+                continue
+            if self._pending_comma:
+                # Dropped when the container closes (trailing comma)
+                self._pending_comma = False
+                if char not in '}]':
+                    out.append(',')
+
+            depth = len(self._stack)
+            if char == '"':
+                if depth == 1:
+                    if self._expect == 'comma':
+                        out.append(',')
+                        self._expect = 'key'
+                    self._mark = len(out)
+                self._in_string = True
+                out.append('"')
+            elif char == ':':
+                out.append(':')
+                if depth == 1 and self._expect == 'colon':
+                    self._expect = 'value'
+                    self._mark = len(out)
+            elif char in '{[':
+                self._stack.append('}' if char == '{' else ']')
+                out.append(char)
+            elif char in '}]':
+                out.append(self._stack.pop())
+                if not self._stack:
+                    try:
+                        data = json.loads(''.join(out), strict=False)
+                    except ValueError:
+                        data = None
+                    if not isinstance(data, dict) and not self.fields:
+                        return self._start + 1
+                    self._result = data if isinstance(data, dict) else None
+                    self._done = True
+                elif len(self._stack) == 1 and self._expect == 'value':
+                    self._complete_value(emitted)
+            elif char == '`':
+                if not self.fields:
+                    return self._start + 1
+                # Closing markdown fence inside the object: the output was cut off
+                self._done = True
+            else:
+                out.append(char)
+
+        return None
+
+    def _see_prose(self, text: str) -> None:
+        window = self._tail + text
+        self._tail = window[-len(_JSON_FENCE):]
+        if _JSON_FENCE in window.lower():
+            self._after_fence = True
+
+    def _skip_prose(self, chunk: str, i: int) -> int:
+        """Scan prose after a closed bare object up to a ```json fence."""
+        window = self._tail + chunk[i:]
+        fence = window.lower().find(_JSON_FENCE)
+        if fence < 0:
+            self._tail = window[-len(_JSON_FENCE):]
+            return len(chunk)
+        self._after_fence = True
+        return i + fence + len(_JSON_FENCE) - len(self._tail)
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """
+        Finish the stream and return the parsed object.
+
+        Unterminated strings and containers are closed. If the result still
+        does not parse, the top-level fields completed so far are returned.
+
+        Returns:
+            Parsed object, or None if no object was found
+        """
+        if not self._started:
+            return None
+        if self._done and not self._stack:
+            return self._result if self._result is not None else (dict(self.fields) or None)
+
+        if self._in_string:
+            self._escape = False
+            self._in_string = False
+            if len(self._stack) == 1 and self._expect == 'key':
+                # Drop a half-written key
+                del self._out[self._mark:]
+            else:
+                self._out.append('"')
+                self._end_string([])
+        if self._token:
+            self._flush_token([])
+        self._pending_comma = False
+        if len(self._stack) == 1 and self._expect in ('colon', 'value') and self._mark == len(self._out):
+            # Cut off right after a key
+            self._out.append(':null' if self._expect == 'colon' else 'null')
+        while self._stack:
+            self._out.append(self._stack.pop())
+        self._done = True
+
+        try:
+            data = json.loads(''.join(self._out), strict=False)
+        except ValueError:
+            return dict(self.fields) or None
+        return data if isinstance(data, dict) else None
+
+    def _end_string(self, emitted: List[Tuple[str, Any]]) -> None:
+        if len(self._stack) != 1:
+            return
+        if self._expect == 'key':
+            self._key = json.loads(''.join(self._out[self._mark:]), strict=False)
+            self._expect = 'colon'
+            self._mark = len(self._out)
+        elif self._expect == 'value':
+            self._complete_value(emitted)
+
+    def _flush_token(self, emitted: List[Tuple[str, Any]]) -> None:
+        word = ''.join(self._token)
+        self._token = []
+        self._out.append(_LITERALS.get(word, word))
+        if len(self._stack) == 1 and self._expect == 'value':
+            self._complete_value(emitted)
+
+    def _complete_value(self, emitted: List[Tuple[str, Any]]) -> None:
+        self._expect = 'comma'
+        try:
+            value = json.loads(''.join(self._out[self._mark:]), strict=False)
+        except ValueError:
+            return
+        self.fields[self._key] = value
+        emitted.append((self._key, value))
+
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the JSON object from a complete LLM response.
+
+    Args:
+        text: Raw response (bare JSON, fenced JSON, or JSON inside prose)
+
+    Returns:
+        Parsed object, or None if the response contains no object
+
+    Examples:
+        >>> extract_json('Sure! I used {placeholders} here.\\n```json\\n{"title": "T", "slug": "t"}\\n```')
+        {'title': 'T', 'slug': 't'}
+        >>> extract_json('Note: scores are in {0-100}.\\n{"title": "T"}')
+        {'title': 'T'}
+        >>> extract_json('Example: {"title": "A"}\\n```json\\n{"title": "B"}\\n```')
+        {'title': 'B'}
+    """
+    stripped = text.strip()
+    if stripped.startswith('{'):
+        # Fast path for clean responses
+        try:
+            data = json.loads(stripped, strict=False)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+
+    extractor = StreamingJSONExtractor()
+    extractor.feed(text)
+    return extractor.close()
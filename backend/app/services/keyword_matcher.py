@@ -0,0 +1,76 @@
+"""
+Keyword Matcher Module - Multi-keyword search in a single pass.
+
+An Aho-Corasick automaton over a fixed keyword list. `find()` walks the text
+once and returns every keyword that occurs in it as a substring (the same
+result as `kw in text` for each keyword), so the cost depends on the text
+length rather than on the number of keywords.
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matcher for a fixed set of keywords.
+
+    Example:
+        matcher = KeywordMatcher(['fast', 'turbo', 'sota'])
+        matcher.find("SDXL-Turbo is fast")  # {'fast', 'turbo'}
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: Keywords to search for (matched case-insensitively)
+        """
+        self.keywords: FrozenSet[str] = frozenset(kw.lower() for kw in keywords if kw)
+
+        # Trie: goto[state][char] -> state; output[state] -> keywords ending here
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Set[str]] = [set()]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(set())
+                state = next_state
+            output[state].add(keyword)
+
+        # Breadth-first: failure links, then fold them into a full transition
+        # table so matching never follows failure links at runtime.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                queue.append(child)
+
+        self._delta = delta
+        self._output = [frozenset(found) for found in output]
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Return the keywords that occur in text.
+
+        Args:
+            text: Text to scan (lowercased before matching)
+        """
+        delta = self._delta
+        output = self._output
+        found: Set[str] = set()
+        state = 0
+        for char in text.lower():
+            state = delta[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
@@ -4,8 +4,8 @@ LinkedIn Publishing Service - OAuth 2.0 integration.
 Handles authentication and publishing posts to LinkedIn.
 """
 
-import httpx
 from typing import Optional, Dict, Any
+from ..clients import clients
 from ..config import settings
 
 
@@ -16,15 +16,15 @@ LINKEDIN_TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
 
 async def get_linkedin_profile_id(access_token: str) -> Optional[str]:
     """Get the authenticated user's LinkedIn profile ID (URN)."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{LINKEDIN_API_BASE}/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"}
-        )
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("sub")  # This is the member URN
-        return None
+    client = clients.http('linkedin')
+    response = await client.get(
+        f"{LINKEDIN_API_BASE}/userinfo",
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    if response.status_code == 200:
+        data = response.json()
+        return data.get("sub")  # This is the member URN
+    return None
 
 
 async def publish_to_linkedin(
@@ -75,29 +75,29 @@ async def publish_to_linkedin(
         }
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{LINKEDIN_API_BASE}/ugcPosts",
-            json=payload,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-                "X-Restli-Protocol-Version": "2.0.0"
-            }
-        )
-        
-        if response.status_code in [200, 201]:
-            return {
-                "success": True,
-                "message": "Post published to LinkedIn!",
-                "post_id": response.headers.get("x-restli-id")
-            }
-        else:
-            return {
-                "success": False,
-                "error": f"LinkedIn API error: {response.status_code}",
-                "details": response.text
-            }
+    client = clients.http('linkedin')
+    response = await client.post(
+        f"{LINKEDIN_API_BASE}/ugcPosts",
+        json=payload,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "X-Restli-Protocol-Version": "2.0.0"
+        }
+    )
+    
+    if response.status_code in [200, 201]:
+        return {
+            "success": True,
+            "message": "Post published to LinkedIn!",
+            "post_id": response.headers.get("x-restli-id")
+        }
+    else:
+        return {
+            "success": False,
+            "error": f"LinkedIn API error: {response.status_code}",
+            "details": response.text
+        }
 
 
 def get_oauth_authorize_url(redirect_uri: str, state: str = "random_state") -> str:
@@ -135,28 +135,28 @@ async def exchange_code_for_token(code: str, redirect_uri: str) -> Dict[str, Any
     if not settings.linkedin_client_id or not settings.linkedin_client_secret:
         return {"error": "LinkedIn client credentials not configured"}
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            LINKEDIN_TOKEN_URL,
-            data={
-                "grant_type": "authorization_code",
-                "code": code,
-                "redirect_uri": redirect_uri,
-                "client_id": settings.linkedin_client_id,
-                "client_secret": settings.linkedin_client_secret
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "success": True,
-                "access_token": data.get("access_token"),
-                "expires_in": data.get("expires_in")
-            }
-        else:
-            return {
-                "success": False,
-                "error": response.text
-            }
+    client = clients.http('linkedin')
+    response = await client.post(
+        LINKEDIN_TOKEN_URL,
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": redirect_uri,
+            "client_id": settings.linkedin_client_id,
+            "client_secret": settings.linkedin_client_secret
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    
+    if response.status_code == 200:
+        data = response.json()
+        return {
+            "success": True,
+            "access_token": data.get("access_token"),
+            "expires_in": data.get("expires_in")
+        }
+    else:
+        return {
+            "success": False,
+            "error": response.text
+        }
@@ -4,42 +4,52 @@ LLM Processing Module - Generates articles, LinkedIn posts, and content.
 Supports OpenAI, Anthropic Claude, and Ollama (local) providers.
 """
 
+import asyncio
 import json
-from typing import Dict, Any, Optional
+import hashlib
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 
-from ..config import settings, get_llm_provider
+from ..cache import DiskCache
+from ..clients import clients
+from ..config import settings, get_llm_providers
+from ..llm_limits import estimate_tokens, llm_limiter
 from ..models import ScrapedModel, GeneratedArticle, LinkedInPost, ModelScores
+from .json_stream import StreamingJSONExtractor, extract_json
 import re
 
 
-def _parse_json_response(response: str) -> Optional[Dict[str, Any]]:
-    """Parse JSON from LLM response, handling markdown code fences."""
-    # Try direct JSON parse first (for clean JSON responses)
-    response_stripped = response.strip()
-    if response_stripped.startswith('{'):
-        try:
-            return json.loads(response_stripped, strict=False)
-        except json.JSONDecodeError:
-            pass
-    
-    # Try to extract JSON from markdown code fence
-    patterns = [
-        (r'```json\s*([\s\S]*?)\s*```', 1),  # ```json ... ```
-        (r'```\s*([\s\S]*?)\s*```', 1),       # ``` ... ```
-        (r'(\{[\s\S]*\})', 1)                 # Raw JSON object (with capture group)
-    ]
-    
-    for pattern, group_idx in patterns:
-        match = re.search(pattern, response)
-        if match:
-            try:
-                json_str = match.group(group_idx).strip()
-                return json.loads(json_str, strict=False)
-            except (json.JSONDecodeError, IndexError):
-                continue
-    
-    return None
+# Sampling temperature sent to each provider (None = provider default).
+# Part of the response cache key, so changing it invalidates cached responses.
+PROVIDER_TEMPERATURES = {
+    'openai': 0.7,
+    'anthropic': None,
+    'gemini': 0.7,
+    'ollama': None
+}
+
+# Output token limit sent to each provider (None = provider default); also
+# reserved from the provider's tokens-per-minute budget for every call
+PROVIDER_MAX_TOKENS = {
+    'openai': 4000,
+    'anthropic': 4000,
+    'gemini': 8192,
+    'ollama': None
+}
+
+# Receives each chunk of text as a streaming provider produces it
+TokenCallback = Callable[[str], Awaitable[None]]
+
+# Receives each top-level field of the JSON response as soon as it is complete
+FieldCallback = Callable[[str, Any], Awaitable[None]]
+
+# Persistent response cache, keyed on provider, model, temperature and prompt hash
+llm_cache = DiskCache(
+    Path(settings.cache_dir) / "llm",
+    default_ttl=settings.llm_cache_ttl,
+    max_bytes=settings.llm_cache_max_mb * 1024 * 1024
+)
 
 
 def fix_markdown_code_blocks(content: str) -> str:
@@ -245,13 +255,22 @@ Return a JSON object with:
 Return ONLY valid JSON, no additional text."""
 
 
-async def generate_article(model: ScrapedModel, category: str = "Other") -> GeneratedArticle:
+async def generate_article(
+    model: ScrapedModel,
+    category: str = "Other",
+    use_cache: bool = True,
+    on_token: Optional[TokenCallback] = None,
+    on_field: Optional[FieldCallback] = None
+) -> GeneratedArticle:
     """
     Generate a comprehensive technical article about a model.
     
     Args:
         model: Scraped model data
         category: Model category for context
+        use_cache: Reuse a cached LLM response for an identical prompt
+        on_token: Stream the response, awaiting this with each chunk
+        on_field: Stream the response, awaiting this with each parsed field
         
     Returns:
         GeneratedArticle with all content including scores and metadata
@@ -290,10 +309,7 @@ async def generate_article(model: ScrapedModel, category: str = "Other") -> Gene
         readme_content=model.readme_content[:8000] if model.readme_content else "No README available"
     )
     
-    response = await _call_llm(prompt)
-    
-    # Parse JSON from response (handling markdown code fences)
-    data = _parse_json_response(response)
+    response, data = await _generate_json(prompt, use_cache, on_token, on_field)
     
     if data:
         # Ensure excerpt is within limit
@@ -345,7 +361,10 @@ async def generate_linkedin_post(
     model: ScrapedModel,
     article: GeneratedArticle,
     category: str = "Other",
-    scores: dict = None
+    scores: dict = None,
+    use_cache: bool = True,
+    on_token: Optional[TokenCallback] = None,
+    on_field: Optional[FieldCallback] = None
 ) -> LinkedInPost:
     """
     Generate a LinkedIn-optimized post about a model.
@@ -355,6 +374,9 @@ async def generate_linkedin_post(
         article: Generated article for context
         category: Model category
         scores: Optional scores dict with overall_score, quality_score, speed_score, freedom_score
+        use_cache: Reuse a cached LLM response for an identical prompt
+        on_token: Stream the response, awaiting this with each chunk
+        on_field: Stream the response, awaiting this with each parsed field
         
     Returns:
         LinkedInPost with formatted content
@@ -390,10 +412,7 @@ async def generate_linkedin_post(
         freedom_score=scores.get('freedom_score', 0)
     )
     
-    response = await _call_llm(prompt)
-    
-    # Parse JSON from response
-    data = _parse_json_response(response)
+    response, data = await _generate_json(prompt, use_cache, on_token, on_field)
     
     if data:
         content = data.get('content', '')
@@ -421,7 +440,9 @@ async def regenerate_content(
     section: str,
     model_data: Dict[str, Any],
     current_article: Dict[str, Any],
-    current_linkedin: Dict[str, Any]
+    current_linkedin: Dict[str, Any],
+    on_token: Optional[TokenCallback] = None,
+    on_field: Optional[FieldCallback] = None
 ) -> Dict[str, Any]:
     """
     Regenerate a specific section of content.
@@ -431,35 +452,250 @@ async def regenerate_content(
         model_data: Current model data
         current_article: Current article data
         current_linkedin: Current LinkedIn post data
+        on_token: Stream the response, awaiting this with each chunk
+        on_field: Stream the response, awaiting this with each parsed field
         
     Returns:
         Regenerated content for the section
     """
     model = ScrapedModel(**model_data)
     
+    # Regeneration always asks the provider for a fresh response;
+    # the new response replaces the cached one.
     if section == 'article':
-        article = await generate_article(model)
+        article = await generate_article(model, use_cache=False, on_token=on_token, on_field=on_field)
         return article.model_dump()
     elif section == 'linkedin':
         article = GeneratedArticle(**current_article)
-        linkedin = await generate_linkedin_post(model, article)
+        linkedin = await generate_linkedin_post(
+            model, article, use_cache=False, on_token=on_token, on_field=on_field
+        )
         return linkedin.model_dump()
     else:
         raise ValueError(f"Unknown section: {section}")
 
 
-async def _call_llm(prompt: str) -> str:
+def _provider_model(provider: str) -> str:
+    """Return the configured model name for a provider."""
+    return {
+        'openai': settings.openai_model,
+        'anthropic': settings.anthropic_model,
+        'gemini': settings.gemini_model
+    }.get(provider, settings.ollama_model)
+
+
+def _llm_cache_key(provider: str, prompt: str) -> str:
+    """Build the response cache key for a prompt sent to a provider."""
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    temperature = PROVIDER_TEMPERATURES.get(provider)
+    return f"{provider}:{_provider_model(provider)}:{temperature}:{prompt_hash}"
+
+
+async def _generate_json(
+    prompt: str,
+    use_cache: bool,
+    on_token: Optional[TokenCallback],
+    on_field: Optional[FieldCallback]
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Call the LLM and parse the JSON object from its response.
+    
+    When streaming, the response is parsed incrementally as chunks arrive,
+    so fields are reported to on_field as soon as they are complete. A
+    response without a parsable object is evicted from the response cache,
+    so the next call asks the provider again instead of replaying it.
+    
+    Returns:
+        (raw response, parsed object or None)
+    """
+    if on_token is None and on_field is None:
+        response = await _call_llm(prompt, use_cache=use_cache)
+        data = extract_json(response)
+        if data is None:
+            await _evict_llm_response(prompt)
+        return response, data
+    
+    extractor = StreamingJSONExtractor()
+    
+    async def on_chunk(chunk: str) -> None:
+        if on_token is not None:
+            await on_token(chunk)
+        for key, value in extractor.feed(chunk):
+            if on_field is not None:
+                await on_field(key, value)
+    
+    response = await _call_llm(prompt, use_cache=use_cache, on_token=on_chunk)
+    data = extractor.close()
+    if data is None:
+        await _evict_llm_response(prompt)
+    return response, data
+
+
+async def _evict_llm_response(prompt: str) -> None:
+    """Drop the cached responses to a prompt from every provider in the chain."""
+    if settings.llm_cache_enabled:
+        for provider in get_llm_providers():
+            await llm_cache.delete(_llm_cache_key(provider, prompt))
+
+
+async def _call_llm(
+    prompt: str,
+    use_cache: bool = True,
+    on_token: Optional[TokenCallback] = None
+) -> str:
     """
-    Call the configured LLM provider.
+    Call the configured LLM providers.
+    
+    Providers are tried in failover order (get_llm_providers()), skipping any
+    whose circuit breaker is open; the next one is used when a call fails
+    for good. With LLM_HEDGE_REQUESTS, a non-streamed call still running
+    after its provider's p95 latency is also sent to the next provider, and
+    the first response wins. A stream only fails over before its first chunk.
+    
+    Responses are cached on disk; an identical prompt sent to the same
+    provider/model/temperature is answered from the cache. Calls to a
+    provider go through its limiter (app/llm_limits.py): adaptive
+    concurrency, tokens-per-minute budget and retries with backoff.
     
     Args:
         prompt: The prompt to send
+        use_cache: Read from the cache (fresh responses are always written)
+        on_token: Stream the response, awaiting this with each chunk as it
+            arrives (a cached response is delivered as a single chunk)
         
     Returns:
         LLM response text
     """
-    provider = get_llm_provider()
+    providers = get_llm_providers()
+    
+    if settings.llm_cache_enabled and use_cache:
+        for provider in providers:
+            cached_response = await llm_cache.get(_llm_cache_key(provider, prompt))
+            if cached_response is not None:
+                if on_token is not None:
+                    await on_token(cached_response)
+                return cached_response
+    
+    if on_token is not None:
+        provider, response = await _stream_with_failover(providers, prompt, on_token)
+    else:
+        provider, response = await _call_with_failover(providers, prompt)
+    
+    if settings.llm_cache_enabled and response:
+        await llm_cache.set(_llm_cache_key(provider, prompt), response)
+    
+    return response
+
+
+async def _call_with_failover(providers: List[str], prompt: str) -> Tuple[str, str]:
+    """
+    Call providers in order until one succeeds, hedging slow calls if enabled.
+    
+    Returns:
+        (provider that answered, response)
+    """
+    remaining = list(providers)
+    running: Dict[asyncio.Task, Tuple[str, float]] = {}
+    error: Optional[Exception] = None
+    
+    def start_next() -> None:
+        while remaining:
+            provider = remaining.pop(0)
+            if llm_limiter.for_provider(provider).breaker.allow():
+                task = asyncio.create_task(_limited_call(provider, prompt))
+                running[task] = (provider, time.monotonic())
+                return
+    
+    try:
+        start_next()
+        while running:
+            timeout = None
+            if settings.llm_hedge_requests and remaining and len(running) == 1:
+                [(provider, started)] = running.values()
+                p95 = llm_limiter.for_provider(provider).p95_latency()
+                if p95 is not None:
+                    timeout = max(0.0, p95 - (time.monotonic() - started))
+            
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                print(f"⏱️ {provider} slower than its p95 ({p95:.2f}s), hedging with the next provider")
+                start_next()
+                continue
+            
+            for task in done:
+                provider, _ = running.pop(task)
+                if task.exception() is None:
+                    return provider, task.result()
+                error = task.exception()
+                print(f"⚠️ {provider} failed: {error}")
+            if not running:
+                start_next()
+    finally:
+        # Cancel the slower side of a hedge
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+    
+    raise error or _no_provider_error(providers)
+
+
+async def _stream_with_failover(providers: List[str], prompt: str, on_token: TokenCallback) -> Tuple[str, str]:
+    """
+    Stream from providers in order until one succeeds.
+    
+    Text already forwarded to on_token cannot be taken back, so once a stream
+    has produced output its failure is not retried or failed over.
     
+    Returns:
+        (provider that answered, response)
+    """
+    streamed = False
+    
+    async def forward(chunk: str) -> None:
+        nonlocal streamed
+        streamed = True
+        await on_token(chunk)
+    
+    error: Optional[Exception] = None
+    for provider in providers:
+        if not llm_limiter.for_provider(provider).breaker.allow():
+            continue
+        try:
+            return provider, await _limited_call(provider, prompt, forward, can_retry=lambda: not streamed)
+        except Exception as e:
+            if streamed:
+                raise
+            error = e
+            print(f"⚠️ {provider} failed: {e}")
+    
+    raise error or _no_provider_error(providers)
+
+
+def _limited_call(
+    provider: str,
+    prompt: str,
+    on_token: Optional[TokenCallback] = None,
+    can_retry: Callable[[], bool] = lambda: True
+) -> Awaitable[str]:
+    """Call one provider through its limiter, streaming to on_token if given."""
+    limiter = llm_limiter.for_provider(provider)
+    limits = {
+        'prompt_tokens': estimate_tokens(prompt),
+        'max_output_tokens': PROVIDER_MAX_TOKENS.get(provider) or 0,
+        'output_tokens': estimate_tokens,
+        'can_retry': can_retry,
+    }
+    if on_token is not None:
+        return limiter.call(lambda: _stream_provider(provider, prompt, on_token), **limits)
+    return limiter.call(lambda: _call_provider(provider, prompt), **limits)
+
+
+def _no_provider_error(providers: List[str]) -> RuntimeError:
+    return RuntimeError(f"No LLM provider available (circuit open: {', '.join(providers)})")
+
+
+async def _call_provider(provider: str, prompt: str) -> str:
+    """Dispatch a prompt to a specific provider."""
     if provider == 'openai':
         return await _call_openai(prompt)
     elif provider == 'anthropic':
@@ -470,34 +706,70 @@ async def _call_llm(prompt: str) -> str:
         return await _call_ollama(prompt)
 
 
+async def _stream_provider(provider: str, prompt: str, on_token: TokenCallback) -> str:
+    """Stream a prompt from a specific provider, forwarding chunks to on_token."""
+    if provider == 'openai':
+        stream = _stream_openai(prompt)
+    elif provider == 'anthropic':
+        stream = _stream_anthropic(prompt)
+    elif provider == 'gemini':
+        stream = _stream_gemini(prompt)
+    else:
+        stream = _stream_ollama(prompt)
+    
+    chunks = []
+    async for chunk in stream:
+        if chunk:
+            chunks.append(chunk)
+            await on_token(chunk)
+    return ''.join(chunks)
+
+
+def _openai_messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": "You are an expert AI technical writer."},
+        {"role": "user", "content": prompt}
+    ]
+
+
 async def _call_openai(prompt: str) -> str:
     """Call OpenAI API."""
-    from openai import AsyncOpenAI
-    
-    client = AsyncOpenAI(api_key=settings.openai_api_key)
+    client = clients.openai()
     
     response = await client.chat.completions.create(
         model=settings.openai_model,
-        messages=[
-            {"role": "system", "content": "You are an expert AI technical writer."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.7,
-        max_tokens=4000
+        messages=_openai_messages(prompt),
+        temperature=PROVIDER_TEMPERATURES['openai'],
+        max_tokens=PROVIDER_MAX_TOKENS['openai']
     )
     
     return response.choices[0].message.content
 
 
+async def _stream_openai(prompt: str) -> AsyncIterator[str]:
+    """Stream from the OpenAI API."""
+    client = clients.openai()
+    
+    stream = await client.chat.completions.create(
+        model=settings.openai_model,
+        messages=_openai_messages(prompt),
+        temperature=PROVIDER_TEMPERATURES['openai'],
+        max_tokens=PROVIDER_MAX_TOKENS['openai'],
+        stream=True
+    )
+    
+    async for chunk in stream:
+        if chunk.choices:
+            yield chunk.choices[0].delta.content or ''
+
+
 async def _call_anthropic(prompt: str) -> str:
     """Call Anthropic Claude API."""
-    import anthropic
-    
-    client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    client = clients.anthropic()
     
     response = await client.messages.create(
         model=settings.anthropic_model,
-        max_tokens=4000,
+        max_tokens=PROVIDER_MAX_TOKENS['anthropic'],
         messages=[
             {"role": "user", "content": prompt}
         ]
@@ -506,8 +778,23 @@ async def _call_anthropic(prompt: str) -> str:
     return response.content[0].text
 
 
-async def _call_gemini(prompt: str) -> str:
-    """Call Google Gemini API."""
+async def _stream_anthropic(prompt: str) -> AsyncIterator[str]:
+    """Stream from the Anthropic Claude API."""
+    client = clients.anthropic()
+    
+    async with client.messages.stream(
+        model=settings.anthropic_model,
+        max_tokens=PROVIDER_MAX_TOKENS['anthropic'],
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    ) as stream:
+        async for text in stream.text_stream:
+            yield text
+
+
+def _gemini_model():
+    """Return the configured Gemini model and its generation config."""
     import google.generativeai as genai
     
     genai.configure(api_key=settings.gemini_api_key)
@@ -516,53 +803,100 @@ async def _call_gemini(prompt: str) -> str:
     # Gemini 1.5/2.0 specific configs
     generation_config = genai.types.GenerationConfig(
         candidate_count=1,
-        max_output_tokens=8192,
-        temperature=0.7,
+        max_output_tokens=PROVIDER_MAX_TOKENS['gemini'],
+        temperature=PROVIDER_TEMPERATURES['gemini'],
     )
+    return model, generation_config
+
+
+async def _call_gemini(prompt: str) -> str:
+    """Call Google Gemini API."""
+    model, generation_config = _gemini_model()
     
-    # Run in executor to avoid blocking event loop (genai is sync by default)
-    import asyncio
-    from functools import partial
-    
-    loop = asyncio.get_running_loop()
-    
-    response = await loop.run_in_executor(
-        None,
-        partial(
-            model.generate_content,
-            prompt,
-            generation_config=generation_config
-        )
+    # The async API keeps the call on the event loop instead of holding a
+    # thread of the default executor for the whole request
+    response = await model.generate_content_async(
+        prompt,
+        generation_config=generation_config
     )
     
     return response.text
 
 
+async def _stream_gemini(prompt: str) -> AsyncIterator[str]:
+    """Stream from the Google Gemini API."""
+    model, generation_config = _gemini_model()
+    
+    response = await model.generate_content_async(
+        prompt,
+        generation_config=generation_config,
+        stream=True
+    )
+    async for chunk in response:
+        yield chunk.text
+
+
 async def _call_ollama(prompt: str) -> str:
     """Call local Ollama instance."""
-    import httpx
-    
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        try:
-            response = await client.post(
-                f"{settings.ollama_base_url}/api/generate",
-                json={
-                    "model": settings.ollama_model,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            response.raise_for_status()
-            return response.json()['response']
-        except Exception:
-            # Fallback for chat endpoint
-             response = await client.post(
-                f"{settings.ollama_base_url}/api/chat",
-                json={
-                    "model": settings.ollama_model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream": False
-                }
-            )
-             response.raise_for_status()
-             return response.json()['message']['content']
+    client = clients.http('ollama')
+    
+    try:
+        response = await client.post(
+            f"{settings.ollama_base_url}/api/generate",
+            json={
+                "model": settings.ollama_model,
+                "prompt": prompt,
+                "stream": False
+            }
+        )
+        response.raise_for_status()
+        return response.json()['response']
+    except Exception:
+        # Fallback for chat endpoint
+        response = await client.post(
+            f"{settings.ollama_base_url}/api/chat",
+            json={
+                "model": settings.ollama_model,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": False
+            }
+        )
+        response.raise_for_status()
+        return response.json()['message']['content']
+
+
+async def _stream_ollama(prompt: str) -> AsyncIterator[str]:
+    """Stream from a local Ollama instance (newline-delimited JSON)."""
+    client = clients.http('ollama')
+    
+    started = False
+    try:
+        async for chunk in _ollama_lines(client, "/api/generate", {"prompt": prompt}):
+            started = True
+            yield chunk.get('response', '')
+    except Exception:
+        # Fallback for chat endpoint, unless generate already produced output
+        if started:
+            raise
+        async for chunk in _ollama_lines(
+            client, "/api/chat", {"messages": [{"role": "user", "content": prompt}]}
+        ):
+            yield chunk.get('message', {}).get('content', '')
+
+
+async def _ollama_lines(client, path: str, body: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    async with client.stream(
+        "POST",
+        f"{settings.ollama_base_url}{path}",
+        json={"model": settings.ollama_model, "stream": True, **body}
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get('error'):
+                raise RuntimeError(chunk['error'])
+            yield chunk
+            if chunk.get('done'):
+                break
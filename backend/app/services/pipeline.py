@@ -0,0 +1,166 @@
+"""
+Pipeline Module - Runs processing steps as a dependency graph.
+
+Each stage declares the stages it depends on and starts as soon as all of
+them have finished, so independent work (classification, heuristic scoring,
+image handling) overlaps with slow LLM calls instead of queueing behind them.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class PipelineError(Exception):
+    """Raised when a required stage fails."""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """A single named step of a pipeline."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        deps: Iterable[str] = (),
+        optional: bool = False
+    ):
+        """
+        Args:
+            name: Unique stage name; dependants receive the result under this name
+            func: Sync or async callable taking one keyword argument per dependency
+            deps: Names of stages that must finish first
+            optional: If True, a failure yields None instead of aborting the run
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.optional = optional
+
+
+class Pipeline:
+    """
+    Minimal async DAG executor.
+
+    Example:
+        pipeline = Pipeline()
+        pipeline.add("scrape", lambda: scrape_model(url))
+        pipeline.add("category", lambda scrape: classify_category(scrape), deps=["scrape"])
+        results = await pipeline.run()
+    """
+
+    def __init__(self, on_complete: Optional[Callable[[str, Any, float], None]] = None):
+        """
+        Args:
+            on_complete: Called with (stage name, result, seconds) as each stage finishes
+        """
+        self._stages: Dict[str, Stage] = {}
+        self._on_complete = on_complete
+        self.timings: Dict[str, Tuple[float, float]] = {}  # {name: (start, end)} relative to run start
+        self.errors: Dict[str, Exception] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable,
+        deps: Iterable[str] = (),
+        optional: bool = False
+    ) -> "Pipeline":
+        """Register a stage. Dependencies must already be registered."""
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        stage = Stage(name, func, deps, optional)
+        for dep in stage.deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = stage
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run all stages, each one as soon as its dependencies are done.
+
+        Returns:
+            Mapping of stage name to result
+
+        Raises:
+            PipelineError: If a required stage fails (remaining stages are cancelled)
+        """
+        self.timings = {}
+        self.errors = {}
+        origin = time.monotonic()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            inputs = {dep: await tasks[dep] for dep in stage.deps}
+            start = time.monotonic() - origin
+            try:
+                result = stage.func(**inputs)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                self.timings[stage.name] = (start, time.monotonic() - origin)
+                self.errors[stage.name] = e
+                if stage.optional:
+                    return None
+                raise PipelineError(stage.name, e) from e
+            end = time.monotonic() - origin
+            self.timings[stage.name] = (start, end)
+            if self._on_complete:
+                self._on_complete(stage.name, result, end - start)
+            return result
+
+        # Stages are registered in dependency order, so every dependency
+        # task exists before the stage that awaits it.
+        for name, stage in self._stages.items():
+            tasks[name] = asyncio.create_task(run_stage(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Return the chain of stages that determined total run time.
+
+        Walks back from the last stage to finish, following at each step the
+        dependency that finished last (the one the stage was waiting on).
+        """
+        if not self.timings:
+            return [], 0.0
+
+        current = max(self.timings, key=lambda n: self.timings[n][1])
+        total = self.timings[current][1]
+        path = [current]
+        while True:
+            deps = [d for d in self._stages[current].deps if d in self.timings]
+            if not deps:
+                break
+            current = max(deps, key=lambda d: self.timings[d][1])
+            path.append(current)
+
+        return list(reversed(path)), total
+
+    def report(self) -> str:
+        """Human-readable timing summary with the critical path."""
+        lines = []
+        for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            status = "✗" if name in self.errors else "✓"
+            lines.append(f"   {status} {name:<12} {start:6.2f}s → {end:6.2f}s ({end - start:.2f}s)")
+
+        path, total = self.critical_path()
+        path_time = sum(self.timings[n][1] - self.timings[n][0] for n in path)
+        lines.append(f"   Critical path: {' → '.join(path)} ({path_time:.2f}s of {total:.2f}s)")
+        return "\n".join(lines)
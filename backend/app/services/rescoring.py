@@ -0,0 +1,302 @@
+"""
+Rescoring Module - Recomputes overall scores and tiers for the whole catalog.
+
+After WEIGHTS or TIER_THRESHOLDS change in scoring_engine.py, stored
+overall scores and tiers are stale. The per-metric scores (quality, speed,
+freedom) are loaded into NumPy arrays, the weighting and tier assignment are
+applied to all rows at once, and only rows whose overall score or tier
+changed are written back.
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..database import pool
+from .scoring_engine import WEIGHTS, TIER_THRESHOLDS
+
+
+@dataclass
+class ScoreTable:
+    """Per-metric and stored scores of every model, one array entry per row."""
+    ids: List[str]
+    quality: np.ndarray
+    speed: np.ndarray
+    freedom: np.ndarray
+    overall: np.ndarray
+    tiers: np.ndarray
+    # JSON sources only: the scores dict of each row and the file it came from
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    files: List[Path] = field(default_factory=list)
+    documents: Dict[Path, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class RescoreResult:
+    """New overall scores and tiers, with a mask of the rows that changed."""
+    table: ScoreTable
+    overall: np.ndarray
+    tiers: np.ndarray
+    changed: np.ndarray
+    tier_names: List[str]  # Best to worst
+
+    @property
+    def changed_count(self) -> int:
+        return int(self.changed.sum())
+
+    def tier_distribution(self) -> Dict[str, Tuple[int, int]]:
+        """Return {tier: (count before, count after)} for every tier."""
+        names = self.tier_names
+        before_names, before_counts = np.unique(self.table.tiers, return_counts=True)
+        after_names, after_counts = np.unique(self.tiers, return_counts=True)
+        before = dict(zip(before_names.tolist(), before_counts.tolist()))
+        after = dict(zip(after_names.tolist(), after_counts.tolist()))
+        ordered = names + sorted((set(before) | set(after)) - set(names))
+        return {tier: (before.get(tier, 0), after.get(tier, 0)) for tier in ordered}
+
+
+def _tier_names(thresholds: Dict[str, float]) -> List[str]:
+    """Tier names from best to worst."""
+    return [tier for tier, _ in sorted(thresholds.items(), key=lambda item: -item[1])]
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """Round to 2 decimals exactly like Python's round(), as calculate_scores() does."""
+    scaled = values * 100
+    rounded = np.round(scaled) / 100
+    # np.round works on the scaled value, which can land on the other side of
+    # a .5 tie; redo the few near-tie values with round()
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def _table(
+    ids: List[str],
+    rows: List[Any],
+    **extra: Any
+) -> ScoreTable:
+    """Build a ScoreTable from (quality, speed, freedom, overall, tier) rows."""
+    if rows:
+        quality, speed, freedom, overall, tiers = zip(*rows)
+    else:
+        quality = speed = freedom = overall = tiers = ()
+    # None becomes NaN in float arrays
+    return ScoreTable(
+        ids=ids,
+        quality=np.array(quality, dtype=float),
+        speed=np.array(speed, dtype=float),
+        freedom=np.array(freedom, dtype=float),
+        overall=np.array(overall, dtype=float),
+        tiers=np.array([t or '' for t in tiers], dtype='<U8'),
+        **extra
+    )
+
+
+async def load_scores_from_database() -> ScoreTable:
+    """Load the scores of every local preview from SQLite."""
+    async with pool.read() as db:
+        # One json_extract per row returns the five fields as a JSON array
+        async with db.execute("""
+            SELECT preview_id,
+                   json_extract(scores_data, '$.quality_score', '$.speed_score',
+                                '$.freedom_score', '$.overall_score', '$.tier')
+            FROM local_previews
+        """) as cursor:
+            rows = await cursor.fetchall()
+    # Parse all arrays with a single json.loads instead of one call per row
+    values = json.loads('[' + ','.join(row[1] for row in rows) + ']')
+    return _table([row[0] for row in rows], values)
+
+
+def load_scores_from_json(path: Path) -> ScoreTable:
+    """
+    Load scores from exported JSON.
+
+    Accepts a file or a directory of *.json files. Each file holds a preview
+    state (with "scores_data", as written to output/), a list of them, or a
+    list of model_scores rows as exported from Supabase.
+    """
+    path = Path(path)
+    paths = sorted(path.glob("*.json")) if path.is_dir() else [path]
+
+    ids: List[str] = []
+    rows = []
+    records: List[Dict[str, Any]] = []
+    files: List[Path] = []
+    documents: Dict[Path, Any] = {}
+
+    for file_path in paths:
+        with open(file_path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        documents[file_path] = document
+
+        items = document if isinstance(document, list) else [document]
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            scores = item.get("scores_data", item)
+            if not isinstance(scores, dict) or "quality_score" not in scores:
+                continue
+            row_id = item.get("preview_id") or item.get("model_id") or item.get("id") or f"{file_path.name}[{i}]"
+            ids.append(str(row_id))
+            rows.append((
+                scores.get("quality_score"),
+                scores.get("speed_score"),
+                scores.get("freedom_score"),
+                scores.get("overall_score"),
+                scores.get("tier")
+            ))
+            records.append(scores)
+            files.append(file_path)
+
+    return _table(ids, rows, records=records, files=files, documents=documents)
+
+
+def rescore(
+    table: ScoreTable,
+    weights: Optional[Dict[str, float]] = None,
+    thresholds: Optional[Dict[str, float]] = None
+) -> RescoreResult:
+    """
+    Recompute overall scores and tiers for every row.
+
+    Same rules as calculate_scores(): a weighted sum of the three metrics,
+    rounded to 2 decimals, and the best tier whose threshold the unrounded
+    sum reaches (thresholds must decrease from the best tier to the worst,
+    as in TIER_THRESHOLDS). Rows with a missing metric keep their stored
+    values, and so do rows whose stored overall score and tier are within
+    the rounding error of the stored metrics.
+
+    Args:
+        table: Loaded scores
+        weights: Defaults to scoring_engine.WEIGHTS
+        thresholds: Defaults to scoring_engine.TIER_THRESHOLDS
+
+    Returns:
+        RescoreResult with new overall scores/tiers and the changed-row mask
+    """
+    weights = weights or WEIGHTS
+    thresholds = thresholds or TIER_THRESHOLDS
+
+    raw = (
+        table.quality * weights['quality'] +
+        table.speed * weights['speed'] +
+        table.freedom * weights['freedom']
+    )
+    valid = ~np.isnan(raw)
+    filled = np.where(valid, raw, 0.0)
+
+    # The stored metrics are rounded to 2 decimals, but calculate_scores()
+    # weighted the unrounded ones: the sum computed here can be off by up to
+    # `slack`, and the stored overall by one more rounding step on top
+    slack = 0.005 * sum(abs(w) for w in weights.values()) + 1e-9
+    tolerance = slack + 0.005
+
+    # Thresholds ascending; searchsorted finds the highest one <= score
+    ascending = sorted(thresholds.items(), key=lambda item: item[1])
+    edges = np.array([threshold for _, threshold in ascending], dtype=float)
+    names = np.array([tier for tier, _ in ascending])
+
+    def tier_index(scores: np.ndarray) -> np.ndarray:
+        return np.clip(np.searchsorted(edges, scores, side='right') - 1, 0, len(names) - 1)
+
+    index = tier_index(filled)
+    overall = _round2(raw)
+
+    # A stored overall within rounding error of the new one is kept. So is a
+    # stored tier that the unrounded sum could have reached, i.e. one between
+    # the tiers at either end of the error interval
+    stored_overall = np.round(table.overall, 2)
+    keep_overall = np.abs(stored_overall - overall) <= tolerance
+    position = {tier: i for i, (tier, _) in enumerate(ascending)}
+    stored_names, inverse = np.unique(table.tiers, return_inverse=True)
+    stored_index = np.array([position.get(t, -1) for t in stored_names.tolist()], dtype=int)[inverse]
+    keep_tier = (stored_index >= tier_index(filled - slack)) & (stored_index <= tier_index(filled + slack))
+
+    overall = np.where(valid & ~keep_overall, overall, table.overall)
+    tiers = np.where(valid & ~keep_tier, names[index], table.tiers)
+
+    changed = valid & (~keep_overall | ~keep_tier)
+
+    return RescoreResult(
+        table=table,
+        overall=overall,
+        tiers=tiers,
+        changed=changed,
+        tier_names=_tier_names(thresholds)
+    )
+
+
+async def write_scores_to_database(result: RescoreResult) -> int:
+    """
+    Write changed overall scores and tiers back to SQLite.
+
+    Versions are bumped without recording patches, so websocket clients of
+    a rescored preview resync with the full payload.
+
+    Returns:
+        Number of rows updated
+    """
+    indices = np.flatnonzero(result.changed)
+    if len(indices) == 0:
+        return 0
+
+    now = datetime.utcnow().isoformat()
+    params = [
+        (float(result.overall[i]), str(result.tiers[i]), now, result.table.ids[i])
+        for i in indices
+    ]
+    async with pool.write() as db:
+        await db.executemany("""
+            UPDATE local_previews
+            SET scores_data = json_set(scores_data, '$.overall_score', ?, '$.tier', ?),
+                last_modified = ?,
+                version = version + 1
+            WHERE preview_id = ?
+        """, params)
+    return len(params)
+
+
+def write_scores_to_json(result: RescoreResult) -> int:
+    """
+    Write changed overall scores and tiers back to their JSON files.
+
+    Only files containing a changed row are rewritten.
+
+    Returns:
+        Number of rows updated
+    """
+    table = result.table
+    indices = np.flatnonzero(result.changed)
+    touched = set()
+    for i in indices:
+        record = table.records[i]
+        record['overall_score'] = float(result.overall[i])
+        record['tier'] = str(result.tiers[i])
+        touched.add(table.files[i])
+
+    for file_path in touched:
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(table.documents[file_path], f, indent=2, ensure_ascii=False)
+        tmp_path.replace(file_path)
+
+    return len(indices)
+
+
+def format_tier_diff(result: RescoreResult) -> str:
+    """Before/after tier distribution as a printable table."""
+    lines = [f"   {'Tier':<6}{'Before':>8}{'After':>8}{'Change':>8}"]
+    for tier, (before, after) in result.tier_distribution().items():
+        delta = after - before
+        lines.append(f"   {tier or '-':<6}{before:>8}{after:>8}{delta:>+8}")
+    return "\n".join(lines)
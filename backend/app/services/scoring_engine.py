@@ -12,9 +12,10 @@ Visual Subtags:
 - Closed/Paid (#dc3545)
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set
 from ..models import ScrapedModel, ModelScores, TierLevel, ModelCategory
 from ..models.schemas import ModelTag
+from .keyword_matcher import KeywordMatcher
 
 
 # Scoring weights (equal distribution)
@@ -63,12 +64,100 @@ TAG_DEFINITIONS = {
 }
 
 
+# Keyword classes used by the heuristics
+QUALITY_KEYWORDS = [
+    'state-of-the-art', 'sota', 'best', 'high-quality', 'photorealistic',
+    'accurate', 'precise', 'excellent', 'superior', 'outperforms'
+]
+BENCHMARK_KEYWORDS = ['benchmark', 'evaluation', 'score', 'fid', 'accuracy', 'bleu']
+SPEED_KEYWORDS = ['turbo', 'fast', 'quick', 'efficient', 'lite', 'mini', 'tiny', 'small']
+OPTIMIZATION_KEYWORDS = ['optimized', 'quantized', 'distilled', 'pruned', 'onnx', 'tensorrt']
+LATENCY_KEYWORDS = ['sub-second', 'real-time', 'instant', 'low-latency', 'ms']
+PERMISSIVE_LICENSES = ['mit', 'apache', 'bsd', 'unlicense', 'cc0', 'wtfpl']
+SEMI_PERMISSIVE_LICENSES = ['cc-by', 'lgpl', 'mpl']
+RESTRICTIVE_LICENSES = ['gpl', 'agpl', 'cc-by-nc', 'non-commercial']
+OPEN_SOURCE_LICENSES = ['mit', 'apache', 'bsd', 'gpl', 'lgpl', 'unlicense']
+OPEN_WEIGHTS_KEYWORDS = ['weights', 'checkpoint', 'safetensors']
+PAID_KEYWORDS = ['enterprise', 'pricing', 'subscription', 'pro plan', 'paid']
+FREEMIUM_KEYWORDS = ['free tier', 'freemium']
+OPEN_TAG_KEYWORDS = ['open']
+
+# Category keywords, checked in order (first category with a match wins)
+CATEGORY_RULES = {
+    ModelCategory.IMAGE_GENERATION: [
+        'text-to-image', 'image-generation', 'diffusion', 'stable-diffusion',
+        'sdxl', 'dall-e', 'midjourney', 'image generation', 'z-image',
+        'flux', 'imagen', 'kandinsky', 'pixart', 'image-to-image'
+    ],
+    ModelCategory.TEXT_GENERATION: [
+        'text-generation', 'llm', 'language-model', 'gpt', 'llama',
+        'mistral', 'chat', 'instruct', 'causal-lm'
+    ],
+    ModelCategory.COMPUTER_VISION: [
+        'image-classification', 'object-detection', 'segmentation',
+        'yolo', 'vision', 'cnn', 'resnet', 'vit'
+    ],
+    ModelCategory.NLP: [
+        'text-classification', 'ner', 'pos', 'sentiment',
+        'question-answering', 'summarization', 'translation'
+    ],
+    ModelCategory.MULTIMODAL: [
+        'multimodal', 'vision-language', 'clip', 'image-text',
+        'visual-question-answering'
+    ],
+    ModelCategory.AUDIO: [
+        'audio', 'speech', 'asr', 'tts', 'whisper', 'music',
+        'voice', 'sound'
+    ],
+    ModelCategory.VIDEO: [
+        'video', 'video-generation', 'video-to-video'
+    ],
+    ModelCategory.REINFORCEMENT_LEARNING: [
+        'reinforcement-learning', 'rl', 'reward-model', 'ppo', 'dqn'
+    ]
+}
+
+# One automaton for every keyword class, built once at import
+KEYWORD_MATCHER = KeywordMatcher(
+    QUALITY_KEYWORDS + BENCHMARK_KEYWORDS + SPEED_KEYWORDS + OPTIMIZATION_KEYWORDS +
+    LATENCY_KEYWORDS + PERMISSIVE_LICENSES + SEMI_PERMISSIVE_LICENSES +
+    RESTRICTIVE_LICENSES + OPEN_SOURCE_LICENSES + OPEN_WEIGHTS_KEYWORDS +
+    PAID_KEYWORDS + FREEMIUM_KEYWORDS + OPEN_TAG_KEYWORDS +
+    [kw for keywords in CATEGORY_RULES.values() for kw in keywords]
+)
+
+
+def find_keywords(model: ScrapedModel) -> Dict[str, Set[str]]:
+    """
+    Scan each text field of a model once for all known keywords.
+    
+    Returns:
+        Keywords found per field: readme, description, name, license, tags
+    """
+    return {
+        'readme': KEYWORD_MATCHER.find(model.readme_content or ''),
+        'description': KEYWORD_MATCHER.find(model.description or ''),
+        'name': KEYWORD_MATCHER.find(model.model_name),
+        'license': KEYWORD_MATCHER.find(model.license or ''),
+        'tags': KEYWORD_MATCHER.find(' '.join(model.tags))
+    }
+
+
+def _count(hits: Set[str], keywords: List[str]) -> int:
+    return sum(1 for kw in keywords if kw in hits)
+
+
+def _first(hits: Set[str], keywords: List[str]) -> Optional[str]:
+    return next((kw for kw in keywords if kw in hits), None)
+
+
 def calculate_scores(
     model: ScrapedModel, 
     category: str = "Other",
     quality_score: float = None,
     speed_score: float = None,
-    freedom_score: float = None
+    freedom_score: float = None,
+    heuristics: Dict[str, Any] = None
 ) -> ModelScores:
     """
     Calculate comprehensive scores for a model.
@@ -80,18 +169,18 @@ def calculate_scores(
         quality_score: Optional LLM-generated quality score
         speed_score: Optional LLM-generated speed score
         freedom_score: Optional LLM-generated freedom score
+        heuristics: Optional precomputed result of calculate_heuristic_scores()
         
     Returns:
         ModelScores with Quality, Speed, Freedom metrics and tags
     """
-    # Use LLM scores if provided, otherwise fall back to heuristic (not strictly recommended but safe)
-    # If no LLM scores and we removed heuristic logic, we can default to 60 or implement a simpler safe heuristic.
-    
+    if heuristics is None:
+        heuristics = calculate_heuristic_scores(model, category)
 
     # We will trust the passed scores or default to heuristics that DO NOT use deleted fields
-    q_score = quality_score if quality_score is not None else _calculate_quality_score(model, category)
-    s_score = speed_score if speed_score is not None else _calculate_speed_score(model)
-    f_score = freedom_score if freedom_score is not None else _calculate_freedom_score(model)
+    q_score = quality_score if quality_score is not None else heuristics['quality_score']
+    s_score = speed_score if speed_score is not None else heuristics['speed_score']
+    f_score = freedom_score if freedom_score is not None else heuristics['freedom_score']
 
     if q_score is None or s_score is None or f_score is None:
         raise print("Error: Missing scores")
@@ -106,22 +195,43 @@ def calculate_scores(
     # Determine tier
     tier = _assign_tier(overall_score)
     
-    # Assign visual tags
-    tags = _assign_tags(model)
-    
     return ModelScores(
         overall_score=round(overall_score, 2),
         tier=tier,
         quality_score=round(q_score, 2),
         speed_score=round(s_score, 2),
         freedom_score=round(f_score, 2),
-        tags=tags,
-        benchmarks=_extract_benchmarks(model),
+        tags=heuristics['tags'],
+        benchmarks=heuristics['benchmarks'],
         scoring_methodology=_get_methodology_description()
     )
 
 
-def _calculate_quality_score(model: ScrapedModel, category: str) -> float:
+def calculate_heuristic_scores(model: ScrapedModel, category: str = "Other") -> Dict[str, Any]:
+    """
+    Compute everything calculate_scores() derives from the model card alone.
+    
+    Independent of the generated article, so the pipeline can run it while
+    the article LLM call is still in flight.
+    
+    Returns:
+        Dict with heuristic quality/speed/freedom scores, visual tags and benchmarks
+    """
+    hits = find_keywords(model)
+    return {
+        'quality_score': _calculate_quality_score(model, category, hits),
+        'speed_score': _calculate_speed_score(model, hits),
+        'freedom_score': _calculate_freedom_score(model, hits),
+        'tags': _assign_tags(model, hits),
+        'benchmarks': _extract_benchmarks(model)
+    }
+
+
+def _calculate_quality_score(
+    model: ScrapedModel,
+    category: str,
+    hits: Optional[Dict[str, Set[str]]] = None
+) -> float:
     """
     Calculate Quality Score (0-100).
     
@@ -135,21 +245,15 @@ def _calculate_quality_score(model: ScrapedModel, category: str) -> float:
     """
     score = 60.0  # Base score
     
-    readme_lower = (model.readme_content or '').lower()
-    description_lower = (model.description or '').lower()
-    combined = readme_lower + description_lower
+    hits = hits or find_keywords(model)
+    combined = hits['readme'] | hits['description']
     
     # Quality keywords
-    quality_keywords = [
-        'state-of-the-art', 'sota', 'best', 'high-quality', 'photorealistic',
-        'accurate', 'precise', 'excellent', 'superior', 'outperforms'
-    ]
-    keyword_matches = sum(1 for kw in quality_keywords if kw in combined)
+    keyword_matches = _count(combined, QUALITY_KEYWORDS)
     score += min(20, keyword_matches * 4)
     
     # Benchmark mentions
-    benchmark_keywords = ['benchmark', 'evaluation', 'score', 'fid', 'accuracy', 'bleu']
-    benchmark_matches = sum(1 for kw in benchmark_keywords if kw in combined)
+    benchmark_matches = _count(combined, BENCHMARK_KEYWORDS)
     score += min(10, benchmark_matches * 3)
     
     # Removed likes check as the field is deprecated
@@ -157,7 +261,7 @@ def _calculate_quality_score(model: ScrapedModel, category: str) -> float:
     return min(100, max(0, score))
 
 
-def _calculate_speed_score(model: ScrapedModel) -> float:
+def _calculate_speed_score(model: ScrapedModel, hits: Optional[Dict[str, Set[str]]] = None) -> float:
     """
     Calculate Speed Score (0-100).
     
@@ -170,32 +274,22 @@ def _calculate_speed_score(model: ScrapedModel) -> float:
     """
     score = 60.0  # Base score
     
-    readme_lower = (model.readme_content or '').lower()
-    name_lower = model.model_name.lower()
-    combined = readme_lower + name_lower
+    hits = hits or find_keywords(model)
+    combined = hits['readme'] | hits['name']
     
     # Speed keywords in name or content
-    speed_keywords = ['turbo', 'fast', 'quick', 'efficient', 'lite', 'mini', 'tiny', 'small']
-    for kw in speed_keywords:
-        if kw in combined:
-            score += 8
+    score += 8 * _count(combined, SPEED_KEYWORDS)
     
     # Optimization mentions
-    optimization_keywords = ['optimized', 'quantized', 'distilled', 'pruned', 'onnx', 'tensorrt']
-    for kw in optimization_keywords:
-        if kw in combined:
-            score += 5
+    score += 5 * _count(combined, OPTIMIZATION_KEYWORDS)
     
     # Low latency mentions
-    latency_keywords = ['sub-second', 'real-time', 'instant', 'low-latency', 'ms']
-    for kw in latency_keywords:
-        if kw in combined:
-            score += 6
+    score += 6 * _count(combined, LATENCY_KEYWORDS)
     
     return min(100, max(0, score))
 
 
-def _calculate_freedom_score(model: ScrapedModel) -> float:
+def _calculate_freedom_score(model: ScrapedModel, hits: Optional[Dict[str, Set[str]]] = None) -> float:
     """
     Calculate Freedom Score (0-100).
     
@@ -209,33 +303,23 @@ def _calculate_freedom_score(model: ScrapedModel) -> float:
     """
     score = 50.0  # Base score
     
-    license_lower = (model.license or '').lower()
-    tags_lower = [t.lower() for t in model.tags]
-    readme_lower = (model.readme_content or '').lower()
+    hits = hits or find_keywords(model)
+    license_hits = hits['license']
     
     # Permissive licenses (high freedom)
-    permissive_licenses = ['mit', 'apache', 'bsd', 'unlicense', 'cc0', 'wtfpl']
-    for lic in permissive_licenses:
-        if lic in license_lower:
-            score += 30
-            break
+    if _first(license_hits, PERMISSIVE_LICENSES):
+        score += 30
     
     # Semi-permissive (medium)
-    semi_permissive = ['cc-by', 'lgpl', 'mpl']
-    for lic in semi_permissive:
-        if lic in license_lower:
-            score += 20
-            break
+    if _first(license_hits, SEMI_PERMISSIVE_LICENSES):
+        score += 20
     
     # Restrictive licenses (low freedom)
-    restrictive = ['gpl', 'agpl', 'cc-by-nc', 'non-commercial']
-    for lic in restrictive:
-        if lic in license_lower:
-            score += 10
-            break
+    if _first(license_hits, RESTRICTIVE_LICENSES):
+        score += 10
     
     # Open weights indicator
-    if 'open' in ' '.join(tags_lower) or 'weights' in readme_lower:
+    if 'open' in hits['tags'] or 'weights' in hits['readme']:
         score += 10
     
     # Hugging Face open models get bonus (accessible)
@@ -245,7 +329,7 @@ def _calculate_freedom_score(model: ScrapedModel) -> float:
     return min(100, max(0, score))
 
 
-def _assign_tags(model: ScrapedModel) -> List[ModelTag]:
+def _assign_tags(model: ScrapedModel, hits: Optional[Dict[str, Set[str]]] = None) -> List[ModelTag]:
     """
     Assign visual tags based on model licensing, cost, and access.
     
@@ -253,26 +337,23 @@ def _assign_tags(model: ScrapedModel) -> List[ModelTag]:
     """
     tags = []
     
-    license_lower = (model.license or '').lower()
-    readme_lower = (model.readme_content or '').lower()
-    tags_lower = ' '.join([t.lower() for t in model.tags])
+    hits = hits or find_keywords(model)
+    readme_hits = hits['readme']
     
     # Open Source check
-    open_source_indicators = ['mit', 'apache', 'bsd', 'gpl', 'lgpl', 'unlicense']
-    if any(lic in license_lower for lic in open_source_indicators):
+    if _first(hits['license'], OPEN_SOURCE_LICENSES):
         tags.append(TAG_DEFINITIONS['open_source'])
     
     # Open Weights check (Hugging Face models typically have open weights)
-    if model.huggingface_url and 'safetensors' in readme_lower:
+    if model.huggingface_url and 'safetensors' in readme_hits:
         tags.append(TAG_DEFINITIONS['open_weights'])
-    elif 'weights' in readme_lower or 'checkpoint' in readme_lower:
+    elif 'weights' in readme_hits or 'checkpoint' in readme_hits:
         tags.append(TAG_DEFINITIONS['open_weights'])
     
     # Free check
-    paid_indicators = ['enterprise', 'pricing', 'subscription', 'pro plan', 'paid']
-    if not any(p in readme_lower for p in paid_indicators):
+    if not _first(readme_hits, PAID_KEYWORDS):
         tags.append(TAG_DEFINITIONS['free'])
-    elif 'free tier' in readme_lower or 'freemium' in readme_lower:
+    elif _first(readme_hits, FREEMIUM_KEYWORDS):
         tags.append(TAG_DEFINITIONS['freemium'])
     else:
         tags.append(TAG_DEFINITIONS['closed_paid'])
@@ -333,47 +414,14 @@ def classify_category(model: ScrapedModel) -> ModelCategory:
     """
     Automatically classify model into a category based on tags and description.
     """
-    tags_lower = [t.lower() for t in model.tags]
-    description_lower = (model.description or '').lower()
-    name_lower = model.model_name.lower()
-    combined = ' '.join(tags_lower) + ' ' + description_lower + ' ' + name_lower
-    
-    category_rules = {
-        ModelCategory.IMAGE_GENERATION: [
-            'text-to-image', 'image-generation', 'diffusion', 'stable-diffusion',
-            'sdxl', 'dall-e', 'midjourney', 'image generation', 'z-image',
-            'flux', 'imagen', 'kandinsky', 'pixart', 'image-to-image'
-        ],
-        ModelCategory.TEXT_GENERATION: [
-            'text-generation', 'llm', 'language-model', 'gpt', 'llama',
-            'mistral', 'chat', 'instruct', 'causal-lm'
-        ],
-        ModelCategory.COMPUTER_VISION: [
-            'image-classification', 'object-detection', 'segmentation',
-            'yolo', 'vision', 'cnn', 'resnet', 'vit'
-        ],
-        ModelCategory.NLP: [
-            'text-classification', 'ner', 'pos', 'sentiment',
-            'question-answering', 'summarization', 'translation'
-        ],
-        ModelCategory.MULTIMODAL: [
-            'multimodal', 'vision-language', 'clip', 'image-text',
-            'visual-question-answering'
-        ],
-        ModelCategory.AUDIO: [
-            'audio', 'speech', 'asr', 'tts', 'whisper', 'music',
-            'voice', 'sound'
-        ],
-        ModelCategory.VIDEO: [
-            'video', 'video-generation', 'video-to-video'
-        ],
-        ModelCategory.REINFORCEMENT_LEARNING: [
-            'reinforcement-learning', 'rl', 'reward-model', 'ppo', 'dqn'
-        ]
-    }
+    combined = (
+        KEYWORD_MATCHER.find(' '.join(model.tags)) |
+        KEYWORD_MATCHER.find(model.description or '') |
+        KEYWORD_MATCHER.find(model.model_name)
+    )
     
-    for category, keywords in category_rules.items():
-        if any(kw in combined for kw in keywords):
+    for category, keywords in CATEGORY_RULES.items():
+        if _first(combined, keywords):
             return category
     
     return ModelCategory.OTHER
@@ -6,21 +6,37 @@ This module handles URL validation, content extraction, and image downloading.
 
 import re
 import os
+import shutil
+import hashlib
 import httpx
 import asyncio
+import aiofiles
 from bs4 import BeautifulSoup
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
 
+from ..cache import DiskCache
+from ..clients import clients
 from ..config import settings
 from ..models import ScrapedModel
 
 
-# Rate limiting: 1 request per second
-RATE_LIMIT_DELAY = 1.0
+# Rate limiting is applied per host by the shared clients (see app/rate_limit.py)
 HUGGINGFACE_DOMAIN = "huggingface.co"
 
+# Image downloads
+IMAGE_CHUNK_SIZE = 64 * 1024
+IMAGE_DOWNLOAD_ATTEMPTS = 3
+
+# Persistent HTTP cache: ETag/Last-Modified validators plus the data
+# extracted from each response, so a 304 skips parsing entirely
+http_cache = DiskCache(
+    Path(settings.cache_dir) / "http",
+    default_ttl=settings.scrape_cache_ttl,
+    max_bytes=settings.scrape_cache_max_mb * 1024 * 1024
+)
+
 
 def validate_huggingface_url(url: str) -> bool:
     """Validate that URL is a valid Hugging Face model page."""
@@ -41,6 +57,10 @@ async def scrape_model(url: str) -> ScrapedModel:
     """
     Scrape a Hugging Face model page and extract all relevant content.
     
+    Both the model page and the API JSON are fetched conditionally against
+    the on-disk HTTP cache. When neither changed, the previously extracted
+    model is returned without re-parsing the HTML.
+    
     Args:
         url: Valid Hugging Face model URL
         
@@ -50,92 +70,181 @@ async def scrape_model(url: str) -> ScrapedModel:
     if not validate_huggingface_url(url):
         raise ValueError(f"Invalid Hugging Face URL: {url}")
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        # Extract model name from URL
-        path_parts = [p for p in urlparse(url).path.split('/') if p]
-        if len(path_parts) >= 2:
-            organization = path_parts[0]
-            model_name = f"{path_parts[0]}/{path_parts[1]}"
-        else:
-            organization = None
-            model_name = path_parts[0]
-        
-        display_name = path_parts[-1]
-        
-        # Fetch from Hugging Face API for accurate stats
-        api_data = await _fetch_api_data(client, model_name)
-        
-        # Fetch main page for content
-        response = await client.get(url)
+    client = clients.http('huggingface')
+    
+    # Extract model name from URL
+    path_parts = [p for p in urlparse(url).path.split('/') if p]
+    if len(path_parts) >= 2:
+        organization = path_parts[0]
+        model_name = f"{path_parts[0]}/{path_parts[1]}"
+    else:
+        organization = None
+        model_name = path_parts[0]
+    
+    display_name = path_parts[-1]
+    
+    # Fetch from Hugging Face API for accurate stats
+    api_data, api_changed, api_ok = await _fetch_api_data(client, model_name)
+    
+    # Fetch main page for content
+    page_key = f"page:{url}"
+    response, cached_page = await _conditional_get(client, url, page_key)
+    
+    if response is None:
+        # 304: page unchanged, reuse what we extracted last time (also when
+        # the API call failed: the cached model has the last good API data)
+        if (not api_changed or not api_ok) and cached_page.get('model'):
+            return ScrapedModel(**cached_page['model'])
+        page = cached_page['page']
+    else:
         response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        # Extract description
-        description = _extract_description(soup) or api_data.get('description', '')
-        
-        # Extract README content
-        readme_content = _extract_readme(soup)
-        
-        # Extract metadata
-        metadata = _extract_metadata(soup)
-        
-        # Extract tags (prefer API data)
-        tags = api_data.get('tags', []) or _extract_tags(soup)
-        
-        # Extract images
-        images = _extract_images(soup, url)
-        featured_image = images[0] if images else None
-        
-        # Extract code snippets
-        code_snippets = _extract_code_snippets(soup)
-        
-        # Get stats and metadata from API (more reliable)
-        license_info = api_data.get('license', metadata.get('license'))
-        
-        # Fallback: check tags for license if still None
-        if not license_info:
-            for tag in tags:
-                if tag.lower().startswith('license:'):
-                    license_info = tag.split(':', 1)[1]
-                    break
-        
-        # New Metadata Extraction Logic
-        safetensors = _extract_safetensors_status(api_data)
-        model_size = _extract_model_size(api_data)
-        tensor_types = _extract_tensor_types(api_data)
-        
-        await asyncio.sleep(RATE_LIMIT_DELAY)  # Rate limiting
-        
-        return ScrapedModel(
-            huggingface_url=url,
-            model_name=model_name,
-            display_name=display_name,
-            organization=organization,
-            description=description,
-            readme_content=readme_content,
-            license=license_info,
-            tags=tags,
-            model_metadata=metadata,
-            featured_image_url=featured_image,
-            safetensors=safetensors,
-            model_size=model_size,
-            tensor_types=tensor_types,
-            code_snippets=code_snippets,
-            images=images
-        )
-
-
-async def _fetch_api_data(client: httpx.AsyncClient, model_id: str) -> dict:
-    """Fetch model data from Hugging Face API."""
+        page = _extract_page(response.text, url)
+    
+    model = _build_scraped_model(url, model_name, display_name, organization, api_data, page)
+    
+    # Never cache a model built without API data: once the API revalidates
+    # with 304, it would be served until the page itself changes
+    if api_ok and (response is not None or api_changed):
+        validators = _validators(response) if response is not None else cached_page
+        if validators.get('etag') or validators.get('last_modified'):
+            await http_cache.set(page_key, {
+                'etag': validators.get('etag'),
+                'last_modified': validators.get('last_modified'),
+                'page': page,
+                'model': model.model_dump()
+            })
+    
+    return model
+
+
+def _extract_page(html: str, url: str) -> Dict[str, Any]:
+    """Extract everything scrape_model() needs from the model page HTML."""
+    soup = BeautifulSoup(html, 'lxml')
+    
+    return {
+        'description': _extract_description(soup),
+        'readme_content': _extract_readme(soup),
+        'metadata': _extract_metadata(soup),
+        'tags': _extract_tags(soup),
+        'images': _extract_images(soup, url),
+        'code_snippets': _extract_code_snippets(soup)
+    }
+
+
+def _build_scraped_model(
+    url: str,
+    model_name: str,
+    display_name: str,
+    organization: Optional[str],
+    api_data: Dict[str, Any],
+    page: Dict[str, Any]
+) -> ScrapedModel:
+    """Combine API data with extracted page content into a ScrapedModel."""
+    metadata = page['metadata']
+    
+    # Extract description
+    description = page['description'] or api_data.get('description', '')
+    
+    # Extract tags (prefer API data)
+    tags = api_data.get('tags', []) or page['tags']
+    
+    # Extract images
+    images = page['images']
+    featured_image = images[0] if images else None
+    
+    # Get stats and metadata from API (more reliable)
+    license_info = api_data.get('license', metadata.get('license'))
+    
+    # Fallback: check tags for license if still None
+    if not license_info:
+        for tag in tags:
+            if tag.lower().startswith('license:'):
+                license_info = tag.split(':', 1)[1]
+                break
+    
+    # New Metadata Extraction Logic
+    safetensors = _extract_safetensors_status(api_data)
+    model_size = _extract_model_size(api_data)
+    tensor_types = _extract_tensor_types(api_data)
+    
+    return ScrapedModel(
+        huggingface_url=url,
+        model_name=model_name,
+        display_name=display_name,
+        organization=organization,
+        description=description,
+        readme_content=page['readme_content'],
+        license=license_info,
+        tags=tags,
+        model_metadata=metadata,
+        featured_image_url=featured_image,
+        safetensors=safetensors,
+        model_size=model_size,
+        tensor_types=tensor_types,
+        code_snippets=page['code_snippets'],
+        images=images
+    )
+
+
+def _validators(response: httpx.Response) -> Dict[str, Optional[str]]:
+    """Cache validators returned by the server."""
+    return {
+        'etag': response.headers.get('etag'),
+        'last_modified': response.headers.get('last-modified')
+    }
+
+
+async def _conditional_get(
+    client: httpx.AsyncClient,
+    url: str,
+    cache_key: str
+) -> Tuple[Optional[httpx.Response], Optional[Dict[str, Any]]]:
+    """
+    GET a URL, revalidating against the HTTP cache entry if there is one.
+    
+    Returns:
+        (response, cached_entry). response is None when the server answered
+        304 Not Modified and the cached entry is still valid.
+    """
+    cached = await http_cache.get(cache_key)
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    response = await client.get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return None, cached
+    return response, cached
+
+
+async def _fetch_api_data(client: httpx.AsyncClient, model_id: str) -> Tuple[dict, bool, bool]:
+    """
+    Fetch model data from Hugging Face API.
+    
+    Returns:
+        (api_data, changed, ok). changed is False when the cached copy was
+        revalidated. ok is False when the API call failed; api_data is then
+        the last cached copy, or empty if there is none.
+    """
+    api_url = f"https://huggingface.co/api/models/{model_id}"
+    cache_key = f"api:{api_url}"
     try:
-        api_url = f"https://huggingface.co/api/models/{model_id}"
-        response = await client.get(api_url)
+        response, cached = await _conditional_get(client, api_url, cache_key)
+        if response is None:
+            return cached['data'], False, True
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            validators = _validators(response)
+            if validators['etag'] or validators['last_modified']:
+                await http_cache.set(cache_key, {**validators, 'data': data})
+            return data, True, True
     except Exception:
         pass
-    return {}
+    cached = await http_cache.get(cache_key)
+    return (cached or {}).get('data', {}), True, False
 
 
 def _extract_description(soup: BeautifulSoup) -> Optional[str]:
@@ -261,6 +370,11 @@ async def download_images(
     """
     Download images to local cache.
     
+    Downloads run concurrently (bounded by IMAGE_DOWNLOAD_CONCURRENCY) and
+    stream to disk in chunks. Files are stored once per content hash under
+    <cache_dir>/images/store and linked into the session directory, and an
+    interrupted download resumes from its partial file on the next attempt.
+    
     Args:
         image_urls: List of image URLs to download
         session_id: Unique session ID for organizing cache
@@ -269,34 +383,184 @@ async def download_images(
     Returns:
         List of local file paths
     """
-    cache_path = Path(cache_dir or settings.cache_dir) / session_id
+    base_path = Path(cache_dir or settings.cache_dir)
+    cache_path = base_path / session_id
     cache_path.mkdir(parents=True, exist_ok=True)
+    images_path = base_path / "images"
     
-    local_paths = []
+    client = clients.http('images')
+    semaphore = asyncio.Semaphore(settings.image_download_concurrency)
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for i, url in enumerate(image_urls):
-            try:
-                response = await client.get(url)
+    async def fetch(i: int, url: str) -> Optional[str]:
+        try:
+            async with semaphore:
+                stored = await _download_once(client, url, images_path)
+        except Exception as e:
+            print(f"Failed to download {url}: {e}")
+            return None
+        
+        # Determine filename
+        filepath = cache_path / f"image_{i}{stored.suffix}"
+        _link_file(stored, filepath)
+        return str(filepath)
+    
+    results = await asyncio.gather(*(fetch(i, url) for i, url in enumerate(image_urls)))
+    return [path for path in results if path]
+
+
+# URL -> in-progress download, so concurrent sessions sharing an image
+# don't write the same partial file twice
+_downloads_in_flight: Dict[str, asyncio.Future] = {}
+
+# Result of an in-flight download whose task was cancelled
+_DOWNLOAD_CANCELLED = object()
+
+
+async def _download_once(client: httpx.AsyncClient, url: str, images_path: Path) -> Path:
+    """Download a URL into the content-addressed store, sharing in-flight downloads."""
+    in_flight = _downloads_in_flight.get(url)
+    while in_flight is not None:
+        stored = await asyncio.shield(in_flight)
+        if stored is not _DOWNLOAD_CANCELLED:
+            return stored
+        # The downloading task was cancelled: the next waiter takes over
+        in_flight = _downloads_in_flight.get(url)
+    
+    future = asyncio.get_running_loop().create_future()
+    _downloads_in_flight[url] = future
+    try:
+        stored = await _download_to_store(client, url, images_path)
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            # Only this task was cancelled; waiters retry instead
+            future.set_result(_DOWNLOAD_CANCELLED)
+        else:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't log as unretrieved
+        raise
+    else:
+        future.set_result(stored)
+        return stored
+    finally:
+        _downloads_in_flight.pop(url, None)
+
+
+async def _download_to_store(client: httpx.AsyncClient, url: str, images_path: Path) -> Path:
+    """
+    Stream an image into <images_path>/store/<sha256><ext>.
+    
+    Bytes are appended to <images_path>/partial/<url hash>.part; if that file
+    exists from an earlier failed attempt, the download resumes with a Range
+    request. The ETag or Last-Modified of the response that started the file
+    is kept next to it and sent as If-Range, so a changed remote file is
+    downloaded again in full instead of being appended to the old bytes. A
+    206 whose Content-Range does not start at the resume offset is discarded
+    and the download starts over.
+    
+    Returns:
+        Path of the stored file
+    """
+    max_bytes = settings.image_max_mb * 1024 * 1024
+    ext = Path(urlparse(url).path).suffix or '.jpg'
+    
+    partial_dir = images_path / "partial"
+    store_dir = images_path / "store"
+    partial_dir.mkdir(parents=True, exist_ok=True)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    partial = partial_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.part"
+    validator_file = partial.with_suffix('.validator')
+    
+    for attempt in range(IMAGE_DOWNLOAD_ATTEMPTS):
+        offset = partial.stat().st_size if partial.exists() else 0
+        validator = validator_file.read_text('utf-8') if offset and validator_file.exists() else None
+        headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if validator else {}
+        if not validator:
+            offset = 0  # Nothing to tell whether the partial file is still current
+        try:
+            async with client.stream('GET', url, headers=headers) as response:
+                if response.status_code == 416:
+                    # Stale partial file; start over
+                    partial.unlink(missing_ok=True)
+                    validator_file.unlink(missing_ok=True)
+                    continue
                 response.raise_for_status()
                 
-                # Determine filename
-                ext = Path(urlparse(url).path).suffix or '.jpg'
-                filename = f"image_{i}{ext}"
-                filepath = cache_path / filename
-                
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
+                if response.status_code == 206 and _content_range_start(response.headers) != offset:
+                    # Not the range asked for; appending it would corrupt the file
+                    partial.unlink(missing_ok=True)
+                    validator_file.unlink(missing_ok=True)
+                    continue
+                if response.status_code != 206:
+                    # Range ignored, or the file changed since the partial was written
+                    offset = 0
+                    validator = _range_validator(response.headers)
+                    if validator:
+                        validator_file.write_text(validator, 'utf-8')
+                    else:
+                        validator_file.unlink(missing_ok=True)
                 
-                local_paths.append(str(filepath))
+                length = response.headers.get('content-length')
+                if length and offset + int(length) > max_bytes:
+                    raise ValueError(f"Image larger than {settings.image_max_mb} MB")
                 
-                await asyncio.sleep(RATE_LIMIT_DELAY)
-                
-            except Exception as e:
-                print(f"Failed to download {url}: {e}")
-    
+                written = offset
+                async with aiofiles.open(partial, 'ab' if offset else 'wb') as f:
+                    async for chunk in response.aiter_bytes(IMAGE_CHUNK_SIZE):
+                        written += len(chunk)
+                        if written > max_bytes:
+                            raise ValueError(f"Image larger than {settings.image_max_mb} MB")
+                        await f.write(chunk)
+            break
+        except ValueError:
+            partial.unlink(missing_ok=True)
+            validator_file.unlink(missing_ok=True)
+            raise
+        except httpx.TransportError:
+            # Keep the partial file and resume on the next attempt
+            if attempt == IMAGE_DOWNLOAD_ATTEMPTS - 1:
+                raise
+    else:
+        raise RuntimeError(f"Could not download {url}")
     
-    return local_paths
+    validator_file.unlink(missing_ok=True)
+    digest = await asyncio.to_thread(_file_sha256, partial)
+    stored = store_dir / f"{digest}{ext}"
+    if stored.exists():
+        partial.unlink(missing_ok=True)  # Already have this content
+    else:
+        os.replace(partial, stored)
+    return stored
+
+
+def _range_validator(headers: httpx.Headers) -> Optional[str]:
+    """Validator usable in If-Range: a strong ETag, else Last-Modified."""
+    etag = headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return headers.get('last-modified')
+
+
+def _content_range_start(headers: httpx.Headers) -> Optional[int]:
+    """First byte position of a 206 response's Content-Range, or None if unparsable."""
+    match = re.match(r'\s*bytes\s+(\d+)-\d+/(?:\d+|\*)\s*$', headers.get('content-range', ''))
+    return int(match.group(1)) if match else None
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(IMAGE_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_file(source: Path, target: Path) -> None:
+    """Hard-link source to target, copying when linking isn't possible."""
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
 
 
 def _extract_safetensors_status(api_data: Dict[str, Any]) -> bool:
@@ -5,11 +5,12 @@ Handles image upload, database insertion, and Netlify rebuild triggers.
 """
 
 import os
-import httpx
+import asyncio
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from supabase import create_client, Client
 
+from ..clients import clients
 from ..config import settings
 
 
@@ -32,6 +33,11 @@ async def upload_to_supabase(
     """
     Upload all preview data to Supabase.
     
+    With SUPABASE_PUBLISH_MODE=rpc every row is written by the
+    `publish_model` database function (migration 004) in a single
+    transaction. The default "rest" mode writes each table through
+    PostgREST separately.
+    
     Args:
         preview_id: Local preview session ID
         model_data: Model information
@@ -52,8 +58,105 @@ async def upload_to_supabase(
     # Step 1: Upload images to storage
     image_urls = await _upload_images(client, images, preview_id)
     
+    if settings.supabase_publish_mode == 'rpc':
+        return await _publish_rpc(client, model_data, article_data, linkedin_data, scores_data, images, image_urls)
+    return await _publish_rest(client, model_data, article_data, linkedin_data, scores_data, images, image_urls)
+
+
+async def _publish_rpc(
+    client: Client,
+    model_data: Dict[str, Any],
+    article_data: Dict[str, Any],
+    linkedin_data: Optional[Dict[str, Any]],
+    scores_data: Dict[str, Any],
+    images: List[str],
+    image_urls: List[str]
+) -> Dict[str, Any]:
+    """Steps 2-8 in one round trip: the whole preview is written in one transaction."""
+    payload = {
+        'model': _model_record(model_data, image_urls),
+        'article': _article_record(article_data, image_urls),
+        'scores': _scores_record(scores_data),
+        'linkedin': _linkedin_record(linkedin_data) if linkedin_data else None,
+        'images': _image_records(model_data, images, image_urls),
+        'code_snippets': _snippet_records(model_data)
+    }
+    
+    result = await _execute(client.rpc('publish_model', {'payload': payload}))
+    published = result.data
+    
+    return {
+        'model_id': published['model_id'],
+        'article_id': published['article_id'],
+        'live_url': f"https://toptiermodels.com/article/{published['slug']}"
+    }
+
+
+async def _publish_rest(
+    client: Client,
+    model_data: Dict[str, Any],
+    article_data: Dict[str, Any],
+    linkedin_data: Optional[Dict[str, Any]],
+    scores_data: Dict[str, Any],
+    images: List[str],
+    image_urls: List[str]
+) -> Dict[str, Any]:
+    """Steps 2-8 as separate PostgREST calls (not atomic)."""
     # Step 2: Insert model record
-    model_record = {
+    model_record = _model_record(model_data, image_urls)
+    model_result = await _execute(client.table('models').upsert(model_record, on_conflict='huggingface_url'))
+    model_id = model_result.data[0]['id']
+    
+    # Step 3: Insert article record
+    article_record = {'model_id': model_id, **_article_record(article_data, image_urls)}
+    
+    # Step 4: Insert model scores
+    scores_record = {'model_id': model_id, **_scores_record(scores_data)}
+    
+    # Step 5: Code snippets (single bulk insert)
+    snippet_records = [
+        {'model_id': model_id, **snippet}
+        for snippet in _snippet_records(model_data)
+    ]
+    
+    # Steps 3-6 only depend on model_id, so they run concurrently
+    category = model_data.get('category', 'Other')
+    article_result, _, _, _ = await asyncio.gather(
+        _execute(client.table('articles').upsert(article_record, on_conflict='slug')),
+        _execute(client.table('model_scores').upsert(scores_record, on_conflict='model_id')),
+        # Step 6: Update tierlist model count
+        _execute(client.rpc('increment_tierlist_count', {'cat': category})),
+        _execute(client.table('code_snippets').insert(snippet_records)) if snippet_records else _noop()
+    )
+    article_id = article_result.data[0]['id']
+    article_slug = article_result.data[0]['slug']
+    
+    # Step 7: Image records (single bulk insert)
+    image_records = [
+        {
+            'model_id': model_id,
+            'article_id': article_id,
+            'storage_path': f"models/{model_id}/image_{i}.webp",
+            **record
+        }
+        for i, record in enumerate(_image_records(model_data, images, image_urls))
+    ]
+    
+    # Steps 7-8 depend on article_id
+    await asyncio.gather(
+        _execute(client.table('images').insert(image_records)) if image_records else _noop(),
+        _replace_linkedin_post(client, article_id, model_id, linkedin_data)
+    )
+    
+    return {
+        'model_id': model_id,
+        'article_id': article_id,
+        'live_url': f"https://toptiermodels.com/article/{article_slug}"
+    }
+
+
+def _model_record(model_data: Dict[str, Any], image_urls: List[str]) -> Dict[str, Any]:
+    return {
         'huggingface_url': model_data.get('huggingface_url'),
         'model_name': model_data.get('model_name'),
         'display_name': model_data.get('display_name'),
@@ -70,13 +173,10 @@ async def upload_to_supabase(
         'tensor_types': model_data.get('tensor_types', []),
         'status': 'active'
     }
-    
-    model_result = client.table('models').upsert(model_record, on_conflict='huggingface_url').execute()
-    model_id = model_result.data[0]['id']
-    
-    # Step 3: Insert article record
-    article_record = {
-        'model_id': model_id,
+
+
+def _article_record(article_data: Dict[str, Any], image_urls: List[str]) -> Dict[str, Any]:
+    return {
         'title': article_data.get('title'),
         'slug': article_data.get('slug'),
         'excerpt': article_data.get('excerpt'),
@@ -87,34 +187,10 @@ async def upload_to_supabase(
         'seo_keywords': article_data.get('seo_keywords', []),
         'published': True
     }
-    
-    article_result = client.table('articles').upsert(article_record, on_conflict='slug').execute()
-    article_id = article_result.data[0]['id']
-    article_slug = article_result.data[0]['slug']
-    
-    # Step 4: Insert LinkedIn post
-    if linkedin_data:
-        linkedin_record = {
-            'article_id': article_id,
-            'model_id': model_id,
-            'content': linkedin_data.get('content'),
-            'hook': linkedin_data.get('hook'),
-            'key_points': linkedin_data.get('key_points', []),
-            'call_to_action': linkedin_data.get('call_to_action'),
-            'hashtags': linkedin_data.get('hashtags', []),
-            'character_count': linkedin_data.get('character_count', 0)
-        }
-        
-        # Clean up old LinkedIn posts for this article to avoid duplicates (since no unique constraint)
-        client.table('simplified_articles').delete().eq('article_id', article_id).execute()
-        client.table('simplified_articles').insert(linkedin_record).execute()
-    else:
-        # If no linkedin data, ensure we don't have stray records (optional, but good for consistency)
-        client.table('simplified_articles').delete().eq('article_id', article_id).execute()
-    
-    # Step 5: Insert model scores
-    scores_record = {
-        'model_id': model_id,
+
+
+def _scores_record(scores_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         'overall_score': scores_data.get('overall_score'),
         'tier': scores_data.get('tier'),
         'quality_score': scores_data.get('quality_score'),
@@ -123,30 +199,22 @@ async def upload_to_supabase(
         'benchmarks': scores_data.get('benchmarks', {}),
         'scoring_methodology': scores_data.get('scoring_methodology')
     }
-    
-    client.table('model_scores').upsert(scores_record, on_conflict='model_id').execute()
-    
-    # Step 6: Insert image records
-    for i, url in enumerate(image_urls):
-        image_record = {
-            'model_id': model_id,
-            'article_id': article_id,
-            'source_url': images[i] if i < len(images) else url,
-            'storage_path': f"models/{model_id}/image_{i}.webp",
-            'public_url': url,
-            'alt_text': f"{model_data.get('display_name')} - Image {i+1}"
-        }
-        client.table('images').insert(image_record).execute()
-    
-    # Step 7: Update tierlist model count
-    category = model_data.get('category', 'Other')
-    client.rpc('increment_tierlist_count', {'cat': category}).execute()
-    
-    # Step 8: Insert code snippets if present
-    code_snippets = model_data.get('code_snippets', [])
-    for i, snippet in enumerate(code_snippets):
-        snippet_record = {
-            'model_id': model_id,
+
+
+def _linkedin_record(linkedin_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'content': linkedin_data.get('content'),
+        'hook': linkedin_data.get('hook'),
+        'key_points': linkedin_data.get('key_points', []),
+        'call_to_action': linkedin_data.get('call_to_action'),
+        'hashtags': linkedin_data.get('hashtags', []),
+        'character_count': linkedin_data.get('character_count', 0)
+    }
+
+
+def _snippet_records(model_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {
             'title': snippet.get('title', f'Example {i+1}'),
             'description': snippet.get('description'),
             'language': snippet.get('language', 'python'),
@@ -154,13 +222,51 @@ async def upload_to_supabase(
             'snippet_type': snippet.get('type', 'basic_usage'),
             'order': i
         }
-        client.table('code_snippets').insert(snippet_record).execute()
+        for i, snippet in enumerate(model_data.get('code_snippets', []))
+    ]
+
+
+def _image_records(
+    model_data: Dict[str, Any],
+    images: List[str],
+    image_urls: List[str]
+) -> List[Dict[str, Any]]:
+    return [
+        {
+            'source_url': images[i] if i < len(images) else url,
+            'public_url': url,
+            'alt_text': f"{model_data.get('display_name')} - Image {i+1}"
+        }
+        for i, url in enumerate(image_urls)
+    ]
+
+
+async def _execute(query) -> Any:
+    """Run a blocking supabase-py query in a worker thread."""
+    return await asyncio.to_thread(query.execute)
+
+
+async def _noop() -> None:
+    return None
+
+
+async def _replace_linkedin_post(
+    client: Client,
+    article_id: str,
+    model_id: str,
+    linkedin_data: Optional[Dict[str, Any]]
+) -> None:
+    """Step 8: Replace the LinkedIn post stored for an article."""
+    # Clean up old LinkedIn posts for this article to avoid duplicates (since no unique constraint)
+    await _execute(client.table('simplified_articles').delete().eq('article_id', article_id))
     
-    return {
-        'model_id': model_id,
-        'article_id': article_id,
-        'live_url': f"https://toptiermodels.com/article/{article_slug}"
-    }
+    if linkedin_data:
+        linkedin_record = {
+            'article_id': article_id,
+            'model_id': model_id,
+            **_linkedin_record(linkedin_data)
+        }
+        await _execute(client.table('simplified_articles').insert(linkedin_record))
 
 
 async def _upload_images(
@@ -171,20 +277,21 @@ async def _upload_images(
     """
     Upload local images to Supabase Storage.
     
+    Uploads run concurrently in worker threads, bounded by
+    SUPABASE_UPLOAD_CONCURRENCY.
+    
     Args:
         client: Supabase client
         image_paths: Local file paths
         preview_id: Session ID for folder organization
         
     Returns:
-        List of public URLs
+        List of public URLs, in the order of image_paths
     """
-    public_urls = []
+    semaphore = asyncio.Semaphore(settings.supabase_upload_concurrency)
+    bucket = client.storage.from_('model-images')
     
-    for i, path in enumerate(image_paths):
-        if not os.path.exists(path):
-            continue
-            
+    def upload(i: int, path: str) -> str:
         # Read file
         with open(path, 'rb') as f:
             file_data = f.read()
@@ -194,17 +301,25 @@ async def _upload_images(
         storage_path = f"models/{preview_id}/{filename}"
         
         # Upload to storage
-        client.storage.from_('model-images').upload(
+        bucket.upload(
             storage_path,
             file_data,
             {'content-type': 'image/webp'}
         )
         
         # Get public URL
-        public_url = client.storage.from_('model-images').get_public_url(storage_path)
-        public_urls.append(public_url)
+        return bucket.get_public_url(storage_path)
+    
+    async def upload_bounded(i: int, path: str) -> str:
+        async with semaphore:
+            return await asyncio.to_thread(upload, i, path)
     
-    return public_urls
+    uploads = [
+        upload_bounded(i, path)
+        for i, path in enumerate(image_paths)
+        if os.path.exists(path)
+    ]
+    return list(await asyncio.gather(*uploads))
 
 
 async def trigger_netlify_rebuild():
@@ -212,6 +327,5 @@ async def trigger_netlify_rebuild():
     if not settings.netlify_build_hook_url:
         return False
         
-    async with httpx.AsyncClient() as client:
-        response = await client.post(settings.netlify_build_hook_url)
-        return response.status_code == 200
+    response = await clients.http().post(settings.netlify_build_hook_url)
+    return response.status_code == 200
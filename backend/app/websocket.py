@@ -1,62 +1,190 @@
 """
 WebSocket Manager for real-time preview updates.
+
+Every connection has a bounded send queue drained by its own writer task, so
+publishing an update only encodes it once and enqueues it: a slow client
+delays nobody but itself. When a client's queue is full the slow-consumer
+policy decides what gives:
+
+- "drop": discard the oldest queued message
+- "coalesce": replace a queued message with the same coalesce key (e.g. an
+  older version of the same field), otherwise drop the oldest
+- "disconnect": close the connection (code 1013, try again later)
 """
 
 import asyncio
-from typing import Dict, Set
-from fastapi import WebSocket, WebSocketDisconnect
 import json
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from .config import settings
+
+
+SLOW_CONSUMER_POLICIES = ("drop", "coalesce", "disconnect")
+
+# Close code for clients dropped by the "disconnect" policy
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class _Subscriber:
+    """One connection's send queue and the task writing it to the socket."""
+
+    def __init__(self, websocket: WebSocket, preview_id: str, max_queue: int):
+        self.websocket = websocket
+        self.preview_id = preview_id
+        self.max_queue = max(1, max_queue)
+        self.queue: Deque[Tuple[Optional[str], str]] = deque()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def offer(self, message: str, key: Optional[str], policy: str) -> bool:
+        """
+        Enqueue an encoded message without waiting.
+
+        Returns:
+            False if the subscriber must be disconnected
+        """
+        queue = self.queue
+        if len(queue) >= self.max_queue:
+            if policy == "disconnect":
+                return False
+            self.dropped += 1
+            replaced = False
+            if policy == "coalesce" and key is not None:
+                for i, (queued_key, _) in enumerate(queue):
+                    if queued_key == key:
+                        del queue[i]
+                        replaced = True
+                        break
+            if not replaced:
+                queue.popleft()
+        queue.append((key, message))
+        self.ready.set()
+        return True
+
+    async def run(self, on_error) -> None:
+        """Send queued messages in order until cancelled or the socket fails."""
+        queue = self.queue
+        try:
+            while True:
+                while not queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+                _, message = queue.popleft()
+                await self.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            on_error(self)
 
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time preview updates."""
-    
-    def __init__(self):
-        # Map of preview_id to set of connected websockets
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-    
+
+    def __init__(self, max_queue: int = 256, policy: str = "coalesce"):
+        """
+        Args:
+            max_queue: Messages buffered per connection before the policy applies
+            policy: Slow-consumer policy, one of SLOW_CONSUMER_POLICIES
+        """
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"policy must be one of: {', '.join(SLOW_CONSUMER_POLICIES)}")
+        self.max_queue = max_queue
+        self.policy = policy
+        # Map of preview_id to its connections
+        self.active_connections: Dict[str, Dict[WebSocket, _Subscriber]] = {}
+        self._dropped = 0
+        self._disconnected_slow = 0
+        self._closing: Set[asyncio.Task] = set()
+
     async def connect(self, websocket: WebSocket, preview_id: str):
-        """Accept a new WebSocket connection."""
+        """Accept a new WebSocket connection and start its writer."""
         await websocket.accept()
-        if preview_id not in self.active_connections:
-            self.active_connections[preview_id] = set()
-        self.active_connections[preview_id].add(websocket)
-    
+        subscriber = _Subscriber(websocket, preview_id, self.max_queue)
+        subscriber.task = asyncio.create_task(subscriber.run(self._writer_failed))
+        self.active_connections.setdefault(preview_id, {})[websocket] = subscriber
+
     def disconnect(self, websocket: WebSocket, preview_id: str):
-        """Remove a WebSocket connection."""
-        if preview_id in self.active_connections:
-            self.active_connections[preview_id].discard(websocket)
-            if not self.active_connections[preview_id]:
-                del self.active_connections[preview_id]
-    
-    async def send_update(self, preview_id: str, data: dict):
-        """Send an update to all connections for a preview."""
-        if preview_id not in self.active_connections:
+        """Remove a WebSocket connection and stop its writer."""
+        connections = self.active_connections.get(preview_id)
+        if connections is None:
+            return
+        subscriber = connections.pop(websocket, None)
+        if not connections:
+            del self.active_connections[preview_id]
+        if subscriber is not None:
+            self._dropped += subscriber.dropped
+            if subscriber.task is not asyncio.current_task():
+                subscriber.task.cancel()
+
+    async def send(self, websocket: WebSocket, preview_id: str, data: dict, key: Optional[str] = None):
+        """Queue a message for a single connection."""
+        subscriber = self.active_connections.get(preview_id, {}).get(websocket)
+        if subscriber is not None:
+            self._deliver([subscriber], json.dumps(data), key)
+
+    async def send_update(self, preview_id: str, data: dict, key: Optional[str] = None):
+        """
+        Queue an update for all connections to a preview.
+
+        Args:
+            preview_id: Preview whose subscribers receive the update
+            data: JSON-serializable message
+            key: Coalesce key; under the "coalesce" policy a newer message
+                replaces a still-queued one with the same key
+        """
+        connections = self.active_connections.get(preview_id)
+        if not connections:
             return
-        
-        message = json.dumps(data)
-        disconnected = set()
-        
-        for connection in self.active_connections[preview_id]:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                disconnected.add(connection)
-        
-        # Clean up disconnected sockets
-        for conn in disconnected:
-            self.active_connections[preview_id].discard(conn)
-    
+        self._deliver(list(connections.values()), json.dumps(data), key)
+
     async def broadcast(self, data: dict):
         """Broadcast message to all connected clients."""
-        message = json.dumps(data)
-        for preview_id in self.active_connections:
-            for connection in self.active_connections[preview_id]:
-                try:
-                    await connection.send_text(message)
-                except Exception:
-                    pass
+        subscribers = [
+            subscriber
+            for connections in list(self.active_connections.values())
+            for subscriber in list(connections.values())
+        ]
+        if subscribers:
+            self._deliver(subscribers, json.dumps(data), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Connection counts and slow-consumer counters."""
+        subscribers = [s for connections in self.active_connections.values() for s in connections.values()]
+        return {
+            "previews": len(self.active_connections),
+            "connections": len(subscribers),
+            "queued": sum(len(s.queue) for s in subscribers),
+            "dropped": self._dropped + sum(s.dropped for s in subscribers),
+            "disconnected_slow": self._disconnected_slow,
+        }
+
+    def _deliver(self, subscribers: List[_Subscriber], message: str, key: Optional[str]) -> None:
+        # Subscribers is a snapshot, so disconnecting inside the loop is safe
+        for subscriber in subscribers:
+            if not subscriber.offer(message, key, self.policy):
+                self._disconnected_slow += 1
+                self.disconnect(subscriber.websocket, subscriber.preview_id)
+                task = asyncio.create_task(self._close(subscriber.websocket))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    def _writer_failed(self, subscriber: _Subscriber) -> None:
+        self.disconnect(subscriber.websocket, subscriber.preview_id)
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+        except Exception:
+            pass
 
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(
+    max_queue=settings.ws_send_queue_size,
+    policy=settings.ws_slow_consumer_policy
+)
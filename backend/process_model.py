@@ -9,12 +9,17 @@ Scrapes content, generates articles, calculates scores, and opens local preview.
 
 import argparse
 import asyncio
+import sys
+import time
 import uuid
 import webbrowser
 import uvicorn
 import threading
 import json
+from dataclasses import dataclass, asdict
+from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
 
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning, module="google.api_core")
@@ -23,14 +28,92 @@ warnings.filterwarnings("ignore", category=FutureWarning, module="google.api_cor
 from dotenv import load_dotenv
 load_dotenv()
 
+from app.clients import clients
 from app.config import settings
-from app.database import init_database, save_preview
+from app.database import init_database, close_database, save_preview
 from app.services.scraper import scrape_model, validate_huggingface_url
 from app.services.llm_processor import generate_article, generate_linkedin_post, fix_markdown_code_blocks
-from app.services.scoring_engine import calculate_scores, classify_category
+from app.services.scoring_engine import calculate_scores, calculate_heuristic_scores, classify_category
+from app.services.pipeline import Pipeline
 from app.models import ScrapedModel, GeneratedArticle, LinkedInPost, ModelScores
 
 
+
+def _scores_dict(scores: ModelScores) -> dict:
+    """Subset of scores passed to the LinkedIn prompt."""
+    return {
+        'overall_score': scores.overall_score,
+        'quality_score': scores.quality_score,
+        'speed_score': scores.speed_score,
+        'freedom_score': scores.freedom_score
+    }
+
+
+def _build_state(
+    preview_id: str,
+    model_data: ScrapedModel,
+    category,
+    article: GeneratedArticle,
+    scores: ModelScores,
+    linkedin_post: Optional[LinkedInPost]
+) -> dict:
+    """Assemble the full preview state shared by SQLite and the JSON output."""
+    # Add category to model data
+    model_dict = model_data.model_dump()
+    model_dict['category'] = category.value
+    
+    return {
+        "model_data": model_dict,
+        "article_data": article.model_dump(),
+        "linkedin_data": linkedin_post.model_dump() if linkedin_post else None,
+        "scores_data": scores.model_dump(),
+        "images": model_data.images,
+        "preview_id": preview_id
+    }
+
+
+async def _save_state(state: dict) -> None:
+    """Save a preview state to the local database."""
+    await save_preview(
+        preview_id=state["preview_id"],
+        model_data=state["model_data"],
+        article_data=state["article_data"],
+        linkedin_data=state["linkedin_data"],
+        scores_data=state["scores_data"],
+        images=state["images"]
+    )
+
+
+def _write_json_output(state: dict, slug: str) -> Path:
+    """Persist a preview state to output/<slug>.json."""
+    output_dir = Path("output")
+    output_dir.mkdir(exist_ok=True)
+    
+    json_path = output_dir / f"{slug}.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    
+    return json_path
+
+
+
+def _print_stage(name: str, result, elapsed: float) -> None:
+    """Progress line printed as each pipeline stage finishes."""
+    details = {
+        "scrape": lambda r: r.display_name,
+        "category": lambda r: r.value,
+        "article": lambda r: f"{len(r.content)} chars",
+        "scores": lambda r: f"{r.overall_score}/100 - {r.tier.value} Tier",
+        "linkedin": lambda r: f"{r.character_count} chars" if r else None,
+        "images": lambda r: f"{len(r)} remote images",
+        "json": lambda r: str(r),
+    }
+    if name == "state":
+        return
+    detail = details[name](result) if name in details else None
+    print(f"   ✓ {name} ({elapsed:.2f}s{', ' + detail if detail else ''})")
+
+
 async def process_model(url: str) -> str:
     """
     Process a Hugging Face model URL through the complete pipeline.
@@ -43,112 +126,285 @@ async def process_model(url: str) -> str:
     """
     print(f"\n🚀 Processing: {url}\n")
     
-    # Step 1: Validate URL
-    print("1. Validating URL... ", end="", flush=True)
+    # Validate before starting any work
+    print("Validating URL... ", end="", flush=True)
     if not validate_huggingface_url(url):
         raise ValueError(f"Invalid Hugging Face URL: {url}")
     print("✓")
     
-    # Step 2: Initialize database
-    print("2. Initializing database... ", end="", flush=True)
-    await init_database()
-    print("✓")
+    preview_id = str(uuid.uuid4())[:8]
     
-    # Step 3: Scrape content
-    print("3. Scraping content... ", end="", flush=True)
-    model_data = await scrape_model(url)
-    print(f"✓ ({model_data.display_name})")
-    
-    # Step 4: Classify category
-    print("4. Classifying category... ", end="", flush=True)
-    category = classify_category(model_data)
-    print(f"✓ ({category.value})")
-    
-    # Step 5: Generate article
-    print("5. Generating article... ", end="", flush=True)
-    article = await generate_article(model_data, category.value)
-    print(f"✓ ({len(article.content)} chars)")
-    
-    # Step 6: Calculate scores (using LLM scores from article if available)
-    print("6. Calculating scores... ", end="", flush=True)
-    scores = calculate_scores(
-        model=model_data, 
-        category=category.value,
-        quality_score=getattr(article, 'quality_score', None),
-        speed_score=getattr(article, 'speed_score', None),
-        freedom_score=getattr(article, 'freedom_score', None)
-    )
-    print(f"✓ ({scores.overall_score}/100 - {scores.tier.value} Tier)")
+    async def generate_linkedin(scrape, category, article, scores):
+        return await generate_linkedin_post(scrape, article, category.value, _scores_dict(scores))
+    
+    def build_scores(scrape, category, article, heuristics):
+        # LLM scores from the article take priority over heuristics
+        return calculate_scores(
+            model=scrape,
+            category=category.value,
+            quality_score=getattr(article, 'quality_score', None),
+            speed_score=getattr(article, 'speed_score', None),
+            freedom_score=getattr(article, 'freedom_score', None),
+            heuristics=heuristics
+        )
+    
+    def build_state(scrape, category, article, scores, linkedin, images):
+        return _build_state(preview_id, scrape, category, article, scores, linkedin)
+    
+    def write_json(scrape, article, state):
+        return _write_json_output(state, article.slug or scrape.display_name.lower().replace(" ", "-"))
+    
+    # Each stage starts as soon as its inputs are ready. Only
+    # scrape → article → scores → LinkedIn → save is inherently serial.
+    pipeline = Pipeline(on_complete=_print_stage)
+    pipeline.add("database", init_database)
+    pipeline.add("scrape", lambda: scrape_model(url))
+    pipeline.add("category", lambda scrape: classify_category(scrape), deps=["scrape"])
+    pipeline.add("heuristics", lambda scrape, category: calculate_heuristic_scores(scrape, category.value),
+                 deps=["scrape", "category"])
+    # User requested to skip download and use remote URLs directly
+    pipeline.add("images", lambda scrape: scrape.images, deps=["scrape"])
+    pipeline.add("article", lambda scrape, category: generate_article(scrape, category.value),
+                 deps=["scrape", "category"])
+    pipeline.add("scores", build_scores, deps=["scrape", "category", "article", "heuristics"])
+    pipeline.add("linkedin", generate_linkedin, deps=["scrape", "category", "article", "scores"], optional=True)
+    pipeline.add("state", build_state, deps=["scrape", "category", "article", "scores", "linkedin", "images"])
+    pipeline.add("save", lambda database, state: _save_state(state), deps=["database", "state"])
+    pipeline.add("json", write_json, deps=["scrape", "article", "state"])
     
-    # Step 7: Generate LinkedIn post (OPTIONAL)
-    print("7. Generating LinkedIn post... ", end="", flush=True)
-    linkedin_post = None
     try:
-        scores_dict = {
-            'overall_score': scores.overall_score,
-            'quality_score': scores.quality_score,
-            'speed_score': scores.speed_score,
-            'freedom_score': scores.freedom_score
-        }
-        linkedin_post = await generate_linkedin_post(model_data, article, category.value, scores_dict)
-        print(f"✓ ({linkedin_post.character_count} chars)")
-        print(f"   Note: This accounts for ~50% of API calls. Frequent use may hit rate limits.")
-    except Exception as e:
-        print(f"⚠️ Skipped (Error: {str(e)})")
-        linkedin_post = None
+        await pipeline.run()
+    finally:
+        if "linkedin" in pipeline.errors:
+            print(f"   ⚠️ LinkedIn post skipped (Error: {pipeline.errors['linkedin']})")
+        print("\n⏱️  Stage timings:")
+        print(pipeline.report())
     
-    # Step 8: Images (Using remote URLs)
-    print("8. Processing images... ", end="", flush=True)
-    preview_id = str(uuid.uuid4())[:8]
-    # User requested to skip download and use remote URLs directly
-    local_images = model_data.images
-    print(f"✓ ({len(local_images)} remote images)")
+    print(f"\n✅ Processing complete!")
+    print(f"📋 Preview ID: {preview_id}")
     
-    # Step 9: Save to local database
-    print("9. Saving preview... ", end="", flush=True)
+    return preview_id
+
+
+
+# Batch mode defaults: scraping is I/O bound against a single host, LLM calls
+# are bounded by provider rate limits. SQLite gets a single writer.
+DEFAULT_SCRAPE_WORKERS = 4
+DEFAULT_LLM_WORKERS = 4
+
+
+@dataclass
+class BatchResult:
+    """Outcome of processing a single URL in batch mode."""
+    url: str
+    preview_id: Optional[str] = None
+    display_name: Optional[str] = None
+    failed_stage: Optional[str] = None
+    error: Optional[str] = None
+    linkedin_error: Optional[str] = None
+    started_at: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.preview_id is not None
+
+
+def read_urls(source: str) -> List[str]:
+    """
+    Read model URLs from a file, or from stdin when source is '-'.
     
-    # Add category to model data
-    model_dict = model_data.model_dump()
-    model_dict['category'] = category.value
+    Blank lines and lines starting with '#' are ignored; duplicates are
+    dropped while preserving order.
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"URLs file not found: {source}")
+        lines = path.read_text(encoding="utf-8").splitlines()
+    
+    urls = []
+    seen = set()
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith("#") or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+    return urls
+
+
+async def process_batch(
+    urls: List[str],
+    scrape_workers: int = DEFAULT_SCRAPE_WORKERS,
+    llm_workers: int = DEFAULT_LLM_WORKERS
+) -> List[BatchResult]:
+    """
+    Process many Hugging Face URLs through a bounded concurrent pipeline.
     
-    linkedin_dump = linkedin_post.model_dump() if linkedin_post else None
+    Scraping, LLM generation and saving run as separate worker pools joined
+    by bounded queues, so a slow stage applies backpressure instead of
+    buffering the whole batch. A failure only marks its own URL as failed.
     
-    await save_preview(
-        preview_id=preview_id,
-        model_data=model_dict,
-        article_data=article.model_dump(),
-        linkedin_data=linkedin_dump,
-        scores_data=scores.model_dump(),
-        images=local_images
-    )
-    print("✓")
-
-    # Step 10: Persist State to JSON
-    print("10. Saving JSON output... ", end="", flush=True)
-    output_dir = Path("output")
-    output_dir.mkdir(exist_ok=True)
+    Args:
+        urls: Hugging Face model URLs
+        scrape_workers: Concurrent scrape tasks
+        llm_workers: Concurrent article/LinkedIn generation tasks
+        
+    Returns:
+        One BatchResult per URL, in input order
+    """
+    await init_database()
     
-    slug = article.slug or model_data.display_name.lower().replace(" ", "-")
-    json_path = output_dir / f"{slug}.json"
+    results = [BatchResult(url=url) for url in urls]
+    total = len(results)
+    done = 0
     
-    full_state = {
-        "model_data": model_dict,
-        "article_data": article.model_dump(),
-        "linkedin_data": linkedin_dump,
-        "scores_data": scores.model_dump(),
-        "images": local_images,
-        "preview_id": preview_id
-    }
+    scrape_queue: asyncio.Queue = asyncio.Queue()
+    generate_queue: asyncio.Queue = asyncio.Queue(maxsize=llm_workers * 2)
+    save_queue: asyncio.Queue = asyncio.Queue(maxsize=llm_workers * 2)
     
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(full_state, f, indent=2, ensure_ascii=False)
+    for result in results:
+        scrape_queue.put_nowait(result)
     
-    print(f"✓ ({json_path})")
+    def report(result: BatchResult) -> None:
+        nonlocal done
+        done += 1
+        result.elapsed = time.monotonic() - result.started_at
+        if result.ok:
+            print(f"  ✓ [{done}/{total}] {result.display_name} → {result.preview_id} ({result.elapsed:.1f}s)")
+        else:
+            print(f"  ✗ [{done}/{total}] {result.url} ({result.failed_stage}: {result.error})")
+    
+    def fail(result: BatchResult, stage: str, error: Exception) -> None:
+        result.failed_stage = stage
+        result.error = str(error) or error.__class__.__name__
+        report(result)
+    
+    async def scrape_worker():
+        while True:
+            try:
+                result = scrape_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result.started_at = time.monotonic()
+            try:
+                if not validate_huggingface_url(result.url):
+                    raise ValueError("Invalid Hugging Face URL")
+                model_data = await scrape_model(result.url)
+            except Exception as e:
+                fail(result, "scrape", e)
+                continue
+            result.display_name = model_data.display_name
+            await generate_queue.put((result, model_data))
+    
+    async def generate_worker():
+        while True:
+            item = await generate_queue.get()
+            if item is None:
+                return
+            result, model_data = item
+            try:
+                category = classify_category(model_data)
+                article = await generate_article(model_data, category.value)
+                scores = calculate_scores(
+                    model=model_data,
+                    category=category.value,
+                    quality_score=getattr(article, 'quality_score', None),
+                    speed_score=getattr(article, 'speed_score', None),
+                    freedom_score=getattr(article, 'freedom_score', None)
+                )
+            except Exception as e:
+                fail(result, "generate", e)
+                continue
+            
+            # LinkedIn post is optional, same as the single-URL pipeline
+            linkedin_post = None
+            try:
+                linkedin_post = await generate_linkedin_post(model_data, article, category.value, _scores_dict(scores))
+            except Exception as e:
+                result.linkedin_error = str(e)
+            
+            preview_id = str(uuid.uuid4())[:8]
+            state = _build_state(preview_id, model_data, category, article, scores, linkedin_post)
+            slug = article.slug or model_data.display_name.lower().replace(" ", "-")
+            await save_queue.put((result, state, slug))
+    
+    async def save_worker():
+        while True:
+            item = await save_queue.get()
+            if item is None:
+                return
+            result, state, slug = item
+            try:
+                await _save_state(state)
+                _write_json_output(state, slug)
+            except Exception as e:
+                fail(result, "save", e)
+                continue
+            result.preview_id = state["preview_id"]
+            report(result)
+    
+    async def run_stage(workers: list, next_queue: Optional[asyncio.Queue], next_count: int):
+        # Wait for a stage to drain, then tell the next stage to stop
+        await asyncio.gather(*workers)
+        if next_queue is not None:
+            for _ in range(next_count):
+                await next_queue.put(None)
+    
+    scrapers = [asyncio.create_task(scrape_worker()) for _ in range(max(1, scrape_workers))]
+    generators = [asyncio.create_task(generate_worker()) for _ in range(max(1, llm_workers))]
+    saver = asyncio.create_task(save_worker())
+    
+    await asyncio.gather(
+        run_stage(scrapers, generate_queue, len(generators)),
+        run_stage(generators, save_queue, 1),
+        run_stage([saver], None, 0)
+    )
     
-    print(f"\n✅ Processing complete!")
-    print(f"📋 Preview ID: {preview_id}")
+    return results
+
+
+def print_batch_summary(results: List[BatchResult], wall_time: float) -> Path:
+    """Print a per-URL summary and persist it to output/batch-<timestamp>.json."""
+    succeeded = [r for r in results if r.ok]
+    failed = [r for r in results if not r.ok]
     
-    return preview_id
+    print(f"\n📊 Batch summary: {len(succeeded)} succeeded, {len(failed)} failed in {wall_time:.1f}s")
+    for r in failed:
+        print(f"   ✗ {r.url} ({r.failed_stage}: {r.error})")
+    
+    linkedin_skipped = [r for r in succeeded if r.linkedin_error]
+    if linkedin_skipped:
+        print(f"   ⚠️ LinkedIn post skipped for {len(linkedin_skipped)} model(s)")
+    
+    output_dir = Path("output")
+    output_dir.mkdir(exist_ok=True)
+    summary_path = output_dir / f"batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "wall_time_seconds": round(wall_time, 2),
+            "succeeded": len(succeeded),
+            "failed": len(failed),
+            "results": [
+                {k: v for k, v in asdict(r).items() if k != "started_at"}
+                for r in results
+            ]
+        }, f, indent=2, ensure_ascii=False)
+    
+    print(f"📝 Summary written to {summary_path}")
+    return summary_path
+
+
+async def run_with_resources(coro):
+    """Run a CLI coroutine, closing shared clients and the database pool before its event loop ends."""
+    try:
+        return await coro
+    finally:
+        await clients.aclose()
+        await close_database()
 
 
 def start_server(preview_id: str):
@@ -168,7 +424,8 @@ def start_server(preview_id: str):
         "app.main:app",
         host=settings.local_server_host,
         port=settings.local_server_port,
-        log_level="info"
+        log_level="info",
+        ws_per_message_deflate=True
     )
 
 
@@ -232,6 +489,8 @@ def main():
 Examples:
   python process_model.py --url https://huggingface.co/Tongyi-MAI/Z-Image-Turbo
   python process_model.py --load-preview output/z-image-turbo.json
+  python process_model.py --urls-file models.txt --llm-workers 8
+  cat models.txt | python process_model.py --urls-file -
         """
     )
     
@@ -247,6 +506,26 @@ Examples:
         help="Path to existing JSON article file to load (skips scraping/LLM)"
     )
     
+    parser.add_argument(
+        "--urls-file",
+        type=str,
+        help="File with one Hugging Face URL per line ('-' reads stdin); processes all of them concurrently"
+    )
+    
+    parser.add_argument(
+        "--scrape-workers",
+        type=int,
+        default=DEFAULT_SCRAPE_WORKERS,
+        help=f"Concurrent scrapes in batch mode (default: {DEFAULT_SCRAPE_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--llm-workers",
+        type=int,
+        default=DEFAULT_LLM_WORKERS,
+        help=f"Concurrent LLM generations in batch mode (default: {DEFAULT_LLM_WORKERS})"
+    )
+    
     parser.add_argument(
         "--no-server",
         action="store_true",
@@ -256,15 +535,27 @@ Examples:
     args = parser.parse_args()
     
     # Validation
-    if not args.url and not args.load_preview:
-        parser.error("Either --url or --load-preview must be provided.")
+    if not args.url and not args.load_preview and not args.urls_file:
+        parser.error("One of --url, --urls-file or --load-preview must be provided.")
         
     try:
+        # Batch mode: no preview server, just a summary
+        if args.urls_file:
+            urls = read_urls(args.urls_file)
+            print(f"\n🚀 Processing {len(urls)} URLs "
+                  f"({args.scrape_workers} scrape / {args.llm_workers} LLM workers)\n")
+            start = time.monotonic()
+            results = asyncio.run(run_with_resources(process_batch(urls, args.scrape_workers, args.llm_workers)))
+            print_batch_summary(results, time.monotonic() - start)
+            print(f"\n💡 To review previews, run:")
+            print(f"   uvicorn app.main:app --port {settings.local_server_port}")
+            return
+        
         # Run processing
         if args.load_preview:
-            preview_id = asyncio.run(load_preview_from_json(args.load_preview))
+            preview_id = asyncio.run(run_with_resources(load_preview_from_json(args.load_preview)))
         else:
-            preview_id = asyncio.run(process_model(args.url))
+            preview_id = asyncio.run(run_with_resources(process_model(args.url)))
         
         # Start server unless --no-server flag
         if not args.no_server:
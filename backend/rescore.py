@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""
+TopTierModels - Catalog Rescoring Script
+
+Recomputes overall scores and tiers of every stored model with the current
+WEIGHTS and TIER_THRESHOLDS from app/services/scoring_engine.py.
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import DATABASE_PATH, close_database
+from app.services.rescoring import (
+    format_tier_diff,
+    load_scores_from_database,
+    load_scores_from_json,
+    rescore,
+    write_scores_to_database,
+    write_scores_to_json
+)
+
+
+async def rescore_database(dry_run: bool) -> None:
+    """Rescore every preview in the local SQLite database."""
+    try:
+        start = time.perf_counter()
+        table = await load_scores_from_database()
+        loaded = time.perf_counter()
+        result = rescore(table)
+        computed = time.perf_counter()
+        written = 0 if dry_run else await write_scores_to_database(result)
+        end = time.perf_counter()
+    finally:
+        await close_database()
+
+    _print_summary(result, written, dry_run, DATABASE_PATH, loaded - start, computed - loaded, end - computed)
+
+
+def rescore_json(path: Path, dry_run: bool) -> None:
+    """Rescore exported JSON files."""
+    start = time.perf_counter()
+    table = load_scores_from_json(path)
+    loaded = time.perf_counter()
+    result = rescore(table)
+    computed = time.perf_counter()
+    written = 0 if dry_run else write_scores_to_json(result)
+    end = time.perf_counter()
+
+    _print_summary(result, written, dry_run, path, loaded - start, computed - loaded, end - computed)
+
+
+def _print_summary(result, written, dry_run, source, load_time, compute_time, write_time) -> None:
+    print(f"\n📊 Rescored {len(result.table)} models from {source}")
+    print(f"   load {load_time * 1000:.1f}ms · rescore {compute_time * 1000:.1f}ms · write {write_time * 1000:.1f}ms\n")
+    print(format_tier_diff(result))
+    if dry_run:
+        print(f"\n🔍 Dry run: {result.changed_count} models would change")
+    else:
+        print(f"\n✅ Updated {written} models ({len(result.table) - written} unchanged)")
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="TopTierModels - Recompute overall scores and tiers",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python rescore.py                  # local SQLite previews
+  python rescore.py --json output/   # exported JSON files
+  python rescore.py --dry-run
+        """
+    )
+
+    parser.add_argument(
+        "--json",
+        type=str,
+        help="Exported JSON file or directory to rescore instead of the local database"
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show the tier changes without writing them"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if args.json:
+            rescore_json(Path(args.json), args.dry_run)
+        else:
+            asyncio.run(rescore_database(args.dry_run))
+    except KeyboardInterrupt:
+        print("\n\n👋 Shutting down...")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
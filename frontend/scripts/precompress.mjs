@@ -0,0 +1,46 @@
+// Writes .br and .gz siblings next to every compressible file in dist/.
+// The local server (backend/app/compression.py) sends these to clients that
+// accept them instead of compressing the same asset on every request.
+
+import { readdir, readFile, stat, writeFile } from 'node:fs/promises'
+import { extname, join } from 'node:path'
+import { fileURLToPath } from 'node:url'
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib'
+
+const DIST = fileURLToPath(new URL('../dist', import.meta.url))
+const EXTENSIONS = new Set(['.html', '.js', '.mjs', '.css', '.json', '.svg', '.map', '.txt', '.xml'])
+const MIN_SIZE = 1024
+
+async function* walk(dir) {
+  for (const entry of await readdir(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name)
+    if (entry.isDirectory()) yield* walk(path)
+    else if (EXTENSIONS.has(extname(entry.name))) yield path
+  }
+}
+
+let files = 0
+let before = 0
+let after = 0
+
+for await (const path of walk(DIST)) {
+  if ((await stat(path)).size < MIN_SIZE) continue
+  const data = await readFile(path)
+  const br = brotliCompressSync(data, {
+    params: {
+      [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+      [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+    },
+  })
+  const gz = gzipSync(data, { level: constants.Z_BEST_COMPRESSION })
+
+  // Only keep versions that are actually smaller
+  if (br.length < data.length) await writeFile(`${path}.br`, br)
+  if (gz.length < data.length) await writeFile(`${path}.gz`, gz)
+
+  files += 1
+  before += data.length
+  after += Math.min(br.length, data.length)
+}
+
+console.log(`precompress: ${files} files, ${(before / 1024).toFixed(1)} KiB -> ${(after / 1024).toFixed(1)} KiB (brotli)`)
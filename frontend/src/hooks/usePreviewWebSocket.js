@@ -1,21 +1,33 @@
-import { useState, useEffect, useCallback, useRef } from 'react'
+import { useState, useEffect, useCallback, useRef, useMemo } from 'react'
+import { applyPatch } from '../lib/jsonPatch'
 
 /**
  * Custom hook for WebSocket connection to preview updates
  * @param {string} previewId - The preview session ID
  * @param {boolean} enabled - Whether to enable the connection
- * @returns {{ data: object, isConnected: boolean, sendMessage: function }}
+ * @returns {{ data: object, streams: object, jobs: object, isConnected: boolean, sendMessage: function }}
  */
 export function usePreviewWebSocket(previewId, enabled = true) {
-    const [data, setData] = useState(null)
+    // The server's document at versionRef.current; patches apply only to this
+    const [synced, setSynced] = useState(null)
+    // Text streamed so far per section ('article', 'linkedin') while it is being regenerated
+    const [streams, setStreams] = useState({})
+    // Fields completed so far per section being regenerated; shown over `synced`
+    // until the patch that saves the section arrives, dropped if regeneration fails
+    const [fields, setFields] = useState({})
+    // Latest {"type": "job"} message per job ID (publish, regenerate)
+    const [jobs, setJobs] = useState({})
     const [isConnected, setIsConnected] = useState(false)
     const wsRef = useRef(null)
     const reconnectTimeoutRef = useRef(null)
+    // Version of `synced`; sent as ?since= on reconnect to receive only the missed patches
+    const versionRef = useRef(null)
 
     const connect = useCallback(() => {
         if (!previewId || !enabled) return
 
-        const wsUrl = `ws://${window.location.hostname}:3001/ws/${previewId}`
+        const since = versionRef.current !== null ? `?since=${versionRef.current}` : ''
+        const wsUrl = `ws://${window.location.hostname}:3001/ws/${previewId}${since}`
         const ws = new WebSocket(wsUrl)
 
         ws.onopen = () => {
@@ -28,9 +40,45 @@ export function usePreviewWebSocket(previewId, enabled = true) {
                 const message = JSON.parse(event.data)
 
                 if (message.type === 'initial') {
-                    setData(message.data)
-                } else if (message.type === 'update') {
-                    setData(prev => ({ ...prev, ...message.data }))
+                    versionRef.current = message.version
+                    setSynced(message.data)
+                } else if (message.type === 'patch') {
+                    const current = versionRef.current
+                    if (current === null || message.version <= current) return
+                    if (message.version !== current + 1) {
+                        // Missed a version: reconnect and resume from the one we have
+                        ws.close()
+                        return
+                    }
+                    versionRef.current = message.version
+                    setSynced(prev => applyPatch(prev, message.ops))
+                    // Drop the streamed text and fields of sections the patch has now saved
+                    const unsaved = ([section]) => !message.ops.some(op => op.path.startsWith(`/${section}_data`))
+                    setStreams(prev => Object.fromEntries(Object.entries(prev).filter(unsaved)))
+                    setFields(prev => Object.fromEntries(Object.entries(prev).filter(unsaved)))
+                } else if (message.type === 'resumed') {
+                    // Caught up through the patches sent before this message
+                } else if (message.type === 'token') {
+                    setStreams(prev => ({
+                        ...prev,
+                        [message.section]: (prev[message.section] || '') + message.data
+                    }))
+                } else if (message.type === 'field') {
+                    // A field of the section being regenerated is complete
+                    setFields(prev => ({
+                        ...prev,
+                        [message.section]: { ...prev[message.section], [message.key]: message.value }
+                    }))
+                } else if (message.type === 'job') {
+                    setJobs(prev => ({ ...prev, [message.job_id]: message }))
+                } else if (message.type === 'error') {
+                    // Nothing was saved: discard what was streamed for the section
+                    const drop = prev => {
+                        const { [message.section]: _, ...rest } = prev
+                        return rest
+                    }
+                    setStreams(drop)
+                    setFields(drop)
                 } else if (message.type === 'pong') {
                     // Heartbeat response
                 }
@@ -85,6 +133,7 @@ export function usePreviewWebSocket(previewId, enabled = true) {
 
     // Connect on mount, disconnect on unmount
     useEffect(() => {
+        versionRef.current = null
         if (enabled && previewId) {
             connect()
         }
@@ -94,7 +143,16 @@ export function usePreviewWebSocket(previewId, enabled = true) {
         }
     }, [previewId, enabled, connect, disconnect])
 
-    return { data, isConnected, sendMessage }
+    const data = useMemo(() => {
+        if (!synced) return synced
+        const merged = { ...synced }
+        for (const [section, values] of Object.entries(fields)) {
+            merged[`${section}_data`] = { ...synced[`${section}_data`], ...values }
+        }
+        return merged
+    }, [synced, fields])
+
+    return { data, streams, jobs, isConnected, sendMessage }
 }
 
 export default usePreviewWebSocket
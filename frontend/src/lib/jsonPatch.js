@@ -0,0 +1,57 @@
+/**
+ * JSON Patch (RFC 6902) application for preview updates.
+ *
+ * Applies the add/remove/replace operations produced by the backend
+ * (backend/app/json_patch.py) without mutating the input: only the
+ * objects along each patched path are copied, so unchanged sections keep
+ * their identity and React skips re-rendering them.
+ */
+
+function parsePointer(path) {
+  return path.split('/').slice(1).map(token => token.replace(/~1/g, '/').replace(/~0/g, '~'))
+}
+
+function applyOperation(node, tokens, op) {
+  if (tokens.length === 0) {
+    return op.op === 'remove' ? undefined : op.value
+  }
+
+  const [token, ...rest] = tokens
+
+  if (Array.isArray(node)) {
+    const copy = node.slice()
+    const index = token === '-' ? copy.length : Number(token)
+    if (rest.length > 0) {
+      copy[index] = applyOperation(copy[index], rest, op)
+    } else if (op.op === 'remove') {
+      copy.splice(index, 1)
+    } else if (op.op === 'add') {
+      copy.splice(index, 0, op.value)
+    } else {
+      copy[index] = op.value
+    }
+    return copy
+  }
+
+  const copy = { ...(node || {}) }
+  if (rest.length > 0) {
+    copy[token] = applyOperation(copy[token], rest, op)
+  } else if (op.op === 'remove') {
+    delete copy[token]
+  } else {
+    copy[token] = op.value
+  }
+  return copy
+}
+
+/**
+ * Apply a list of patch operations to a document.
+ * @param {object} document - Current document (left unchanged)
+ * @param {Array<{op: string, path: string, value?: any}>} ops - Operations in order
+ * @returns {object} Patched document
+ */
+export function applyPatch(document, ops) {
+  return ops.reduce((doc, op) => applyOperation(doc, parsePointer(op.path), op), document)
+}
+
+export default applyPatch
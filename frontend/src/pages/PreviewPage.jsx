@@ -13,10 +13,11 @@ function PreviewPage() {
     const [previewData, setPreviewData] = useState(null)
     const [loading, setLoading] = useState(true)
     const [publishing, setPublishing] = useState(false)
+    const [regenerating, setRegenerating] = useState(false)
     const [activeTab, setActiveTab] = useState('article') // 'article' or 'linkedin'
     const [copySuccess, setCopySuccess] = useState(false)
 
-    const { data: wsData, isConnected } = usePreviewWebSocket(previewId, true)
+    const { data: wsData, streams, jobs, isConnected } = usePreviewWebSocket(previewId, true)
 
     useEffect(() => {
         if (wsData) {
@@ -44,6 +45,35 @@ function PreviewPage() {
         fetchPreview()
     }, [previewId, previewData])
 
+    // Publish and regenerate run as background jobs; these hold the queued job IDs
+    const [publishJob, setPublishJob] = useState(null)
+    const [regenerateJob, setRegenerateJob] = useState(null)
+
+    useEffect(() => {
+        const job = publishJob && jobs[publishJob]
+        if (job?.status === 'succeeded') {
+            alert(`Published! ${job.result?.live_url}`)
+        } else if (job?.status === 'failed') {
+            alert('Publish failed: ' + job.error)
+        } else {
+            return
+        }
+        setPublishJob(null)
+        setPublishing(false)
+    }, [jobs, publishJob])
+
+    useEffect(() => {
+        const job = regenerateJob && jobs[regenerateJob]
+        if (job?.status === 'failed') {
+            alert('Regeneration failed: ' + job.error)
+        } else if (job?.status !== 'succeeded') {
+            return
+        }
+        // The new content arrives as a 'patch' message
+        setRegenerateJob(null)
+        setRegenerating(false)
+    }, [jobs, regenerateJob])
+
     const handlePublish = async () => {
         setPublishing(true)
         try {
@@ -52,17 +82,29 @@ function PreviewPage() {
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ preview_id: previewId, trigger_netlify_rebuild: true })
             })
-            if (response.ok) {
-                const result = await response.json()
-                alert(`Published! ${result.live_url}`)
-            }
+            if (!response.ok) throw new Error(`HTTP ${response.status}`)
+            const { job_id } = await response.json()
+            setPublishJob(job_id)
         } catch (error) {
             alert('Publish failed: ' + error.message)
-        } finally {
             setPublishing(false)
         }
     }
 
+    const handleRegenerate = async () => {
+        setRegenerating(true)
+        try {
+            // Progress arrives as 'token' and 'job' messages on the WebSocket
+            const response = await fetch(`/api/regenerate/${previewId}/${activeTab}`, { method: 'POST' })
+            if (!response.ok) throw new Error(`HTTP ${response.status}`)
+            const { job_id } = await response.json()
+            setRegenerateJob(job_id)
+        } catch (error) {
+            alert('Regeneration failed: ' + error.message)
+            setRegenerating(false)
+        }
+    }
+
     const handleCopy = () => {
         if (previewData?.linkedin_data?.content) {
             navigator.clipboard.writeText(previewData.linkedin_data.content)
@@ -162,6 +204,9 @@ function PreviewPage() {
                         <button className="btn btn-secondary btn-sm" onClick={handleCopy}>
                             {copySuccess ? '✓ Copied' : 'Copy LinkedIn'}
                         </button>
+                        <button className="btn btn-secondary btn-sm" onClick={handleRegenerate} disabled={regenerating}>
+                            {regenerating ? 'Regenerating...' : 'Regenerate'}
+                        </button>
                         <button className="btn btn-primary btn-sm" onClick={handlePublish} disabled={publishing}>
                             {publishing ? 'Publishing...' : 'Publish'}
                         </button>
@@ -184,6 +229,11 @@ function PreviewPage() {
                     </button>
                 </div>
 
+                {/* Live output while a section is being regenerated */}
+                {streams[activeTab] && (
+                    <pre className="preview-stream">{streams[activeTab]}</pre>
+                )}
+
                 {/* Article Tab */}
                 {activeTab === 'article' && (
                     <>
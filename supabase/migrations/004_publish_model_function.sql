@@ -0,0 +1,187 @@
+-- Migration 004: Single-call transactional publish
+--
+-- publish_model(payload) writes a complete preview (model, article, scores,
+-- LinkedIn post, image rows, code snippets, tierlist count) in one
+-- transaction, so the uploader needs one round trip and a failure rolls
+-- everything back.
+--
+-- Payload shape (see backend/app/services/uploader.py):
+-- {
+--   "model":         { huggingface_url, model_name, display_name, ... },
+--   "article":       { title, slug, excerpt, content, ... },
+--   "scores":        { overall_score, tier, quality_score, ... },
+--   "linkedin":      { content, hook, key_points, ... } | null,
+--   "images":        [ { source_url, public_url, alt_text } ],
+--   "code_snippets": [ { title, description, language, code, snippet_type, order } ]
+-- }
+
+CREATE OR REPLACE FUNCTION publish_model(payload JSONB)
+RETURNS JSONB AS $$
+DECLARE
+  m JSONB := payload->'model';
+  a JSONB := payload->'article';
+  s JSONB := payload->'scores';
+  l JSONB := payload->'linkedin';
+  v_model_id UUID;
+  v_article_id UUID;
+  v_slug TEXT;
+BEGIN
+  -- 1. Model
+  INSERT INTO models (
+    huggingface_url, model_name, display_name, organization, category,
+    description, readme_content, license, tags, model_metadata,
+    featured_image_url, safetensors, model_size, tensor_types, status
+  )
+  VALUES (
+    m->>'huggingface_url',
+    m->>'model_name',
+    m->>'display_name',
+    m->>'organization',
+    COALESCE(m->>'category', 'Other'),
+    m->>'description',
+    m->>'readme_content',
+    m->>'license',
+    COALESCE(m->'tags', '[]'::jsonb),
+    COALESCE(m->'model_metadata', '{}'::jsonb),
+    m->>'featured_image_url',
+    (m->>'safetensors')::boolean,
+    m->>'model_size',
+    ARRAY(SELECT jsonb_array_elements_text(COALESCE(m->'tensor_types', '[]'::jsonb))),
+    COALESCE(m->>'status', 'active')
+  )
+  ON CONFLICT (huggingface_url) DO UPDATE SET
+    model_name = EXCLUDED.model_name,
+    display_name = EXCLUDED.display_name,
+    organization = EXCLUDED.organization,
+    category = EXCLUDED.category,
+    description = EXCLUDED.description,
+    readme_content = EXCLUDED.readme_content,
+    license = EXCLUDED.license,
+    tags = EXCLUDED.tags,
+    model_metadata = EXCLUDED.model_metadata,
+    featured_image_url = EXCLUDED.featured_image_url,
+    safetensors = EXCLUDED.safetensors,
+    model_size = EXCLUDED.model_size,
+    tensor_types = EXCLUDED.tensor_types,
+    status = EXCLUDED.status,
+    updated_at = NOW()
+  RETURNING id INTO v_model_id;
+
+  -- 2. Article
+  INSERT INTO articles (
+    model_id, title, slug, excerpt, content, hero_image_url,
+    read_time_minutes, author, seo_keywords, published
+  )
+  VALUES (
+    v_model_id,
+    a->>'title',
+    a->>'slug',
+    a->>'excerpt',
+    a->>'content',
+    a->>'hero_image_url',
+    COALESCE((a->>'read_time_minutes')::integer, 5),
+    COALESCE(a->>'author', 'TopTierModels AI'),
+    ARRAY(SELECT jsonb_array_elements_text(COALESCE(a->'seo_keywords', '[]'::jsonb))),
+    COALESCE((a->>'published')::boolean, TRUE)
+  )
+  ON CONFLICT (slug) DO UPDATE SET
+    model_id = EXCLUDED.model_id,
+    title = EXCLUDED.title,
+    excerpt = EXCLUDED.excerpt,
+    content = EXCLUDED.content,
+    hero_image_url = EXCLUDED.hero_image_url,
+    read_time_minutes = EXCLUDED.read_time_minutes,
+    author = EXCLUDED.author,
+    seo_keywords = EXCLUDED.seo_keywords,
+    published = EXCLUDED.published,
+    updated_at = NOW()
+  RETURNING id, slug INTO v_article_id, v_slug;
+
+  -- 3. Scores
+  INSERT INTO model_scores (
+    model_id, overall_score, tier, quality_score, speed_score,
+    freedom_score, benchmarks, scoring_methodology
+  )
+  VALUES (
+    v_model_id,
+    (s->>'overall_score')::numeric,
+    s->>'tier',
+    (s->>'quality_score')::numeric,
+    (s->>'speed_score')::numeric,
+    (s->>'freedom_score')::numeric,
+    COALESCE(s->'benchmarks', '{}'::jsonb),
+    s->>'scoring_methodology'
+  )
+  ON CONFLICT (model_id) DO UPDATE SET
+    overall_score = EXCLUDED.overall_score,
+    tier = EXCLUDED.tier,
+    quality_score = EXCLUDED.quality_score,
+    speed_score = EXCLUDED.speed_score,
+    freedom_score = EXCLUDED.freedom_score,
+    benchmarks = EXCLUDED.benchmarks,
+    scoring_methodology = EXCLUDED.scoring_methodology,
+    scored_at = NOW(),
+    updated_at = NOW();
+
+  -- 4. LinkedIn post (replace, no unique constraint on article_id)
+  DELETE FROM simplified_articles WHERE article_id = v_article_id;
+  IF l IS NOT NULL AND jsonb_typeof(l) = 'object' THEN
+    INSERT INTO simplified_articles (
+      article_id, model_id, content, hook, key_points,
+      call_to_action, hashtags, character_count
+    )
+    VALUES (
+      v_article_id,
+      v_model_id,
+      l->>'content',
+      l->>'hook',
+      ARRAY(SELECT jsonb_array_elements_text(COALESCE(l->'key_points', '[]'::jsonb))),
+      l->>'call_to_action',
+      ARRAY(SELECT jsonb_array_elements_text(COALESCE(l->'hashtags', '[]'::jsonb))),
+      COALESCE((l->>'character_count')::integer, 0)
+    );
+  END IF;
+
+  -- 5. Image rows (storage_path is unique, so republishing updates them)
+  INSERT INTO images (model_id, article_id, source_url, storage_path, public_url, alt_text)
+  SELECT
+    v_model_id,
+    v_article_id,
+    img.value->>'source_url',
+    'models/' || v_model_id || '/image_' || (img.ordinality - 1) || '.webp',
+    img.value->>'public_url',
+    img.value->>'alt_text'
+  FROM jsonb_array_elements(COALESCE(payload->'images', '[]'::jsonb)) WITH ORDINALITY AS img(value, ordinality)
+  ON CONFLICT (storage_path) DO UPDATE SET
+    article_id = EXCLUDED.article_id,
+    source_url = EXCLUDED.source_url,
+    public_url = EXCLUDED.public_url,
+    alt_text = EXCLUDED.alt_text;
+
+  -- 6. Tierlist count
+  PERFORM increment_tierlist_count(COALESCE(m->>'category', 'Other'));
+
+  -- 7. Code snippets
+  INSERT INTO code_snippets (model_id, title, description, language, code, snippet_type, "order")
+  SELECT
+    v_model_id,
+    snip->>'title',
+    snip->>'description',
+    COALESCE(snip->>'language', 'python'),
+    snip->>'code',
+    COALESCE(snip->>'snippet_type', 'basic_usage'),
+    COALESCE((snip->>'order')::integer, 0)
+  FROM jsonb_array_elements(COALESCE(payload->'code_snippets', '[]'::jsonb)) AS snip;
+
+  RETURN jsonb_build_object(
+    'model_id', v_model_id,
+    'article_id', v_article_id,
+    'slug', v_slug
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may publish
+REVOKE ALL ON FUNCTION publish_model(JSONB) FROM PUBLIC;
+REVOKE ALL ON FUNCTION publish_model(JSONB) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION publish_model(JSONB) TO service_role;